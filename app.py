@@ -5,47 +5,237 @@ Tất cả chức năng chụp ảnh đều trả về JSON với results chi ti
 
 # ====================== PHẦN 1: IMPORT THƯ VIỆN ======================
 import os
+import io
 import cv2
 import time
 import json
 import threading
 import numpy as np
 from datetime import datetime, timedelta
-from flask import Flask, render_template, Response, jsonify, request, send_from_directory
+from flask import Flask, Request, render_template, Response, jsonify, request, send_from_directory
 from flask_socketio import SocketIO, emit
 from flask_cors import CORS
-from werkzeug.utils import secure_filename
 import schedule
 import atexit
 
 # Import các module custom
 from utils.camera import Camera
 from utils.detector import DiseaseDetector
-from utils.sensor import DHT11Sensor
+from utils.detector_pool import DetectorPool
+from utils.inference_scheduler import InferenceScheduler
+from utils.jobs import JobManager
+from utils.result_cache import PerceptualResultCache
+from utils.upload_store import UploadStore
+from utils.image_io import decode_image
+from utils.stream import MJPEGBroadcaster
+from utils.live_inference import LiveInference
+from utils.change_trigger import ChangeDetector, ChangeTrigger
+from utils.tiling import TiledAnalyzer
+from utils.tta import TTAAnalyzer
+from utils.history import AnalysisHistory, parse_time
+from utils.capture_index import CaptureIndex
+from utils.thumbnails import ThumbnailService
+from utils.image_writer import ImageWriter
+from utils.capture_pipeline import CapturePipeline
+from utils.status_publisher import StatusPublisher, result_summary
+from utils.sensor import DHT11Sensor, SimulatedSensor
+from utils.sensor_sampler import SensorSampler
+from utils.sensor_store import SensorStore, RESOLUTIONS
 
 # ====================== PHẦN 2: KHỞI TẠO FLASK APP ======================
+class InMemoryUploadRequest(Request):
+    """Giữ file upload trong RAM thay vì file tạm trên thẻ nhớ (đã giới hạn bởi MAX_CONTENT_LENGTH)"""
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
+
 app = Flask(__name__)
+app.request_class = InMemoryUploadRequest
 CORS(app)
 app.config['SECRET_KEY'] = 'tomato_disease_detection_secret_2025'
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['CAPTURE_FOLDER'] = 'captures'
 app.config['DAILY_CAPTURE_FOLDER'] = 'daily_captures'
+# Dữ liệu nội bộ (index, database) - không phục vụ ra ngoài
+app.config['DATA_FOLDER'] = 'data'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+# Số interpreter trong pool và số thread cho mỗi interpreter (Pi có 4 core)
+app.config['DETECTOR_POOL_SIZE'] = int(os.environ.get('DETECTOR_POOL_SIZE', 2))
+app.config['DETECTOR_NUM_THREADS'] = int(os.environ.get('DETECTOR_NUM_THREADS', 2))
+# Backend TFLite: None = tự chọn (ai_edge_litert -> tflite_runtime -> tensorflow)
+app.config['TFLITE_BACKEND'] = os.environ.get('TFLITE_BACKEND') or None
+# Gom batch: chờ tối đa N ms hoặc tới M ảnh rồi chạy model một lần
+# (0 = không chờ, chỉ gom các yêu cầu đang xếp hàng sẵn; batch chỉ nhanh hơn trên model/CPU có lợi)
+app.config['INFERENCE_BATCH_WINDOW_MS'] = float(os.environ.get('INFERENCE_BATCH_WINDOW_MS', 0))
+app.config['INFERENCE_MAX_BATCH'] = int(os.environ.get('INFERENCE_MAX_BATCH', 8))
+app.config['INFERENCE_TIMEOUT'] = 30
+# Số thread xử lý job phân tích bất đồng bộ (/jobs)
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 2))
+# Cache kết quả theo perceptual hash: frame lệch <= N bit dùng lại kết quả
+app.config['RESULT_CACHE_MAX_DISTANCE'] = int(os.environ.get('RESULT_CACHE_MAX_DISTANCE', 4))
+app.config['RESULT_CACHE_TTL'] = 600
+app.config['RESULT_CACHE_MAX_ENTRIES'] = 512
+app.config['RESULT_CACHE_MAX_BYTES'] = 1024 * 1024
+# Video stream: encode một lần cho mọi client, giới hạn FPS
+app.config['STREAM_FPS'] = float(os.environ.get('STREAM_FPS', 15))
+app.config['STREAM_JPEG_QUALITY'] = int(os.environ.get('STREAM_JPEG_QUALITY', 80))
+app.config['STREAM_CLIENT_QUEUE'] = 2
+# Client /video_feed không truyền ?adaptive= thì dùng giá trị này
+app.config['STREAM_ADAPTIVE'] = os.environ.get('STREAM_ADAPTIVE', '0') == '1'
+# Nhận diện live trên stream (mặc định tắt): tối đa N lần/giây và X% thời gian CPU
+app.config['LIVE_INFERENCE'] = os.environ.get('LIVE_INFERENCE', '0') == '1'
+app.config['LIVE_MAX_RATE'] = float(os.environ.get('LIVE_MAX_RATE', 2))
+app.config['LIVE_CPU_BUDGET'] = float(os.environ.get('LIVE_CPU_BUDGET', 50))
+# Khoảng cách tối thiểu giữa hai lần gửi 'live_result' qua WebSocket (giây)
+app.config['LIVE_PUBLISH_INTERVAL'] = 1.0
+# Phân tích khi cảnh thay đổi: xét frame mỗi N giây, phân tích khi >= X% pixel thay đổi
+# (cách nhau ít nhất MIN giây) hoặc khi kết quả cũ quá MAX giây; mặc định tắt (bật: CHANGE_TRIGGER=1)
+app.config['CHANGE_TRIGGER'] = os.environ.get('CHANGE_TRIGGER', '0') == '1'
+app.config['CHANGE_CHECK_INTERVAL'] = float(os.environ.get('CHANGE_CHECK_INTERVAL', 1.0))
+app.config['CHANGE_THRESHOLD'] = float(os.environ.get('CHANGE_THRESHOLD', 0.05))
+app.config['CHANGE_MIN_INTERVAL'] = int(os.environ.get('CHANGE_MIN_INTERVAL', 60))
+app.config['CHANGE_MAX_INTERVAL'] = int(os.environ.get('CHANGE_MAX_INTERVAL', 3600))
+# Phân tích theo tile cho ảnh upload lớn (?mode=tiled): kích thước tile (pixel ảnh gốc),
+# tỉ lệ chồng lấn và tỉ lệ màu lá tối thiểu để tile được phân tích
+app.config['TILE_SIZE'] = int(os.environ.get('TILE_SIZE', 512))
+app.config['TILE_OVERLAP'] = 0.25
+app.config['TILE_MIN_LEAF'] = 0.3
+# Test-time augmentation: tự chạy khi độ tin cậy lần đầu nằm trong khoảng [LOW, HIGH]
+app.config['TTA_ENABLED'] = os.environ.get('TTA_ENABLED', '1') == '1'
+app.config['TTA_LOW'] = float(os.environ.get('TTA_LOW', 0.4))
+app.config['TTA_HIGH'] = float(os.environ.get('TTA_HIGH', 0.7))
+# Thumbnail cho lưới ảnh trên dashboard (/thumbs/<loại>/<kích thước>/<tên file>)
+app.config['THUMB_SIZES'] = (160, 320)
+app.config['THUMB_FORMATS'] = ('webp', 'jpeg')
+app.config['THUMB_QUALITY'] = int(os.environ.get('THUMB_QUALITY', 75))
+app.config['THUMB_CACHE_MAX_BYTES'] = 16 * 1024 * 1024
+# Ảnh chụp được ghi trong thread nền vào thư mục con YYYY/MM/DD: định dạng (jpeg/webp),
+# chất lượng và số ảnh tối đa chờ ghi (đầy thì người chụp phải chờ)
+app.config['IMAGE_FORMAT'] = os.environ.get('IMAGE_FORMAT', 'jpeg')
+app.config['IMAGE_QUALITY'] = int(os.environ.get('IMAGE_QUALITY', 90))
+app.config['IMAGE_WRITER_QUEUE'] = 16
+# Cảm biến: 'dht11' (GPIO) hoặc 'simulated' (giả lập, không cần GPIO); đọc mỗi N giây,
+# giữ các mẫu gần nhất trong ring buffer (8640 mẫu = 1 ngày với chu kỳ 10 giây)
+app.config['SENSOR_BACKEND'] = os.environ.get('SENSOR_BACKEND', 'dht11')
+app.config['SENSOR_INTERVAL'] = float(os.environ.get('SENSOR_INTERVAL', 10))
+app.config['SENSOR_BUFFER_SIZE'] = 8640
+# Lịch sử cảm biến (/sensor_history): giữ mẫu gốc N ngày, các mức phút/giờ/ngày giữ mãi;
+# số điểm tối đa mỗi lần truy vấn
+app.config['SENSOR_RAW_RETENTION_DAYS'] = int(os.environ.get('SENSOR_RAW_RETENTION_DAYS', 30))
+app.config['SENSOR_HISTORY_MAX_POINTS'] = 2000
+# Trạng thái gửi qua WebSocket: gộp các thay đổi trong N ms thành một 'status_delta'
+app.config['STATUS_COALESCE_MS'] = float(os.environ.get('STATUS_COALESCE_MS', 250))
+# Camera: 'bgr' giải mã mọi frame, 'mjpeg' giữ JPEG gốc từ webcam (USB cam hỗ trợ MJPG)
+app.config['CAMERA_MODE'] = os.environ.get('CAMERA_MODE', 'bgr')
+# Nguồn camera thay webcam: đường dẫn file video/.mjpeg hoặc 'synthetic'
+app.config['CAMERA_SOURCE'] = os.environ.get('CAMERA_SOURCE') or None
+# Chế độ mjpeg: gửi thẳng JPEG của camera tới client (không vẽ timestamp, không encode lại)
+app.config['STREAM_PASSTHROUGH'] = os.environ.get('STREAM_PASSTHROUGH', '1') == '1'
 
 # Tạo các thư mục nếu chưa tồn tại
-for folder in ['UPLOAD_FOLDER', 'CAPTURE_FOLDER', 'DAILY_CAPTURE_FOLDER']:
+for folder in ['UPLOAD_FOLDER', 'CAPTURE_FOLDER', 'DAILY_CAPTURE_FOLDER', 'DATA_FOLDER']:
     os.makedirs(app.config[folder], exist_ok=True)
 
 # Khởi tạo WebSocket
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
 
 # ====================== PHẦN 3: KHỞI TẠO CÁC COMPONENT ======================
-camera = Camera()
-detector = DiseaseDetector('model.tflite', 'labels.txt')
-sensor = DHT11Sensor(pin=17)
+camera = Camera(mode=app.config['CAMERA_MODE'], source=app.config['CAMERA_SOURCE'])
+detector_pool = DetectorPool('model.tflite', 'labels.txt',
+                             size=app.config['DETECTOR_POOL_SIZE'],
+                             num_threads=app.config['DETECTOR_NUM_THREADS'],
+                             backend=app.config['TFLITE_BACKEND'],
+                             lazy=True)
+inference_scheduler = InferenceScheduler(detector_pool,
+                                         window_ms=app.config['INFERENCE_BATCH_WINDOW_MS'],
+                                         max_batch=app.config['INFERENCE_MAX_BATCH'])
+result_cache = PerceptualResultCache(max_distance=app.config['RESULT_CACHE_MAX_DISTANCE'],
+                                     ttl=app.config['RESULT_CACHE_TTL'],
+                                     max_entries=app.config['RESULT_CACHE_MAX_ENTRIES'],
+                                     max_bytes=app.config['RESULT_CACHE_MAX_BYTES'])
+tiled_analyzer = TiledAnalyzer(detector_pool,
+                               tile_size=app.config['TILE_SIZE'],
+                               overlap=app.config['TILE_OVERLAP'],
+                               min_leaf=app.config['TILE_MIN_LEAF'],
+                               batch_size=app.config['INFERENCE_MAX_BATCH'])
+history = AnalysisHistory(os.path.join(app.config['DATA_FOLDER'], 'history.db'))
+# Index metadata ảnh chụp; lần chạy đầu dựng từ các file đã có trên đĩa
+capture_index = CaptureIndex(os.path.join(app.config['DATA_FOLDER'], 'captures.db'))
+capture_index.rebuild('daily', app.config['DAILY_CAPTURE_FOLDER'], '/daily_captures')
+capture_index.rebuild('manual', app.config['CAPTURE_FOLDER'], '/captures')
+thumbnails = ThumbnailService({'captures': app.config['CAPTURE_FOLDER'],
+                               'daily_captures': app.config['DAILY_CAPTURE_FOLDER'],
+                               'uploads': app.config['UPLOAD_FOLDER']},
+                              sizes=app.config['THUMB_SIZES'],
+                              formats=app.config['THUMB_FORMATS'],
+                              quality=app.config['THUMB_QUALITY'],
+                              cache_max_bytes=app.config['THUMB_CACHE_MAX_BYTES'])
+image_writer = ImageWriter(fmt=app.config['IMAGE_FORMAT'],
+                           quality=app.config['IMAGE_QUALITY'],
+                           max_queue=app.config['IMAGE_WRITER_QUEUE'])
+tta_analyzer = TTAAnalyzer(detector_pool, low=app.config['TTA_LOW'], high=app.config['TTA_HIGH'])
+upload_store = UploadStore(app.config['UPLOAD_FOLDER'],
+                           os.path.join(app.config['DATA_FOLDER'], 'uploads_index.jsonl'))
+sensor_store = SensorStore(os.path.join(app.config['DATA_FOLDER'], 'sensors.db'),
+                           raw_retention_days=app.config['SENSOR_RAW_RETENTION_DAYS'],
+                           max_points=app.config['SENSOR_HISTORY_MAX_POINTS'])
+sensor = SimulatedSensor() if app.config['SENSOR_BACKEND'] == 'simulated' else DHT11Sensor(pin=17)
+
+def emit_job_result(job):
+    """Đẩy kết quả job qua WebSocket (chỉ tới client gửi job nếu biết sid)"""
+    payload = {k: v for k, v in job.items() if k != 'sid'}
+    if job.get('sid'):
+        socketio.emit('job_result', payload, to=job['sid'])
+    else:
+        socketio.emit('job_result', payload)
+
+job_manager = JobManager(max_workers=app.config['JOB_WORKERS'], on_complete=emit_job_result)
 
 # ====================== PHẦN 4: BIẾN TOÀN CỤC ======================
-camera_lock = threading.Lock()
+# Một thread encode JPEG dùng chung cho tất cả client /video_feed
+broadcaster = MJPEGBroadcaster(camera,
+                               fps=app.config['STREAM_FPS'],
+                               quality=app.config['STREAM_JPEG_QUALITY'],
+                               max_queue=app.config['STREAM_CLIENT_QUEUE'],
+                               passthrough=app.config['STREAM_PASSTHROUGH'])
+
+def live_detect(frame):
+    """Nhận diện một frame live (dùng chung cache và scheduler với các luồng khác)"""
+    image_hash, results = result_cache.lookup(frame)
+    if results is None:
+        results = inference_scheduler.detect(frame, timeout=app.config['INFERENCE_TIMEOUT'])
+        if results is not None:
+            result_cache.put(image_hash, results)
+    return results
+
+def draw_live_overlay(frame):
+    """Vẽ kết quả live gần nhất lên frame stream (không chờ inference)"""
+    latest = live_inference.get_latest()
+    if latest is None:
+        return frame
+    return DiseaseDetector.draw_results(frame, latest['class_name'], latest['confidence'])
+
+def emit_live_result(result):
+    socketio.emit('live_result', {
+        'class_name': result['class_name'],
+        'confidence': result['confidence'],
+        'confidence_percent': result['confidence_percent'],
+        'is_valid_class': result['is_valid_class'],
+        'timestamp': datetime.fromtimestamp(result['timestamp']).strftime("%Y-%m-%d %H:%M:%S")
+    })
+
+live_inference = LiveInference(camera, live_detect,
+                               max_rate=app.config['LIVE_MAX_RATE'],
+                               cpu_budget=app.config['LIVE_CPU_BUDGET'],
+                               publish_interval=app.config['LIVE_PUBLISH_INTERVAL'],
+                               on_result=emit_live_result)
+
+def set_live_mode(enabled):
+    if enabled:
+        live_inference.start()
+        broadcaster.set_overlay(draw_live_overlay)
+    else:
+        broadcaster.set_overlay(None)
+        live_inference.stop()
 
 # Trạng thái hệ thống
 current_status = {
@@ -69,6 +259,10 @@ current_status = {
     }
 }
 
+# Gửi trạng thái qua WebSocket: delta có version, gộp các cập nhật trong STATUS_COALESCE_MS
+status_publisher = StatusPublisher(current_status, socketio.emit,
+                                   window=app.config['STATUS_COALESCE_MS'] / 1000)
+
 # Biến cho daily capture
 last_capture_date = None
 daily_capture_thread = None
@@ -86,9 +280,18 @@ DISEASE_ALERTS = [
 # CÁC TRẠNG THÁI KHÔNG PHẢI BỆNH
 HEALTHY_STATES = ["healthy", "no disease", "normal", "khỏe mạnh", "lành mạnh"]
 
+# Nguồn ảnh từ camera cố định: frame gần giống nhau là cùng một cảnh nên được dùng
+# cache perceptual hash. Ảnh upload/job là ảnh khác nhau của người dùng (đã dedup
+# SHA-256 khi upload) nên không dùng cache này
+CAMERA_SOURCES = ("manual_capture", "daily_capture", "change_trigger", "live")
+
 # ====================== PHẦN 5: HÀM TẠO VIDEO STREAM ======================
-def generate_frames():
-    """Tạo video stream KHÔNG CÓ nhận diện real-time"""
+def generate_frames(width=None, quality=None, fps=None, adaptive=False):
+    """
+    Tạo video stream MJPEG từ broadcaster
+    Stream không tự chạy model; khi bật chế độ live, frame được vẽ kèm
+    kết quả live gần nhất (draw_live_overlay) do live_inference tính trong nền
+    """
     def _make_placeholder(msg="NO CAMERA"):
         f = np.zeros((480, 640, 3), dtype=np.uint8)
         cv2.putText(f, msg, (30, 220), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
@@ -98,31 +301,15 @@ def generate_frames():
     # Ensure the generator is resilient to runtime errors: always yield at least
     # one frame (placeholder) and catch exceptions during streaming so the WSGI
     # server doesn't observe a write before start_response.
+    # Frame được encode một lần cho mỗi profile bởi broadcaster; mỗi client chỉ nhận bytes JPEG
+    subscriber = broadcaster.subscribe(width=width, quality=quality, fps=fps, adaptive=adaptive)
     try:
         yielded_once = False
         while True:
             try:
-                with camera_lock:
-                    frame = camera.get_frame()
-                    if frame is None:
-                        frame = np.zeros((480, 640, 3), dtype=np.uint8)
-                        cv2.putText(frame, "WEBCAM STREAM", (50, 200), 
-                                   cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-                        cv2.putText(frame, "Chỉ hiển thị video thô", (100, 250), 
-                                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 1)
-                        cv2.putText(frame, "Nhận diện: Chụp ảnh định kỳ & thủ công", (50, 300), 
-                                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 1)
-
-                    frame_resized = cv2.resize(frame, (640, 480))
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    cv2.putText(frame_resized, f"Live: {timestamp}", (10, 30), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-
-                    ret, buffer = cv2.imencode('.jpg', frame_resized)
-                    if not ret:
-                        frame_bytes = _make_placeholder("ENCODE ERROR")
-                    else:
-                        frame_bytes = buffer.tobytes()
+                frame_bytes = subscriber.get(timeout=2)
+                if frame_bytes is None:
+                    frame_bytes = _make_placeholder("NO FRAME")
 
                 yielded_once = True
                 yield (b'--frame\r\n'
@@ -147,15 +334,44 @@ def generate_frames():
         except Exception:
             pass
         return
+    finally:
+        broadcaster.unsubscribe(subscriber)
 
 # ====================== PHẦN 6: HÀM PHÂN TÍCH ẢNH CHUNG ======================
-def analyze_image(image, source="manual"):
+def analyze_image(image, source="manual", tiled=False, tta=None, image_path=None):
     """
     Phân tích ảnh và trả về kết quả chi tiết dạng JSON
+    tiled=True: chia ảnh độ phân giải cao thành tile, kèm heatmap trong results['tiling']
+    tta: None = tự chạy TTA khi kết quả không chắc chắn, True = luôn chạy, False = không chạy
+    image_path: đường dẫn ảnh đã lưu, ghi vào lịch sử phân tích
     """
     try:
-        # Phân tích ảnh bằng model
-        processed_frame, results = detector.detect(image)
+        if tiled:
+            # Ảnh lớn: phân tích từng tile (không qua cache perceptual hash)
+            results = tiled_analyzer.analyze(image)
+            if results is not None:
+                results['cache_hit'] = False
+        else:
+            # Frame camera gần giống frame đã phân tích thì dùng lại kết quả trong cache
+            # (chỉ khi TTA tự quyết; yêu cầu bật/tắt TTA tường minh luôn chạy model)
+            use_cache = source in CAMERA_SOURCES and tta is None
+            image_hash, results = result_cache.lookup(image) if use_cache else (None, None)
+            cache_hit = results is not None
+            if not cache_hit:
+                # Phân tích ảnh bằng model (qua scheduler gom batch)
+                results = inference_scheduler.detect(image, timeout=app.config['INFERENCE_TIMEOUT'])
+            if results is not None:
+                # Kết quả lưng chừng: chạy lại với các biến thể ảnh và lấy trung bình
+                # (kết quả trong cache có khóa 'tta' là đã chạy TTA, không chạy lại)
+                ran_tta = False
+                if 'tta' not in results and (tta or (tta is None and app.config['TTA_ENABLED']
+                                                     and tta_analyzer.should_run(results))):
+                    results = tta_analyzer.analyze(image, first_pass=results)
+                    ran_tta = True
+                if use_cache and (not cache_hit or ran_tta):
+                    # Cache giữ kết quả cuối cùng (sau TTA nếu có)
+                    result_cache.put(image_hash, results)
+                results['cache_hit'] = cache_hit
         
         if results is None:
             return {
@@ -218,8 +434,16 @@ def analyze_image(image, source="manual"):
         results['analysis_time'] = datetime.now().strftime("%H:%M:%S")
         results['image_size'] = f"{image.shape[1]}x{image.shape[0]}"
         results['source'] = source
+        results['mode'] = 'tiled' if tiled else 'single'
         results['success'] = True
         
+        # Ghi lịch sử (trong hàng đợi, thread nền ghi theo lô)
+        # Môi trường lấy từ mẫu cảm biến mới nhất; chưa có mẫu thì để NULL thay vì 0
+        sample = sensor_sampler.latest()
+        history.record(results, source, image_path=image_path,
+                       temperature=sample['temperature'] if sample else None,
+                       humidity=sample['humidity'] if sample else None)
+        
         return results
         
     except Exception as e:
@@ -237,6 +461,67 @@ def analyze_image(image, source="manual"):
         }
 
 # ====================== PHẦN 7: CHỤP ẢNH ĐỊNH KỲ ======================
+def save_capture(frame, kind, stem):
+    """
+    Gửi ảnh chụp cho image_writer ghi nền (kind: 'daily', 'manual' hoặc 'auto')
+    Trả về ngay (tên file tương đối YYYY/MM/DD/..., URL). Ảnh có trong index ngay khi vào hàng đợi;
+    ghi xong thì cập nhật kích thước, tạo thumbnail và gửi 'capture_saved' để dashboard tải lại lưới ảnh
+    Ảnh 'auto' (trigger thay đổi cảnh) nằm chung thư mục và lưới với ảnh chụp thủ công
+    """
+    thumb_kind, url_prefix = ('daily_captures', '/daily_captures') if kind == 'daily' else ('captures', '/captures')
+    kind = 'daily' if kind == 'daily' else 'manual'
+    
+    def on_written(filename, filepath):
+        capture_index.add(kind, filename, f'{url_prefix}/{filename}', filepath)
+        thumbnails.generate_async(thumb_kind, filename, frame)
+        socketio.emit('capture_saved', {'kind': kind, 'filename': filename, 'path': f'{url_prefix}/{filename}'})
+    
+    filename, _ = image_writer.submit(frame, thumbnails.folders[thumb_kind], stem, on_written=on_written)
+    capture_index.add(kind, filename, f'{url_prefix}/{filename}')
+    return filename, f'{url_prefix}/{filename}'
+
+def emit_capture_alert(response_data, title, message):
+    """Gửi cảnh báo bệnh nếu kết quả chụp vượt ngưỡng thông báo"""
+    results = response_data['results']
+    threshold = current_status.get('notification_threshold', 0.6)
+    if results['type'] == 'disease' and results['confidence'] > threshold:
+        socketio.emit('disease_alert', {
+            'type': 'warning',
+            'title': title,
+            'message': message,
+            'disease': results['class_name'],
+            'confidence': results['confidence'],
+            'timestamp': response_data['timestamp'],
+            'source': response_data['source'],
+            'severity': results.get('severity', 'medium'),
+            'latest': result_summary(response_data)
+        })
+        return True
+    return False
+
+def notify_daily_capture(response_data):
+    """Giai đoạn thông báo của chụp định kỳ (chạy trong thread nền của capture_pipeline)"""
+    results = response_data['results']
+    # Gửi kết quả chi tiết qua WebSocket (JSON đầy đủ)
+    socketio.emit('daily_capture_result', response_data)
+    # Gửi cập nhật trạng thái
+    status_publisher.publish()
+    # Nếu phát hiện bệnh và vượt ngưỡng, gửi cảnh báo
+    if emit_capture_alert(response_data, 'CẢNH BÁO TỰ ĐỘNG HÀNG NGÀY',
+                          f"Phát hiện: {results['class_name']} ({results['confidence']:.1%})"):
+        print(f"[DAILY CAPTURE ALERT] Phát hiện bệnh: {results['class_name']}")
+
+def notify_manual_capture(response_data):
+    """Giai đoạn thông báo của chụp thủ công (chạy trong thread nền của capture_pipeline)"""
+    results = response_data['results']
+    status_publisher.publish()
+    # Kiểm tra ngưỡng để gửi thông báo
+    emit_capture_alert(response_data, 'PHÁT HIỆN BỆNH TỪ ẢNH CHỤP THỦ CÔNG',
+                       f"{results['class_name']} - Độ tin cậy: {results['confidence']:.1%}")
+
+# Chụp ảnh không giữ khóa camera: snapshot -> lưu nền + phân tích -> thông báo nền
+capture_pipeline = CapturePipeline(camera, save_capture, analyze_image)
+
 def perform_daily_capture():
     """
     Chụp ảnh và phân tích định kỳ mỗi ngày
@@ -254,106 +539,69 @@ def perform_daily_capture():
     try:
         print(f"[DAILY CAPTURE] Bắt đầu chụp ảnh định kỳ ngày {today}")
         
-        with camera_lock:
-            frame = camera.get_frame()
-            if frame is None:
-                error_result = {
-                    'success': False,
-                    'error': 'Không thể truy cập camera',
-                    'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S"),
-                    'message': 'Lỗi: Camera không khả dụng'
-                }
-                socketio.emit('daily_capture_result', error_result)
-                return
-            
-            # Tạo tên file
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"daily_{timestamp}.jpg"
-            filepath = os.path.join(app.config['DAILY_CAPTURE_FOLDER'], filename)
-            
-            # Lưu ảnh
-            cv2.imwrite(filepath, frame)
-            print(f"[DAILY CAPTURE] Đã lưu ảnh: {filename}")
-            
-            # PHÂN TÍCH ẢNH
-            results = analyze_image(frame, source="daily_capture")
-            
-            # Tạo kết quả trả về đầy đủ
-            response_data = {
-                'success': True,
-                'filename': filename,
-                'path': f'/daily_captures/{filename}',
-                'results': results,
-                'timestamp': timestamp,
-                'analysis_time': datetime.now().strftime("%H:%M:%S"),
-                'message': 'Đã hoàn thành chụp ảnh định kỳ hàng ngày',
-                'source': 'daily_capture'
+        # Snapshot frame rồi lưu + phân tích ngoài mọi khóa camera (stream không bị dừng)
+        capture = capture_pipeline.capture('daily', source="daily_capture")
+        if capture is None:
+            error_result = {
+                'success': False,
+                'error': 'Không thể truy cập camera',
+                'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S"),
+                'message': 'Lỗi: Camera không khả dụng'
             }
+            socketio.emit('daily_capture_result', error_result)
+            return
+        
+        results = capture['results']
+        
+        # Tạo kết quả trả về đầy đủ
+        response_data = {
+            'success': True,
+            **capture,
+            'message': 'Đã hoàn thành chụp ảnh định kỳ hàng ngày'
+        }
 
-            # Lưu kết quả chụp định kỳ gần nhất (thread-safe)
-            try:
-                with daily_response_lock:
-                    globals()['last_daily_response'] = response_data
-            except Exception:
-                pass
-            
-            # Cập nhật trạng thái hệ thống
-            current_status['last_daily_capture'] = timestamp
-            current_status['last_update'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Cập nhật kết quả phân tích mới nhất
-            current_status['latest_analysis'] = {
-                "type": results['type'],
-                "disease_name": results['class_name'],
-                "confidence": results['confidence'],
-                "timestamp": timestamp,
-                "source": "daily_capture"
-            }
-            
-            if results['type'] == 'disease':
-                current_status['disease_detected'] = True
-                current_status['disease_name'] = results['class_name']
-                current_status['confidence'] = results['confidence']
-                current_status['system_status'] = f"⚠️ Phát hiện bệnh từ chụp định kỳ"
-            else:
-                current_status['disease_detected'] = False
-                current_status['system_status'] = "🌱 Không phát hiện bệnh"
-            
-            # Cập nhật ngày chụp cuối
-            last_capture_date = today
-            
-            # Cập nhật lịch chụp tiếp theo
-            next_capture_time = datetime.now() + timedelta(days=1)
-            next_capture_time = next_capture_time.replace(hour=8, minute=0, second=0)
-            current_status['next_daily_capture'] = next_capture_time.strftime("%Y-%m-%d %H:%M")
-            
-            # Gửi kết quả chi tiết qua WebSocket (JSON đầy đủ)
-            socketio.emit('daily_capture_result', response_data)
-            
-            # Gửi cập nhật trạng thái
-            socketio.emit('status_update', current_status)
-            
-            # Nếu phát hiện bệnh và vượt ngưỡng, gửi cảnh báo
-            threshold = current_status.get('notification_threshold', 0.6)
-            if (results['type'] == 'disease' and 
-                results['confidence'] > threshold):
-                
-                socketio.emit('disease_alert', {
-                    'type': 'warning',
-                    'title': 'CẢNH BÁO TỰ ĐỘNG HÀNG NGÀY',
-                    'message': f"Phát hiện: {results['class_name']} ({results['confidence']:.1%})",
-                    'disease': results['class_name'],
-                    'confidence': results['confidence'],
-                    'timestamp': timestamp,
-                    'source': 'daily_capture',
-                    'severity': results.get('severity', 'medium'),
-                    'full_results': response_data  # Gửi cả kết quả đầy đủ
-                })
-                
-                print(f"[DAILY CAPTURE ALERT] Phát hiện bệnh: {results['class_name']}")
-            
-            print(f"[DAILY CAPTURE] Hoàn thành: {results['class_name']} ({results['confidence']:.1%})")
-            return response_data
+        # Lưu kết quả chụp định kỳ gần nhất (thread-safe)
+        try:
+            with daily_response_lock:
+                globals()['last_daily_response'] = response_data
+        except Exception:
+            pass
+        
+        # Cập nhật trạng thái hệ thống
+        current_status['last_daily_capture'] = capture['timestamp']
+        current_status['last_update'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Cập nhật kết quả phân tích mới nhất
+        current_status['latest_analysis'] = {
+            "type": results['type'],
+            "disease_name": results['class_name'],
+            "confidence": results['confidence'],
+            "timestamp": capture['timestamp'],
+            "source": "daily_capture"
+        }
+        
+        if results['type'] == 'disease':
+            current_status['disease_detected'] = True
+            current_status['disease_name'] = results['class_name']
+            current_status['confidence'] = results['confidence']
+            current_status['system_status'] = f"⚠️ Phát hiện bệnh từ chụp định kỳ"
+        else:
+            current_status['disease_detected'] = False
+            current_status['system_status'] = "🌱 Không phát hiện bệnh"
+        
+        # Cập nhật ngày chụp cuối
+        last_capture_date = today
+        
+        # Cập nhật lịch chụp tiếp theo
+        next_capture_time = datetime.now() + timedelta(days=1)
+        next_capture_time = next_capture_time.replace(hour=8, minute=0, second=0)
+        current_status['next_daily_capture'] = next_capture_time.strftime("%Y-%m-%d %H:%M")
+        
+        # Gửi kết quả qua WebSocket trong thread nền
+        capture_pipeline.publish(notify_daily_capture, response_data)
+        
+        print(f"[DAILY CAPTURE] Hoàn thành: {results['class_name']} ({results['confidence']:.1%})")
+        return response_data
             
     except Exception as e:
         print(f"[DAILY CAPTURE ERROR] Lỗi: {e}")
@@ -372,6 +620,62 @@ def perform_daily_capture():
         socketio.emit('daily_capture_result', error_result)
         return error_result
 
+def notify_change_capture(response_data):
+    """Giai đoạn thông báo của chụp khi cảnh thay đổi (chạy trong thread nền của capture_pipeline)"""
+    results = response_data['results']
+    socketio.emit('change_capture_result', response_data)
+    status_publisher.publish()
+    emit_capture_alert(response_data, 'PHÁT HIỆN BỆNH KHI CẢNH THAY ĐỔI',
+                       f"{results['class_name']} - Độ tin cậy: {results['confidence']:.1%}")
+
+def perform_change_capture(frame, reason):
+    """
+    Chụp (lưu vào thư viện ảnh) và phân tích frame khi cảnh thay đổi (hoặc kết quả đã quá cũ)
+    Trả về kết quả qua WebSocket
+    """
+    try:
+        capture = capture_pipeline.capture('auto', source="change_trigger", frame=frame)
+        results = capture['results']
+        if not results.get('success'):
+            return
+        
+        response_data = {
+            'success': True,
+            **capture,
+            'reason': reason,
+            'message': 'Đã chụp và phân tích khi cảnh thay đổi'
+        }
+        
+        current_status['latest_analysis'] = {
+            "type": results['type'],
+            "disease_name": results['class_name'],
+            "confidence": results['confidence'],
+            "timestamp": capture['timestamp'],
+            "source": "change_trigger"
+        }
+        if results['type'] == 'disease':
+            current_status['disease_detected'] = True
+            current_status['disease_name'] = results['class_name']
+            current_status['confidence'] = results['confidence']
+            current_status['system_status'] = f"⚠️ Phát hiện bệnh khi cảnh thay đổi"
+        else:
+            current_status['disease_detected'] = False
+            current_status['system_status'] = "🌱 Không phát hiện bệnh"
+        current_status['last_update'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Gửi kết quả và cảnh báo trong thread nền
+        capture_pipeline.publish(notify_change_capture, response_data)
+        
+        print(f"[CHANGE TRIGGER] ({reason}) {capture['filename']}: {results['class_name']} ({results['confidence']:.1%})")
+    except Exception as e:
+        print(f"[CHANGE TRIGGER ERROR] Lỗi chụp/phân tích: {e}")
+
+change_trigger = ChangeTrigger(camera, perform_change_capture,
+                               check_interval=app.config['CHANGE_CHECK_INTERVAL'],
+                               min_interval=app.config['CHANGE_MIN_INTERVAL'],
+                               max_interval=app.config['CHANGE_MAX_INTERVAL'],
+                               detector=ChangeDetector(threshold=app.config['CHANGE_THRESHOLD']))
+
 def schedule_daily_capture():
     """Lên lịch chụp ảnh hàng ngày"""
     global daily_capture_thread
@@ -391,38 +695,39 @@ def schedule_daily_capture():
     
     daily_capture_thread = threading.Thread(target=run_scheduler, daemon=True)
     daily_capture_thread.start()
+    
+    # Trigger thứ hai: phân tích khi cảnh thay đổi
+    if app.config['CHANGE_TRIGGER']:
+        change_trigger.start()
+        print(f"[SCHEDULER] Đã bật phân tích khi cảnh thay đổi (ngưỡng {app.config['CHANGE_THRESHOLD']:.0%})")
 
 # ====================== PHẦN 8: LUỒNG ĐỌC CẢM BIẾN ======================
-def sensor_reader():
-    """Luồng độc lập đọc cảm biến DHT11"""
-    time.sleep(2)
+def handle_sensor_sample(sample):
+    """Xử lý mẫu cảm biến mới (chạy trong thread của sensor_sampler)"""
+    temp, humidity = sample['temperature'], sample['humidity']
+    sensor_store.record(sample['timestamp'], temp, humidity)
+    current_status['temperature'] = temp
+    current_status['humidity'] = humidity
+    current_status['last_update'] = datetime.fromtimestamp(sample['timestamp']).strftime("%Y-%m-%d %H:%M:%S")
     
-    while True:
-        try:
-            temp, humidity = sensor.read()
-            
-            if temp is not None and humidity is not None:
-                current_status['temperature'] = temp
-                current_status['humidity'] = humidity
-                current_status['last_update'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                
-                socketio.emit('sensor_update', {
-                    'temperature': temp,
-                    'humidity': humidity,
-                    'timestamp': current_status['last_update']
-                })
-                
-                if temp > 35 or humidity > 85:
-                    current_status['system_status'] = "🌡️ Cảnh báo: Điều kiện môi trường không tối ưu"
-                elif not current_status['disease_detected']:
-                    current_status['system_status'] = "🌱 Hệ thống hoạt động bình thường"
-                
-                socketio.emit('status_update', current_status)
-                
-        except Exception as e:
-            print(f"[ERROR] Lỗi đọc cảm biến: {e}")
-        
-        time.sleep(10)
+    socketio.emit('sensor_update', {
+        'temperature': temp,
+        'humidity': humidity,
+        'timestamp': current_status['last_update']
+    })
+    
+    if temp > 35 or humidity > 85:
+        current_status['system_status'] = "🌡️ Cảnh báo: Điều kiện môi trường không tối ưu"
+    elif not current_status['disease_detected']:
+        current_status['system_status'] = "🌱 Hệ thống hoạt động bình thường"
+    
+    status_publisher.publish()
+
+# Thread duy nhất đọc cảm biến; mọi nơi khác chỉ đọc mẫu mới nhất từ ring buffer
+sensor_sampler = SensorSampler(sensor,
+                               interval=app.config['SENSOR_INTERVAL'],
+                               capacity=app.config['SENSOR_BUFFER_SIZE'],
+                               on_sample=handle_sensor_sample)
 
 # ====================== PHẦN 9: CÁC ROUTE API (TRẢ VỀ JSON ĐẦY ĐỦ) ======================
 
@@ -432,7 +737,15 @@ def index():
 
 @app.route('/video_feed')
 def video_feed():
-    return Response(generate_frames(),
+    """
+    Video stream MJPEG
+    Tham số tùy chọn: ?width=320&quality=50&fps=5&adaptive=1
+    """
+    adaptive = request.args.get('adaptive')
+    return Response(generate_frames(width=request.args.get('width', type=int),
+                                    quality=request.args.get('quality', type=int),
+                                    fps=request.args.get('fps', type=float),
+                                    adaptive=app.config['STREAM_ADAPTIVE'] if adaptive is None else adaptive in ('1', 'true')),
                     mimetype='multipart/x-mixed-replace; boundary=frame')
 
 @app.route('/capture', methods=['POST'])
@@ -442,79 +755,49 @@ def capture_image():
     TRẢ VỀ: JSON với kết quả chi tiết
     """
     try:
-        with camera_lock:
-            frame = camera.get_frame()
-            if frame is None:
-                return jsonify({
-                    'success': False,
-                    'error': 'Không thể truy cập camera',
-                    'message': 'Kiểm tra kết nối camera và thử lại'
-                }), 400
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"manual_{timestamp}.jpg"
-            filepath = os.path.join(app.config['CAPTURE_FOLDER'], filename)
-            
-            cv2.imwrite(filepath, frame)
-            print(f"[MANUAL CAPTURE] Đã lưu ảnh: {filename}")
-            
-            # PHÂN TÍCH ẢNH VÀ TRẢ VỀ KẾT QUẢ CHI TIẾT
-            results = analyze_image(frame, source="manual_capture")
-            
-            # Tạo response data đầy đủ
-            response_data = {
-                'success': True,
-                'filename': filename,
-                'path': f'/captures/{filename}',
-                'results': results,
-                'timestamp': timestamp,
-                'analysis_time': datetime.now().strftime("%H:%M:%S"),
-                'message': 'Chụp ảnh và phân tích thành công!',
-                'source': 'manual_capture'
-            }
-            
-            # Cập nhật trạng thái hệ thống
-            current_status['latest_analysis'] = {
-                "type": results['type'],
-                "disease_name": results['class_name'],
-                "confidence": results['confidence'],
-                "timestamp": timestamp,
-                "source": "manual_capture"
-            }
-            
-            if results['type'] == 'disease':
-                current_status['disease_detected'] = True
-                current_status['disease_name'] = results['class_name']
-                current_status['confidence'] = results['confidence']
-                current_status['system_status'] = f"⚠️ Phát hiện bệnh từ ảnh chụp"
-            else:
-                current_status['disease_detected'] = False
-                current_status['system_status'] = "🌱 Không phát hiện bệnh"
-            
-            current_status['last_update'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Gửi cập nhật qua WebSocket
-            socketio.emit('status_update', current_status)
-            
-            # Kiểm tra ngưỡng để gửi thông báo
-            threshold = current_status.get('notification_threshold', 0.6)
-            if (results['type'] == 'disease' and 
-                results['confidence'] > threshold):
-                
-                socketio.emit('disease_alert', {
-                    'type': 'warning',
-                    'title': 'PHÁT HIỆN BỆNH TỪ ẢNH CHỤP THỦ CÔNG',
-                    'message': f"{results['class_name']} - Độ tin cậy: {results['confidence']:.1%}",
-                    'disease': results['class_name'],
-                    'confidence': results['confidence'],
-                    'timestamp': timestamp,
-                    'source': 'manual_capture',
-                    'severity': results.get('severity', 'medium'),
-                    'full_results': response_data  # Gửi cả kết quả đầy đủ
-                })
-            
-            print(f"[MANUAL CAPTURE RESULT] {results['class_name']} ({results['confidence']:.1%})")
-            return jsonify(response_data)
+        # Snapshot frame rồi lưu + phân tích ngoài mọi khóa camera (stream không bị dừng)
+        capture = capture_pipeline.capture('manual', source="manual_capture")
+        if capture is None:
+            return jsonify({
+                'success': False,
+                'error': 'Không thể truy cập camera',
+                'message': 'Kiểm tra kết nối camera và thử lại'
+            }), 400
+        
+        results = capture['results']
+        
+        # Tạo response data đầy đủ
+        response_data = {
+            'success': True,
+            **capture,
+            'message': 'Chụp ảnh và phân tích thành công!'
+        }
+        
+        # Cập nhật trạng thái hệ thống
+        current_status['latest_analysis'] = {
+            "type": results['type'],
+            "disease_name": results['class_name'],
+            "confidence": results['confidence'],
+            "timestamp": capture['timestamp'],
+            "source": "manual_capture"
+        }
+        
+        if results['type'] == 'disease':
+            current_status['disease_detected'] = True
+            current_status['disease_name'] = results['class_name']
+            current_status['confidence'] = results['confidence']
+            current_status['system_status'] = f"⚠️ Phát hiện bệnh từ ảnh chụp"
+        else:
+            current_status['disease_detected'] = False
+            current_status['system_status'] = "🌱 Không phát hiện bệnh"
+        
+        current_status['last_update'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Gửi cập nhật qua WebSocket trong thread nền
+        capture_pipeline.publish(notify_manual_capture, response_data)
+        
+        print(f"[MANUAL CAPTURE RESULT] {results['class_name']} ({results['confidence']:.1%})")
+        return jsonify(response_data)
             
     except Exception as e:
         print(f"[ERROR] Lỗi khi chụp ảnh: {e}")
@@ -612,7 +895,7 @@ def toggle_daily_capture():
             current_status['next_daily_capture'] = ''
             message = 'Đã tắt chụp ảnh định kỳ hàng ngày'
         
-        socketio.emit('status_update', current_status)
+        status_publisher.publish()
         
         return jsonify({
             'success': True,
@@ -627,6 +910,30 @@ def toggle_daily_capture():
             'message': 'Có lỗi xảy ra khi thay đổi cài đặt'
         }), 500
 
+@app.route('/toggle_live_mode', methods=['POST'])
+def toggle_live_mode():
+    """
+    Bật/tắt nhận diện live trên video stream
+    TRẢ VỀ: JSON với kết quả
+    """
+    try:
+        data = request.get_json() or {}
+        enabled = bool(data.get('enabled', True))
+        set_live_mode(enabled)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Đã bật nhận diện live' if enabled else 'Đã tắt nhận diện live',
+            'enabled': enabled,
+            'live_inference': live_inference.get_stats()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'Có lỗi xảy ra khi thay đổi cài đặt'
+        }), 500
+
 @app.route('/upload', methods=['POST'])
 def upload_image():
     """
@@ -649,12 +956,37 @@ def upload_image():
         }), 400
     
     try:
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        print(f"[UPLOAD] Đã lưu file: {filename}")
+        timings = {}
+        stage_start = time.perf_counter()
+        tiled = get_analysis_mode() == 'tiled'
+        
+        # Đọc file vào bộ nhớ, tính SHA-256 trong lúc đọc
+        data, digest = upload_store.read_stream(file.stream)
+        timings['read_ms'] = (time.perf_counter() - stage_start) * 1000
         
-        image = cv2.imread(filepath)
+        # Ảnh đã upload (cùng chế độ phân tích) trước đó: không ghi đĩa, không nhận diện lại
+        entry = upload_store.lookup(digest, 'tiled' if tiled else 'single')
+        if entry is not None:
+            print(f"[UPLOAD] Ảnh trùng với {entry['filename']}, dùng lại kết quả")
+            return jsonify({
+                'success': True,
+                'duplicate': True,
+                'filename': entry['filename'],
+                'path': f"/uploads/{entry['filename']}",
+                'results': entry['results'],
+                'sha256': digest,
+                'first_uploaded': entry['created'],
+                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'message': 'Ảnh đã được phân tích trước đó, trả về kết quả đã lưu',
+                'source': 'upload'
+            })
+        
+        # Giải mã trong bộ nhớ, giảm độ phân giải theo input của model
+        # (chế độ tile cần đủ độ phân giải gốc nên giải mã đầy đủ)
+        stage_start = time.perf_counter()
+        target_size = None if tiled else (detector_pool.input_width, detector_pool.input_height)
+        image, decode_info = decode_image(data, target_size)
+        timings['decode_ms'] = (time.perf_counter() - stage_start) * 1000
         if image is None:
             return jsonify({
                 'success': False,
@@ -662,17 +994,32 @@ def upload_image():
                 'message': 'File không phải là ảnh hợp lệ hoặc đã bị hỏng'
             }), 400
         
+        # Ghi file gốc trong nền, không chặn response
+        filename = upload_store.filename_for(digest, data)
+        upload_store.save_async(filename, data)
+        thumbnails.generate_async('uploads', filename, image)
+        
         # PHÂN TÍCH ẢNH VÀ TRẢ VỀ KẾT QUẢ CHI TIẾT
-        results = analyze_image(image, source="upload")
+        stage_start = time.perf_counter()
+        results = analyze_image(image, source="upload", tiled=tiled, tta=get_tta_option(),
+                                image_path=f'/uploads/{filename}')
+        timings['inference_ms'] = (time.perf_counter() - stage_start) * 1000
+        if results.get('success'):
+            upload_store.record(digest, filename, file.filename, results)
         
         # Tạo response data đầy đủ
         response_data = {
             'success': True,
+            'duplicate': False,
             'filename': filename,
             'path': f'/uploads/{filename}',
+            'sha256': digest,
             'results': results,
             'analysis_details': {
-                'image_size': f"{image.shape[1]}x{image.shape[0]}",
+                'image_size': decode_info['original_size'] or f"{image.shape[1]}x{image.shape[0]}",
+                'decoded_size': decode_info['decoded_size'],
+                'decode_reduction': decode_info['reduction'],
+                'mode': results.get('mode', 'single'),
                 'model_used': 'TensorFlow Lite',
                 'analysis_time': datetime.now().strftime("%H:%M:%S"),
                 'confidence_threshold': f'{current_status["notification_threshold"]*100}%'
@@ -703,7 +1050,7 @@ def upload_image():
         current_status['last_update'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         # Gửi cập nhật qua WebSocket
-        socketio.emit('status_update', current_status)
+        status_publisher.publish()
         
         # Kiểm tra ngưỡng để gửi thông báo
         threshold = current_status.get('notification_threshold', 0.6)
@@ -719,10 +1066,14 @@ def upload_image():
                 'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 'source': 'upload',
                 'severity': results.get('severity', 'medium'),
-                'full_results': response_data  # Gửi cả kết quả đầy đủ
+                'latest': result_summary(response_data)
             })
         
-        print(f"[UPLOAD RESULT] {results['class_name']} ({results['confidence']:.1%})")
+        timings['total_ms'] = sum(timings.values())
+        response_data['timings'] = {k: round(v, 2) for k, v in timings.items()}
+        print(f"[UPLOAD RESULT] {results['class_name']} ({results['confidence']:.1%}) - "
+              f"đọc {timings['read_ms']:.1f}ms, giải mã 1/{decode_info['reduction']} {timings['decode_ms']:.1f}ms, "
+              f"nhận diện {timings['inference_ms']:.1f}ms")
         return jsonify(response_data)
         
     except Exception as e:
@@ -733,6 +1084,118 @@ def upload_image():
             'message': 'Có lỗi xảy ra khi xử lý file ảnh'
         }), 500
 
+def get_analysis_mode():
+    """Chế độ phân tích của request upload: 'single' (mặc định) hoặc 'tiled'"""
+    mode = request.form.get('mode') or request.args.get('mode') or 'single'
+    return 'tiled' if mode == 'tiled' else 'single'
+
+def get_tta_option():
+    """?tta=1 luôn chạy TTA, ?tta=0 không chạy, không truyền thì tự quyết theo độ tin cậy"""
+    value = request.form.get('tta') or request.args.get('tta')
+    if value is None:
+        return None
+    return value in ('1', 'true')
+
+def run_analysis_job(data, digest, filename, original_name, tiled=False):
+    """Job nền: giải mã, lưu và phân tích ảnh upload"""
+    # Ảnh trùng nội dung (cùng chế độ phân tích): trả lại kết quả đã lưu
+    entry = upload_store.lookup(digest, 'tiled' if tiled else 'single')
+    if entry is not None:
+        print(f"[JOB] Ảnh trùng với {entry['filename']}, dùng lại kết quả")
+        return entry['results']
+    
+    target_size = None if tiled else (detector_pool.input_width, detector_pool.input_height)
+    image, _ = decode_image(data, target_size)
+    if image is None:
+        raise ValueError('File không phải là ảnh hợp lệ hoặc đã bị hỏng')
+    
+    upload_store.save_async(filename, data)
+    thumbnails.generate_async('uploads', filename, image)
+    
+    results = analyze_image(image, source="job", tiled=tiled, image_path=f'/uploads/{filename}')
+    if results.get('success'):
+        upload_store.record(digest, filename, original_name, results)
+    
+    # Cập nhật trạng thái hệ thống
+    current_status['latest_analysis'] = {
+        "type": results['type'],
+        "disease_name": results['class_name'],
+        "confidence": results['confidence'],
+        "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
+        "source": "job"
+    }
+    if results['type'] == 'disease':
+        current_status['disease_detected'] = True
+        current_status['disease_name'] = results['class_name']
+        current_status['confidence'] = results['confidence']
+        current_status['system_status'] = f"⚠️ Phát hiện bệnh từ upload"
+    else:
+        current_status['disease_detected'] = False
+        current_status['system_status'] = "🌱 Không phát hiện bệnh"
+    current_status['last_update'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    status_publisher.publish()
+    
+    print(f"[JOB RESULT] {results['class_name']} ({results['confidence']:.1%})")
+    return results
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """
+    Nhận ảnh, đưa vào hàng đợi phân tích và trả về job_id ngay
+    TRẢ VỀ: JSON với job_id (kết quả gửi qua sự kiện 'job_result')
+    """
+    file = request.files.get('file')
+    if file is None or file.filename == '':
+        return jsonify({
+            'success': False,
+            'error': 'Không có file được chọn',
+            'message': 'Vui lòng chọn file ảnh trước khi upload'
+        }), 400
+    
+    try:
+        data, digest = upload_store.read_stream(file.stream)
+        filename = upload_store.filename_for(digest, data)
+        
+        tiled = get_analysis_mode() == 'tiled'
+        
+        job = job_manager.submit(run_analysis_job, data, digest, filename, file.filename, tiled,
+                                 filename=filename,
+                                 sha256=digest,
+                                 path=f'/uploads/{filename}',
+                                 sid=request.form.get('sid'))
+        return jsonify({
+            'success': True,
+            'job_id': job['job_id'],
+            'status': job['status'],
+            'status_url': f"/jobs/{job['job_id']}",
+            'message': 'Đã nhận ảnh, đang chờ phân tích'
+        }), 202
+    except Exception as e:
+        print(f"[ERROR] Lỗi khi tạo job: {e}")
+        return jsonify({
+            'success': False,
+            'error': f'Lỗi tạo job: {str(e)}',
+            'message': 'Có lỗi xảy ra khi nhận file ảnh'
+        }), 500
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """
+    Lấy trạng thái job phân tích
+    TRẢ VỀ: JSON với status (queued/running/done/failed) và kết quả nếu xong
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Không tìm thấy job',
+            'message': f'Job {job_id} không tồn tại hoặc đã hết hạn'
+        }), 404
+    
+    job.pop('sid', None)
+    job['success'] = job['status'] != 'failed'
+    return jsonify(job)
+
 @app.route('/update_threshold', methods=['POST'])
 def update_threshold():
     """
@@ -747,7 +1210,7 @@ def update_threshold():
             current_status['notification_threshold'] = new_threshold
             print(f"[SYSTEM] Đã cập nhật ngưỡng tin cậy: {new_threshold*100}%")
             
-            socketio.emit('status_update', current_status)
+            status_publisher.publish()
             
             return jsonify({
                 'success': True,
@@ -780,30 +1243,127 @@ def get_status():
         'data': current_status,
         'system_info': {
             'camera_status': 'Hoạt động' if camera.running else 'Lỗi',
-            'model_loaded': detector.model_loaded,
-            'sensor_connected': sensor.dht_device is not None,
-            'labels_count': len(detector.labels) if detector.labels else 0,
-            'stream_mode': 'Video thô (không nhận diện real-time)',
+            'model_loaded': detector_pool.model_loaded,
+            'sensor_connected': sensor.connected,
+            'labels_count': len(detector_pool.labels) if detector_pool.labels else 0,
+            'detector_pool': detector_pool.get_stats(),
+            'inference_scheduler': inference_scheduler.get_stats(),
+            'jobs': job_manager.get_stats(),
+            'result_cache': result_cache.get_stats(),
+            'upload_store': upload_store.get_stats(),
+            'tiled_analysis': tiled_analyzer.get_stats(),
+            'tta': tta_analyzer.get_stats(),
+            'history': history.get_stats(),
+            'thumbnails': thumbnails.get_stats(),
+            'image_writer': image_writer.get_stats(),
+            'capture_pipeline': capture_pipeline.get_stats(),
+            'stream': broadcaster.get_stats(),
+            'sensor': sensor_sampler.get_stats(),
+            'sensor_history': sensor_store.get_stats(),
+            'status_publisher': status_publisher.get_stats(),
+            'live_inference': live_inference.get_stats(),
+            'change_trigger': change_trigger.get_stats(),
+            'stream_mode': 'Nhận diện live' if live_inference.enabled else 'Video thô (không nhận diện real-time)',
             'daily_capture_mode': 'Hoạt động' if current_status['daily_capture_enabled'] else 'Tắt',
             'server_time': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
     })
 
+@app.route('/history')
+def get_history():
+    """
+    Lịch sử phân tích, mới nhất trước
+    Tham số: from, to (YYYY-MM-DD hoặc YYYY-MM-DD HH:MM:SS), class, source,
+    limit (tối đa 200), cursor (lấy từ next_cursor của trang trước)
+    TRẢ VỀ: JSON với danh sách bản ghi và next_cursor
+    """
+    try:
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+        items, next_cursor = history.query(start=parse_time(request.args.get('from')),
+                                           end=parse_time(request.args.get('to'), end_of_day=True),
+                                           class_name=request.args.get('class'),
+                                           source=request.args.get('source'),
+                                           limit=limit,
+                                           cursor=request.args.get('cursor'))
+        return jsonify({
+            'success': True,
+            'count': len(items),
+            'items': items,
+            'next_cursor': next_cursor
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'Tham số không hợp lệ (ngày dạng YYYY-MM-DD)'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'Có lỗi xảy ra khi đọc lịch sử'
+        }), 500
+
+@app.route('/sensor_history')
+def get_sensor_history():
+    """
+    Lịch sử nhiệt độ/độ ẩm, cũ trước
+    Tham số: from, to (YYYY-MM-DD hoặc YYYY-MM-DD HH:MM:SS, mặc định 24 giờ gần nhất),
+    resolution (raw, minute, hour, day hoặc auto - chọn mức mịn nhất đủ số điểm tối đa)
+    TRẢ VỀ: JSON với resolution đã dùng và danh sách điểm (min/max/avg với các mức tổng hợp)
+    """
+    try:
+        resolution = request.args.get('resolution', 'auto')
+        if resolution not in ('auto', 'raw', *RESOLUTIONS):
+            raise ValueError(f"resolution không hợp lệ: {resolution}")
+        end = parse_time(request.args.get('to'), end_of_day=True) or time.time()
+        start = parse_time(request.args.get('from'))
+        if start is None:
+            start = end - 86400
+        resolution, points, truncated = sensor_store.query(start, end, resolution)
+        return jsonify({
+            'success': True,
+            'resolution': resolution,
+            'count': len(points),
+            'truncated': truncated,
+            'points': points
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'Tham số không hợp lệ (ngày dạng YYYY-MM-DD, resolution: auto, raw, minute, hour, day)'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'Có lỗi xảy ra khi đọc lịch sử cảm biến'
+        }), 500
+
 @app.route('/get_sensor_data')
 def get_sensor_data():
     """
-    Đọc cảm biến ngay lập tức
-    TRẢ VỀ: JSON với dữ liệu cảm biến
+    Dữ liệu cảm biến mới nhất (đọc từ buffer của sensor_sampler, không chờ cảm biến)
+    TRẢ VỀ: JSON với dữ liệu cảm biến và tuổi của mẫu (giây)
     """
     try:
-        temp, humidity = sensor.read()
+        sample = sensor_sampler.latest()
+        if sample is None:
+            return jsonify({
+                'success': False,
+                'error': 'Chưa có dữ liệu cảm biến',
+                'message': 'Cảm biến chưa đọc được mẫu nào'
+            }), 503
+        temp, humidity = sample['temperature'], sample['humidity']
         return jsonify({
             'success': True,
-            'temperature': temp if temp is not None else 0,
-            'humidity': humidity if humidity is not None else 0,
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'temperature': temp,
+            'humidity': humidity,
+            'timestamp': datetime.fromtimestamp(sample['timestamp']).strftime("%Y-%m-%d %H:%M:%S"),
+            'age_seconds': sample['age'],
             'environment_status': 'Tối ưu' if temp <= 35 and humidity <= 85 else 'Cảnh báo',
-            'message': 'Đã cập nhật dữ liệu cảm biến'
+            'message': 'Dữ liệu cảm biến mới nhất'
         })
     except Exception as e:
         return jsonify({
@@ -814,11 +1374,11 @@ def get_sensor_data():
 
 # ====================== PHẦN 10: CÁC ROUTE PHỤC VỤ FILE ======================
 
-@app.route('/captures/<filename>')
+@app.route('/captures/<path:filename>')
 def serve_capture(filename):
     return send_from_directory(app.config['CAPTURE_FOLDER'], filename)
 
-@app.route('/daily_captures/<filename>')
+@app.route('/daily_captures/<path:filename>')
 def serve_daily_capture(filename):
     return send_from_directory(app.config['DAILY_CAPTURE_FOLDER'], filename)
 
@@ -826,34 +1386,76 @@ def serve_daily_capture(filename):
 def serve_upload(filename):
     return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
 
+@app.route('/thumbs/<kind>/<int:size>/<path:filename>')
+def serve_thumbnail(kind, size, filename):
+    """
+    Thumbnail của ảnh chụp/upload (kind: captures, daily_captures, uploads)
+    Định dạng: ?fmt=webp|jpeg, không truyền thì chọn theo header Accept
+    """
+    fmt = request.args.get('fmt')
+    negotiated = fmt is None
+    if negotiated:
+        webp_ok = 'webp' in app.config['THUMB_FORMATS'] and 'image/webp' in request.headers.get('Accept', '')
+        fmt = 'webp' if webp_ok else 'jpeg'
+    
+    # Trình duyệt đã có đúng bản này: trả 304 mà không đọc thumbnail
+    etag = thumbnails.etag(kind, filename, size, fmt)
+    if etag is not None and etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        thumb = thumbnails.get(kind, filename, size, fmt)
+        if thumb is None:
+            return jsonify({'success': False, 'error': 'Không tìm thấy ảnh'}), 404
+        data, mimetype, etag = thumb
+        response = Response(data, mimetype=mimetype)
+    
+    response.set_etag(etag)
+    # Thumbnail của một file không bao giờ đổi: trình duyệt giữ lâu, không cần hỏi lại
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    if negotiated:
+        response.headers['Vary'] = 'Accept'
+    return response
+
 @app.route('/static/<path:filename>')
 def serve_static(filename):
     return send_from_directory('static', filename)
 
+def list_captures(kind, thumb_kind, default_limit):
+    """
+    Liệt kê ảnh chụp từ index (O(số ảnh mỗi trang), không quét thư mục)
+    Tham số: limit, cursor, from, to (YYYY-MM-DD hoặc YYYY-MM-DD HH:MM:SS), thumb (kích thước thumbnail)
+    """
+    limit = min(max(request.args.get('limit', default_limit, type=int), 1), 100)
+    captures, next_cursor = capture_index.list(kind, limit=limit,
+                                               cursor=request.args.get('cursor'),
+                                               start=parse_time(request.args.get('from')),
+                                               end=parse_time(request.args.get('to'), end_of_day=True))
+    thumb_size = request.args.get('thumb', max(app.config['THUMB_SIZES']), type=int)
+    for capture in captures:
+        capture['thumb'] = f"/thumbs/{thumb_kind}/{thumb_size}/{capture['filename']}"
+    return captures, next_cursor, capture_index.count(kind)
+
 @app.route('/get_daily_captures')
 def get_daily_captures():
     """
-    Lấy danh sách ảnh chụp định kỳ
-    TRẢ VỀ: JSON với danh sách ảnh
+    Lấy danh sách ảnh chụp định kỳ (mặc định 10 ảnh mới nhất)
+    TRẢ VỀ: JSON với danh sách ảnh và next_cursor
     """
     try:
-        captures = []
-        for filename in sorted(os.listdir(app.config['DAILY_CAPTURE_FOLDER']), reverse=True):
-            if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
-                filepath = os.path.join(app.config['DAILY_CAPTURE_FOLDER'], filename)
-                captures.append({
-                    'filename': filename,
-                    'path': f'/daily_captures/{filename}',
-                    'size': os.path.getsize(filepath),
-                    'created': datetime.fromtimestamp(os.path.getctime(filepath)).strftime("%Y-%m-%d %H:%M")
-                })
-        
+        captures, next_cursor, total = list_captures('daily', 'daily_captures', 10)
         return jsonify({
             'success': True,
-            'count': len(captures),
-            'captures': captures[:10],
-            'message': f'Đã tìm thấy {len(captures)} ảnh chụp định kỳ'
+            'count': total,
+            'captures': captures,
+            'next_cursor': next_cursor,
+            'message': f'Đã tìm thấy {total} ảnh chụp định kỳ'
         })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'Tham số không hợp lệ (ngày dạng YYYY-MM-DD)'
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -864,27 +1466,24 @@ def get_daily_captures():
 @app.route('/get_manual_captures')
 def get_manual_captures():
     """
-    Lấy danh sách ảnh chụp thủ công
-    TRẢ VỀ: JSON với danh sách ảnh
+    Lấy danh sách ảnh chụp thủ công (mặc định 6 ảnh mới nhất)
+    TRẢ VỀ: JSON với danh sách ảnh và next_cursor
     """
     try:
-        captures = []
-        for filename in sorted(os.listdir(app.config['CAPTURE_FOLDER']), reverse=True):
-            if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
-                filepath = os.path.join(app.config['CAPTURE_FOLDER'], filename)
-                captures.append({
-                    'filename': filename,
-                    'path': f'/captures/{filename}',
-                    'size': os.path.getsize(filepath),
-                    'created': datetime.fromtimestamp(os.path.getctime(filepath)).strftime("%Y-%m-%d %H:%M")
-                })
-        
+        captures, next_cursor, total = list_captures('manual', 'captures', 6)
         return jsonify({
             'success': True,
-            'count': len(captures),
-            'captures': captures[:6],
-            'message': f'Đã tìm thấy {len(captures)} ảnh chụp thủ công'
+            'count': total,
+            'captures': captures,
+            'next_cursor': next_cursor,
+            'message': f'Đã tìm thấy {total} ảnh chụp thủ công'
         })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': 'Tham số không hợp lệ (ngày dạng YYYY-MM-DD)'
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -897,7 +1496,7 @@ def get_manual_captures():
 @socketio.on('connect')
 def handle_connect():
     print(f'[WEBSOCKET] Client connected: {request.sid}')
-    emit('status_update', current_status)
+    emit('status_update', status_publisher.snapshot())
     emit('welcome', {
         'success': True,
         'message': 'Kết nối thành công đến hệ thống nhận diện bệnh cây cà chua',
@@ -911,7 +1510,8 @@ def handle_disconnect():
 
 @socketio.on('request_update')
 def handle_update_request():
-    emit('status_update', current_status)
+    """Gửi trạng thái đầy đủ (client mới kết nối hoặc thấy version delta bị hụt)"""
+    emit('status_update', status_publisher.snapshot())
 
 @socketio.on('update_threshold')
 def handle_update_threshold(data):
@@ -951,19 +1551,38 @@ def handle_unexpected_error(error):
 
 def cleanup():
     print("\n[SYSTEM] Đang dừng hệ thống...")
+    live_inference.stop()
+    change_trigger.stop()
     camera.release()
+    sensor_sampler.stop()
     sensor.cleanup()
+    sensor_store.close()
+    job_manager.shutdown(wait=False)
+    # Chờ ghi xong các ảnh chụp, ảnh upload và lịch sử còn trong hàng đợi
+    # (ảnh chụp trước thumbnail vì callback ghi xong còn tạo thumbnail)
+    capture_pipeline.shutdown(wait=True)
+    inference_scheduler.shutdown(wait=True)
+    status_publisher.close()
+    image_writer.close()
+    upload_store.shutdown(wait=True)
+    thumbnails.shutdown(wait=True)
+    history.close()
     print("[SYSTEM] Đã giải phóng tài nguyên")
 
 if __name__ == '__main__':
     atexit.register(cleanup)
     
-    sensor_thread = threading.Thread(target=sensor_reader, daemon=True)
-    sensor_thread.start()
+    # Nạp backend TFLite và model trong nền để server lên ngay
+    detector_pool.load_async()
+    
+    sensor_sampler.start()
     print("[SYSTEM] Đã khởi động thread đọc cảm biến")
     
     schedule_daily_capture()
     
+    if app.config['LIVE_INFERENCE']:
+        set_live_mode(True)
+    
     next_capture_time = datetime.now() + timedelta(days=1)
     next_capture_time = next_capture_time.replace(hour=8, minute=0, second=0)
     current_status['next_daily_capture'] = next_capture_time.strftime("%Y-%m-%d %H:%M")
@@ -971,11 +1590,15 @@ if __name__ == '__main__':
     print("=" * 70)
     print("🌱 HỆ THỐNG NHẬN DIỆN BỆNH CÂY CÀ CHUA - JSON RESPONSE")
     print("=" * 70)
-    print(f"📁 Model: {detector.model_path}")
-    print(f"📊 Số lớp: {len(detector.labels) if detector.labels else 0}")
-    print(f"🌡️  Cảm biến: GPIO{sensor.pin}")
-    print(f"📷 Camera: Index {camera.camera_index}")
-    print(f"🎯 Video Stream: KHÔNG NHẬN DIỆN REAL-TIME")
+    print(f"📁 Model: {detector_pool.model_path}")
+    print(f"📊 Số lớp: {len(detector_pool.labels) if detector_pool.labels else 0}")
+    print(f"🧠 Interpreter pool: {detector_pool.size} x {detector_pool.num_threads} thread")
+    print(f"🌡️  Cảm biến: {'giả lập' if sensor.pin is None else f'GPIO{sensor.pin}'} (mỗi {sensor_sampler.interval:g}s)")
+    print(f"📷 Camera: Index {camera.camera_index} ({camera.mode})")
+    if live_inference.enabled:
+        print(f"🎯 Video Stream: NHẬN DIỆN LIVE (≤ {live_inference.max_rate}/s, ≤ {live_inference.cpu_budget}% CPU)")
+    else:
+        print(f"🎯 Video Stream: KHÔNG NHẬN DIỆN REAL-TIME")
     print(f"📅 Chụp ảnh định kỳ: HÀNG NGÀY lúc 8:00 (TEST: 2 phút)")
     print(f"📅 Lần chụp tiếp theo: {current_status['next_daily_capture']}")
     print(f"🎯 Ngưỡng tin cậy: {current_status['notification_threshold']*100}%")
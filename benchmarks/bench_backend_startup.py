@@ -0,0 +1,86 @@
+"""
+Benchmark: thời gian import và RSS đỉnh của từng backend TFLite
+Mỗi backend được đo trong một tiến trình Python riêng để import
+không ảnh hưởng lẫn nhau.
+Chạy từ thư mục gốc: python benchmarks/bench_backend_startup.py
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def peak_rss_mb():
+    # ru_maxrss tính bằng KB trên Linux, byte trên macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def child(backend, model_path):
+    """Đo trong tiến trình con, in kết quả dạng JSON"""
+    import numpy as np
+    import cv2  # noqa: F401  (app luôn import cv2, tính vào đường cơ sở)
+    baseline_rss = peak_rss_mb()
+
+    result = {'backend': backend, 'baseline_rss_mb': baseline_rss}
+    if backend != 'baseline':
+        from utils.tflite_backend import load_interpreter_class
+
+        start = time.perf_counter()
+        _, Interpreter = load_interpreter_class(backend)
+        result['import_s'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        interpreter = Interpreter(model_path=model_path)
+        interpreter.allocate_tensors()
+        details = interpreter.get_input_details()[0]
+        interpreter.set_tensor(details['index'], np.zeros(details['shape'], dtype=details['dtype']))
+        interpreter.invoke()
+        result['load_invoke_s'] = time.perf_counter() - start
+
+    result['peak_rss_mb'] = peak_rss_mb()
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default=os.path.join(ROOT, 'model.tflite'))
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.model)
+        return
+
+    from utils.tflite_backend import available_backends
+    backends = available_backends()
+    if not backends:
+        print("Không có backend TFLite nào được cài")
+        return
+
+    print("=" * 75)
+    print(f"{'Backend':<18}{'import (s)':>12}{'nạp+invoke (s)':>16}{'RSS đỉnh (MB)':>15}{'+ so với gốc':>14}")
+    print("-" * 75)
+    for backend in ['baseline'] + backends:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', backend, '--model', args.model],
+                              cwd=ROOT, capture_output=True, text=True)
+        lines = [line for line in proc.stdout.splitlines() if line.startswith('{')]
+        if proc.returncode != 0 or not lines:
+            print(f"{backend:<18} lỗi: {proc.stderr.strip().splitlines()[-1:]}")
+            continue
+        r = json.loads(lines[-1])
+        extra = r['peak_rss_mb'] - r['baseline_rss_mb']
+        print(f"{backend:<18}{r.get('import_s', 0):>12.3f}{r.get('load_invoke_s', 0):>16.3f}"
+              f"{r['peak_rss_mb']:>15.1f}{extra:>14.1f}")
+    print("=" * 75)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: số ảnh/giây của DiseaseDetector theo kích thước batch
+Chạy từ thư mục gốc: python benchmarks/bench_batch_inference.py
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.detector import DiseaseDetector
+
+
+def run(detector, images, batch_size, rounds):
+    """Trả về số ảnh/giây khi chạy detect_batch với batch_size cho trước"""
+    batches = [images[i:i + batch_size] for i in range(0, len(images), batch_size)]
+    # Warm-up: cấp phát tensor cho kích thước batch này
+    detector.detect_batch(batches[0])
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for batch in batches:
+            detector.detect_batch(batch)
+    elapsed = time.perf_counter() - start
+    return rounds * len(images) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='model.tflite')
+    parser.add_argument('--labels', default='labels.txt')
+    parser.add_argument('--images', type=int, default=64, help='Số ảnh mỗi vòng')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--batch-sizes', default='1,4,8,16')
+    args = parser.parse_args()
+
+    detector = DiseaseDetector(args.model, args.labels)
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 256, (480, 640, 3), dtype=np.uint8) for _ in range(args.images)]
+
+    # Đường cơ sở: chạy model từng ảnh một (không tính phần vẽ kết quả của detect())
+    detector.predict_batch(images[:1])
+    start = time.perf_counter()
+    for image in images:
+        detector.predict_batch([image])
+    baseline = len(images) / (time.perf_counter() - start)
+
+    print("=" * 50)
+    print(f"{'Chế độ':<20}{'ảnh/giây':>15}{'tăng tốc':>15}")
+    print("-" * 50)
+    print(f"{'từng ảnh':<20}{baseline:>15.1f}{1.0:>14.2f}x")
+    for batch_size in [int(b) for b in args.batch_sizes.split(',')]:
+        ips = run(detector, images, batch_size, args.rounds)
+        print(f"{f'detect_batch({batch_size})':<20}{ips:>15.1f}{ips / baseline:>14.2f}x")
+    print("=" * 50)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark: độ trễ giữa các frame của /video_feed khi đang chụp và upload liên tục
+So sánh cách cũ (chụp, ghi file, phân tích và thông báo đều giữ camera_lock,
+broadcaster cũng lấy camera_lock mỗi frame) với CapturePipeline (snapshot không
+khóa, ghi file qua ImageWriter, thông báo trong thread nền).
+Một client xem stream đo khoảng cách giữa các frame nhận được (p50/p99/max)
+trong lúc các thread khác gọi chụp ảnh và phân tích ảnh upload liên tục.
+Kiểm tra: p99 của chế độ staged khi có tải không được vượt quá --max-p99-ratio lần
+p99 khi không có tải; vượt thì thoát với mã 1 (dùng như test hồi quy cho camera_lock).
+Chạy từ thư mục gốc: python benchmarks/bench_capture_latency.py
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_stream_broadcast import SyntheticCamera
+from utils.detector import DiseaseDetector
+from utils.stream import MJPEGBroadcaster
+from utils.image_writer import ImageWriter
+from utils.capture_pipeline import CapturePipeline
+from utils.image_io import decode_image
+
+
+class LockedBroadcaster(MJPEGBroadcaster):
+    """Broadcaster cũ: lấy camera_lock mỗi lần encode frame"""
+
+    def __init__(self, camera, lock, **kwargs):
+        super().__init__(camera, **kwargs)
+        self.camera_lock = lock
+
+    def render(self, frame, size=None, quality=None):
+        with self.camera_lock:
+            return super().render(frame, size, quality)
+
+
+def viewer(broadcaster, stop, gaps):
+    subscriber = broadcaster.subscribe()
+    last = None
+    try:
+        while not stop.is_set():
+            if subscriber.get(timeout=2.0) is None:
+                continue
+            now = time.perf_counter()
+            if last is not None:
+                gaps.append(now - last)
+            last = now
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
+
+def run(mode, detector, duration, fps, capturers, uploaders, folder):
+    camera = SyntheticCamera()
+    camera_lock = threading.Lock()
+    detector_lock = threading.Lock()
+    stop = threading.Event()
+    gaps = []
+    counts = {'captures': 0, 'uploads': 0}
+
+    def analyze(image, source=None, image_path=None):
+        with detector_lock:
+            return detector.detect(image)
+
+    # Thông báo giả lập: serialize kết quả như khi gửi Socket.IO
+    def notify(payload):
+        str(payload)
+
+    upload = cv2.imencode('.jpg', np.random.default_rng(1).integers(0, 256, (1080, 1440, 3), dtype=np.uint8))[1].tobytes()
+    size = (detector.input_width, detector.input_height)
+
+    writer = None
+    if mode == 'locked':
+        broadcaster = LockedBroadcaster(camera, camera_lock, fps=fps)
+
+        def capture():
+            with camera_lock:
+                frame = camera.get_frame()
+                path = os.path.join(folder, f"locked_{counts['captures']}.jpg")
+                cv2.imwrite(path, frame)
+                notify({'path': path, 'results': analyze(frame)})
+    else:
+        broadcaster = MJPEGBroadcaster(camera, fps=fps)
+        writer = ImageWriter()
+        pipeline = CapturePipeline(camera,
+                                   lambda frame, kind, stem: writer.submit(frame, folder, stem),
+                                   analyze)
+
+        def capture():
+            pipeline.publish(notify, pipeline.capture('manual', source='bench'))
+
+    def capture_loop():
+        while not stop.is_set():
+            capture()
+            counts['captures'] += 1
+
+    def upload_loop():
+        while not stop.is_set():
+            image, _ = decode_image(upload, size)
+            analyze(image)
+            counts['uploads'] += 1
+
+    threads = [threading.Thread(target=viewer, args=(broadcaster, stop, gaps))]
+    time.sleep(0.5)
+    threads += [threading.Thread(target=capture_loop) for _ in range(capturers)]
+    threads += [threading.Thread(target=upload_loop) for _ in range(uploaders)]
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    if writer is not None:
+        pipeline.shutdown()
+        writer.close()
+    camera.release()
+
+    gaps_ms = np.array(gaps[1:]) * 1000 if len(gaps) > 1 else np.zeros(1)
+    return (np.percentile(gaps_ms, 50), np.percentile(gaps_ms, 99), gaps_ms.max(),
+            counts['captures'] / duration, counts['uploads'] / duration)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='model.tflite')
+    parser.add_argument('--labels', default='labels.txt')
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--fps', type=float, default=15)
+    parser.add_argument('--capturers', type=int, default=2)
+    parser.add_argument('--uploaders', type=int, default=2)
+    parser.add_argument('--max-p99-ratio', type=float, default=1.5,
+                        help='p99 staged khi có tải / p99 khi không tải tối đa cho phép')
+    args = parser.parse_args()
+
+    detector = DiseaseDetector(args.model, args.labels)
+    print(f"Stream {args.fps:.0f} FPS (mục tiêu {1000 / args.fps:.1f} ms/frame), "
+          f"{args.capturers} thread chụp, {args.uploaders} thread upload, {args.duration:.0f}s mỗi chế độ")
+    print(f"{'Chế độ':<10}{'Tải':<8}{'p50 (ms)':>10}{'p99 (ms)':>10}{'max (ms)':>10}{'chụp/s':>9}{'upload/s':>10}")
+    p99s = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for mode in ('locked', 'staged'):
+            for label, capturers, uploaders in (('không', 0, 0), ('có', args.capturers, args.uploaders)):
+                p50, p99, worst, capture_rate, upload_rate = run(mode, detector, args.duration, args.fps,
+                                                                 capturers, uploaders, folder)
+                p99s[mode, label] = p99
+                print(f"{mode:<10}{label:<8}{p50:>10.1f}{p99:>10.1f}{worst:>10.1f}"
+                      f"{capture_rate:>9.1f}{upload_rate:>10.1f}")
+
+    # Stream phải giữ nhịp khi đang chụp: so p99 staged có tải với khi không tải
+    ratio = p99s['staged', 'có'] / p99s['staged', 'không']
+    if ratio > args.max_p99_ratio:
+        print(f"[FAIL] p99 staged khi có tải gấp {ratio:.2f} lần khi không tải (giới hạn {args.max_p99_ratio:g})")
+        sys.exit(1)
+    print(f"[OK] p99 staged khi có tải gấp {ratio:.2f} lần khi không tải (giới hạn {args.max_p99_ratio:g})")
+
+
+if __name__ == '__main__':
+    main()
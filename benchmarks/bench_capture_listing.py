@@ -0,0 +1,79 @@
+"""
+Benchmark: độ trễ liệt kê ảnh chụp theo số file trong thư mục
+So sánh cách cũ (os.listdir + sort + getsize/getctime mọi file) với CaptureIndex
+(đọc một trang từ SQLite theo cursor).
+Chạy từ thư mục gốc: python benchmarks/bench_capture_listing.py
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.capture_index import CaptureIndex
+
+
+def legacy_list(folder, limit):
+    """Cách get_daily_captures() liệt kê ảnh trước đây"""
+    captures = []
+    for filename in sorted(os.listdir(folder), reverse=True):
+        if filename.lower().endswith(('.jpg', '.jpeg', '.png')):
+            filepath = os.path.join(folder, filename)
+            captures.append({
+                'filename': filename,
+                'path': f'/daily_captures/{filename}',
+                'size': os.path.getsize(filepath),
+                'created': datetime.fromtimestamp(os.path.getctime(filepath)).strftime("%Y-%m-%d %H:%M")
+            })
+    return captures[:limit]
+
+
+def timed(fn, rounds=5):
+    fn()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', default='100,1000,10000')
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    print("=" * 62)
+    print(f"{'số file':>10}{'listdir ms':>14}{'index ms':>12}{'trang sâu ms':>14}{'rebuild ms':>12}")
+    print("-" * 62)
+    for count in [int(n) for n in args.files.split(',')]:
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = os.path.join(tmp, 'daily')
+            os.makedirs(folder)
+            base = datetime(2026, 1, 1)
+            for i in range(count):
+                name = f"daily_{(base + timedelta(minutes=i)).strftime('%Y%m%d_%H%M%S')}.jpg"
+                with open(os.path.join(folder, name), 'wb') as f:
+                    f.write(b'\xff\xd8\xff\xd9')
+
+            index = CaptureIndex(os.path.join(tmp, 'captures.db'))
+            start = time.perf_counter()
+            index.rebuild('daily', folder, '/daily_captures')
+            rebuild = (time.perf_counter() - start) * 1000
+
+            legacy = timed(lambda: legacy_list(folder, args.limit))
+            first = timed(lambda: index.list('daily', limit=args.limit))
+            # Trang giữa: cursor lấy từ một trang đã đi qua
+            cursor = None
+            for _ in range(count // args.limit // 2):
+                _, cursor = index.list('daily', limit=args.limit, cursor=cursor)
+            deep = timed(lambda: index.list('daily', limit=args.limit, cursor=cursor))
+            print(f"{count:>10}{legacy:>14.2f}{first:>12.3f}{deep:>14.3f}{rebuild:>12.1f}")
+    print("=" * 62)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: số lần phân tích khi dùng trigger theo thay đổi cảnh
+Giả lập camera nhìn luống cà chua trong --hours giờ (mặc định 2; --hours 24 cho cả ngày):
+nhiễu cảm biến, ánh sáng thay đổi dần, thỉnh thoảng có người/vật đi qua.
+Xét một frame mỗi check_interval giây và đếm số frame đã xét so với số lần chạy nhận diện.
+Chạy từ thư mục gốc: python benchmarks/bench_change_trigger.py
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.change_trigger import ChangeDetector, ChangeTrigger
+
+
+def make_scene(width, height, rng):
+    scene = np.zeros((height, width, 3), dtype=np.uint8)
+    scene[:] = (40, 110, 50)
+    for _ in range(60):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        axes = (int(rng.integers(10, 40)), int(rng.integers(5, 20)))
+        color = tuple(int(c) for c in rng.integers(20, 160, 3))
+        cv2.ellipse(scene, center, axes, float(rng.integers(0, 180)), 0, 360, color, -1)
+    return scene
+
+
+def simulate(hours, check_interval, events_per_hour, width, height, seed=0):
+    """Sinh (thời điểm, frame) cho một khoảng thời gian; mỗi sự kiện kéo dài ~20 giây"""
+    rng = np.random.default_rng(seed)
+    scene = make_scene(width, height, rng)
+    total = int(hours * 3600 / check_interval)
+    events = set()
+    for start in rng.integers(0, total, int(hours * events_per_hour)):
+        events.update(range(int(start), int(start) + int(20 / check_interval)))
+
+    for i in range(total):
+        t = i * check_interval
+        # Ánh sáng thay đổi chậm theo giờ trong ngày
+        gain = 0.8 + 0.3 * np.sin(t / 3600 / 24 * 2 * np.pi)
+        frame = cv2.convertScaleAbs(scene, alpha=gain)
+        noise = rng.integers(-6, 7, frame.shape, dtype=np.int16)
+        frame = np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+        if i in events:
+            x = int((i % 40) / 40 * width)
+            cv2.rectangle(frame, (x, height // 4), (min(width, x + width // 4), height), (90, 90, 200), -1)
+        yield t, frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hours', type=float, default=2.0)
+    parser.add_argument('--check-interval', type=float, default=1.0)
+    parser.add_argument('--events-per-hour', type=float, default=4)
+    parser.add_argument('--threshold', type=float, default=0.05)
+    parser.add_argument('--min-interval', type=float, default=60)
+    parser.add_argument('--max-interval', type=float, default=3600)
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    args = parser.parse_args()
+
+    trigger = ChangeTrigger(camera=None, on_trigger=None,
+                            check_interval=args.check_interval,
+                            min_interval=args.min_interval,
+                            max_interval=args.max_interval,
+                            detector=ChangeDetector(threshold=args.threshold))
+    start = time.perf_counter()
+    for t, frame in simulate(args.hours, args.check_interval, args.events_per_hour, args.width, args.height):
+        trigger.check(frame, now=t)
+    wall = time.perf_counter() - start
+
+    stats = trigger.get_stats()
+    print("=" * 60)
+    print(f"Giả lập {args.hours} giờ, xét 1 frame / {args.check_interval}s, {args.events_per_hour} sự kiện/giờ")
+    print("-" * 60)
+    print(f"Frame đã xét          : {stats['frames_examined']}")
+    print(f"Lần chạy nhận diện    : {stats['inferences_run']}  {stats['triggers']}")
+    print(f"Bị chặn bởi cooldown  : {stats['suppressed_by_cooldown']}")
+    print(f"Tiết kiệm             : {stats['inference_savings_percent']}% so với phân tích mọi frame")
+    print(f"Chi phí xét mỗi frame : {stats['avg_check_ms']} ms")
+    print(f"Thời gian giả lập     : {wall:.1f} s")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: ghi và truy vấn lịch sử phân tích trong SQLite
+Ghi N bản ghi giả lập qua AnalysisHistory (ghi theo lô), rồi so sánh thời gian
+lấy trang đầu/giữa/cuối bằng keyset (cursor) với LIMIT/OFFSET truyền thống.
+Chạy từ thư mục gốc: python benchmarks/bench_history.py --rows 1000000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.history import AnalysisHistory, connect
+
+CLASSES = ['healthy', 'powdery_mildew', 'Tomato_Yellow_Leaf_Curl_Virus',
+           'Late_blight', 'Septoria_leaf_spot', 'Tomato_mosaic_virus']
+SOURCES = ['daily_capture', 'manual_capture', 'upload', 'job', 'change_trigger']
+
+
+def fill(history, rows, seed=0):
+    """Ghi `rows` bản ghi trải đều trong một năm qua record() như ứng dụng thật"""
+    rng = np.random.default_rng(seed)
+    now = time.time()
+    times = np.sort(now - rng.uniform(0, 365 * 86400, rows))
+    classes = rng.integers(0, len(CLASSES), rows)
+    sources = rng.integers(0, len(SOURCES), rows)
+    confidences = rng.uniform(0.3, 1.0, rows)
+    start = time.perf_counter()
+    for i in range(rows):
+        history.record({'class_name': CLASSES[classes[i]], 'confidence': confidences[i],
+                        'severity': 'low', 'type': 'disease'},
+                       SOURCES[sources[i]], image_path=f'/captures/{i}.jpg',
+                       temperature=25.0, humidity=60.0, timestamp=float(times[i]))
+    history.flush()
+    return rows / (time.perf_counter() - start)
+
+
+def page_offset(conn, page, limit, class_name=None):
+    sql = "SELECT * FROM analyses"
+    params = []
+    if class_name:
+        sql += " WHERE class_name = ?"
+        params.append(class_name)
+    sql += " ORDER BY ts DESC, id DESC LIMIT ? OFFSET ?"
+    start = time.perf_counter()
+    conn.execute(sql, params + [limit, page * limit]).fetchall()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        history = AnalysisHistory(os.path.join(tmp, 'history.db'), batch_size=1000)
+        rate = fill(history, args.rows)
+        stats = history.get_stats()
+        conn = connect(history.db_path)
+
+        # Trang sâu: đi theo cursor tới trang đó một lần để lấy cursor
+        last_page = args.rows // args.limit - 1
+        pages = [0, last_page // 2, last_page]
+
+        print("=" * 64)
+        print(f"Ghi {args.rows} bản ghi: {rate:,.0f} bản ghi/giây, "
+              f"lô trung bình {stats['avg_batch']}, {stats['avg_batch_write_ms']} ms/lô")
+        print("-" * 64)
+        print(f"{'Trang':>10}{'keyset ms':>14}{'OFFSET ms':>14}{'keyset+lớp ms':>16}")
+        for page in pages:
+            # Cursor của trang sâu lấy một lần từ ts/id thực (tránh duyệt từng trang)
+            row = conn.execute("SELECT ts, id FROM analyses ORDER BY ts DESC, id DESC LIMIT 1 OFFSET ?",
+                               (max(0, page * args.limit - 1),)).fetchone()
+            cursor = f"{row[0]!r}:{row[1]}" if page else None
+            start = time.perf_counter()
+            history.query(limit=args.limit, cursor=cursor)
+            keyset = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            history.query(limit=args.limit, cursor=cursor, class_name='Late_blight')
+            keyset_class = (time.perf_counter() - start) * 1000
+            offset = page_offset(conn, page, args.limit)
+            print(f"{page:>10}{keyset:>14.2f}{offset:>14.2f}{keyset_class:>16.2f}")
+        print("=" * 64)
+        conn.close()
+        history.close()
+
+
+if __name__ == '__main__':
+    main()
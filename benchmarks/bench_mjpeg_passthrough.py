@@ -0,0 +1,106 @@
+"""
+Benchmark: CPU cho mỗi frame phát trên /video_feed
+So sánh camera chế độ bgr (giải mã mỗi frame + broadcaster encode lại)
+với chế độ mjpeg passthrough (gửi thẳng JPEG của camera).
+Dùng file MJPEG sinh sẵn làm nguồn camera, không cần webcam.
+Chạy từ thư mục gốc: python benchmarks/bench_mjpeg_passthrough.py
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.camera import Camera
+from utils.stream import MJPEGBroadcaster
+
+
+def write_mjpeg(path, width, height, num_frames, quality):
+    """Ghi một file MJPEG (các JPEG nối liền) có nội dung chuyển động"""
+    rng = np.random.default_rng(0)
+    base = cv2.GaussianBlur(rng.integers(0, 256, (height, width, 3), dtype=np.uint8), (15, 15), 0)
+    with open(path, 'wb') as f:
+        for i in range(num_frames):
+            frame = np.roll(base, i * width // num_frames, axis=1)
+            ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            f.write(buffer.tobytes())
+
+
+def viewer(broadcaster, stop, counter, index):
+    subscriber = broadcaster.subscribe()
+    try:
+        while not stop.is_set():
+            if subscriber.get(timeout=0.5) is not None:
+                counter[index] += 1
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
+
+def run(mode, source, viewers, duration, fps):
+    camera = Camera(mode=mode, source=source)
+    broadcaster = MJPEGBroadcaster(camera, fps=fps, passthrough=True)
+    stop = threading.Event()
+    counter = [0] * viewers
+    threads = [threading.Thread(target=viewer, args=(broadcaster, stop, counter, i))
+               for i in range(viewers)]
+
+    # Bỏ qua giai đoạn khởi động
+    time.sleep(0.5)
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    camera.release()
+
+    frames = broadcaster.frames_encoded + broadcaster.frames_passthrough
+    return {
+        'mode': camera.mode,
+        'cpu_percent': cpu / wall * 100,
+        'fps': sum(counter) / viewers / wall,
+        'cpu_ms_per_frame': cpu / frames * 1000 if frames else 0.0,
+        'camera_decodes': camera.decode_count
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--frames', type=int, default=90)
+    parser.add_argument('--quality', type=int, default=80)
+    parser.add_argument('--viewers', type=int, default=3)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--fps', type=float, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'camera.mjpeg')
+        write_mjpeg(source, args.width, args.height, args.frames, args.quality)
+
+        results = [run(mode, source, args.viewers, args.duration, args.fps) for mode in ('bgr', 'mjpeg')]
+
+    print("=" * 70)
+    print(f"Nguồn {args.width}x{args.height}, {args.viewers} client, mục tiêu {args.fps} FPS")
+    print(f"{'Chế độ':<10}{'CPU %':>10}{'FPS/client':>14}{'CPU ms/frame':>16}{'giải mã':>12}")
+    print("-" * 70)
+    for r in results:
+        print(f"{r['mode']:<10}{r['cpu_percent']:>10.1f}{r['fps']:>14.1f}"
+              f"{r['cpu_ms_per_frame']:>16.2f}{r['camera_decodes']:>12}")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: thời gian và bộ nhớ cấp phát cho tiền xử lý một frame
+So sánh đường cũ (đổi màu, resize, chuẩn hóa float32 rồi set_tensor) với đường mới
+ghi thẳng vào input tensor (preprocess_into_tensor)
+Chạy từ thư mục gốc: python benchmarks/bench_preprocess.py
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.detector import DiseaseDetector
+
+
+def old_path(detector, frame):
+    """Tiền xử lý như DiseaseDetector.preprocess_image trước đây (mỗi bước cấp phát mảng mới)"""
+    image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    image_resized = cv2.resize(image_rgb, (detector.input_width, detector.input_height))
+    input_data = np.expand_dims(image_resized.astype(np.float32) / 255.0, axis=0)
+    detector.interpreter.set_tensor(detector.input_details[0]['index'], input_data)
+
+
+def new_path(detector, frame):
+    detector.preprocess_into_tensor([frame])
+
+
+def measure(fn, detector, frame, iterations):
+    """Trả về (ms/frame, số byte cấp phát/frame, số lần cấp phát/frame)"""
+    fn(detector, frame)  # warm-up
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(detector, frame)
+    per_frame_ms = (time.perf_counter() - start) / iterations * 1000
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(iterations):
+        fn(detector, frame)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    # Dùng compare_to để đếm cả các khối đã cấp phát rồi giải phóng trong vòng lặp
+    size = 0
+    count = 0
+    for stat in after.compare_to(before, 'lineno'):
+        size += max(stat.size_diff, 0)
+        count += max(stat.count_diff, 0)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn(detector, frame)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_frame_ms, peak, count / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='model.tflite')
+    parser.add_argument('--labels', default='labels.txt')
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    args = parser.parse_args()
+
+    detector = DiseaseDetector(args.model, args.labels)
+    frame = np.random.default_rng(0).integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+
+    print("=" * 66)
+    print(f"Frame {args.width}x{args.height} -> input {detector.input_width}x{detector.input_height} "
+          f"({np.dtype(detector.input_dtype).name})")
+    print(f"{'Đường xử lý':<26}{'ms/frame':>12}{'peak bytes':>14}{'alloc còn lại':>14}")
+    print("-" * 66)
+    for name, fn in (('đường cũ', old_path), ('preprocess_into_tensor', new_path)):
+        ms, peak, count = measure(fn, detector, frame, args.iterations)
+        print(f"{name:<26}{ms:>12.3f}{peak:>14,}{count:>14.2f}")
+    print("=" * 66)
+
+
+if __name__ == '__main__':
+    main()
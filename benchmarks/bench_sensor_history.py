@@ -0,0 +1,86 @@
+"""
+Benchmark: ghi và truy vấn lịch sử cảm biến trong SQLite
+Ghi một năm mẫu giả lập (SimulatedSensor, mặc định mỗi 60 giây) qua SensorStore,
+đo thời gian ghi một mẫu như sensor_sampler, rồi so sánh độ trễ truy vấn
+các khoảng 1 ngày / 1 tuần / 1 tháng / 1 năm từ mức tổng hợp (auto)
+với cách tính min/max/avg trực tiếp từ mẫu gốc (GROUP BY trên sensor_samples).
+Chạy từ thư mục gốc: python benchmarks/bench_sensor_history.py
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.sensor import SimulatedSensor
+from utils.sensor_store import SensorStore, RESOLUTIONS
+
+RANGES = (('1 ngày', 86400), ('1 tuần', 7 * 86400), ('1 tháng', 30 * 86400), ('1 năm', 365 * 86400))
+
+
+def fill(store, days, interval, seed=0):
+    """Ghi `days` ngày mẫu theo thứ tự thời gian, mỗi lô một ngày; trả về (số mẫu, mẫu/giây)"""
+    sensor = SimulatedSensor(fail_rate=0.0, seed=seed)
+    end = time.time()
+    ts = end - days * 86400
+    total = 0
+    start = time.perf_counter()
+    while ts < end:
+        batch = []
+        batch_end = min(ts + 86400, end)
+        while ts < batch_end:
+            batch.append((ts, *sensor.values_at(ts)))
+            ts += interval
+        store.record_many(batch)
+        total += len(batch)
+    return total, total / (time.perf_counter() - start)
+
+
+def timed(fn, rounds):
+    fn()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn()
+    return (time.perf_counter() - start) / rounds * 1000, result
+
+
+def raw_aggregate(store, start, end, seconds):
+    """Cách không có rollup: gom mẫu gốc theo bucket khi truy vấn"""
+    return store._conn().execute(
+        "SELECT CAST(ts / ? AS INTEGER) AS bucket, count(*), min(temperature), max(temperature), avg(temperature),"
+        " min(humidity), max(humidity), avg(humidity) FROM sensor_samples"
+        " WHERE ts BETWEEN ? AND ? GROUP BY bucket ORDER BY bucket", (seconds, start, end)).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--interval', type=float, default=60.0, help='Chu kỳ mẫu giả lập (giây)')
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        # Giữ toàn bộ mẫu gốc để so sánh với cách tính trực tiếp
+        store = SensorStore(os.path.join(folder, 'sensors.db'), raw_retention_days=None)
+        rows, rate = fill(store, args.days, args.interval)
+        size_mb = os.path.getsize(os.path.join(folder, 'sensors.db')) / 1024 / 1024
+        print(f"Đã ghi {rows} mẫu ({args.days} ngày, mỗi {args.interval:g}s): {rate:.0f} mẫu/s, DB {size_mb:.1f} MB")
+
+        now = time.time()
+        single, _ = timed(lambda: store.record(now + 1e6 + time.perf_counter(), 25.0, 60.0), args.rounds * 20)
+        print(f"Ghi một mẫu (như sensor_sampler): {single:.2f} ms")
+
+        print(f"\n{'Khoảng':<10}{'mức':<8}{'điểm':>7}{'rollup (ms)':>13}{'từ mẫu gốc (ms)':>17}")
+        for label, span in RANGES:
+            start, end = now - span, now
+            rollup_ms, (resolution, points, _) = timed(lambda: store.query(start, end, 'auto'), args.rounds)
+            seconds = RESOLUTIONS.get(resolution)
+            raw = f"{timed(lambda: raw_aggregate(store, start, end, seconds), args.rounds)[0]:.2f}" if seconds else '-'
+            print(f"{label:<10}{resolution:<8}{len(points):>7}{rollup_ms:>13.2f}{raw:>17}")
+
+
+if __name__ == '__main__':
+    main()
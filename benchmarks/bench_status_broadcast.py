@@ -0,0 +1,179 @@
+"""
+Benchmark: số byte và số lần gửi trạng thái qua WebSocket mỗi giây
+So sánh cách cũ (mỗi cập nhật gửi cả current_status, cảnh báo kèm full_results)
+với StatusPublisher (delta có version, gộp cập nhật trong một cửa sổ thời gian,
+cảnh báo kèm bản rút gọn). Socket.IO gửi riêng cho từng client nên số byte
+nhân theo số dashboard đang mở.
+Tải giả lập: cảm biến mỗi --sensor-interval giây, upload lẻ với tốc độ --upload-rate,
+và mỗi --burst-interval giây một loạt --burst-size job hoàn thành gần như cùng lúc.
+Chạy từ thư mục gốc: python benchmarks/bench_status_broadcast.py
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.status_publisher import StatusPublisher, result_summary
+
+
+def make_status():
+    return {
+        "disease_detected": False,
+        "disease_name": "Không phát hiện bệnh",
+        "confidence": 0,
+        "temperature": 0,
+        "humidity": 0,
+        "last_update": "",
+        "system_status": "Đang khởi động...",
+        "notification_threshold": 0.6,
+        "daily_capture_enabled": True,
+        "next_daily_capture": "2026-01-02 08:00",
+        "last_daily_capture": "",
+        "latest_analysis": {"type": "none", "disease_name": "Chưa có dữ liệu", "confidence": 0,
+                            "timestamp": "", "source": "none"}
+    }
+
+
+def make_response(rng, disease):
+    """Response của /upload cùng dạng trong app.py"""
+    confidence = rng.uniform(0.6, 0.99)
+    class_name = rng.choice(['Late_blight', 'Septoria_leaf_spot']) if disease else 'healthy'
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return {
+        'success': True,
+        'filename': f"upload_{timestamp}_{rng.randrange(10 ** 6)}.jpg",
+        'path': f"/uploads/upload_{timestamp}.jpg",
+        'results': {
+            'success': True, 'class_id': 3, 'class_name': class_name, 'confidence': confidence,
+            'confidence_percent': f"{confidence * 100:.2f}%", 'is_valid_class': True,
+            'type': 'disease' if disease else 'healthy', 'severity': 'high' if disease else 'none',
+            'color': 'danger' if disease else 'success',
+            'icon': 'fa-exclamation-triangle' if disease else 'fa-check-circle',
+            'mode': 'single', 'cache_hit': False
+        },
+        'timestamp': timestamp,
+        'analysis_time': datetime.now().strftime("%H:%M:%S"),
+        'message': 'Phân tích ảnh thành công!',
+        'source': 'upload',
+        'timings': {'read_ms': 1.2, 'decode_ms': 8.4, 'inference_ms': 31.0, 'total_ms': 40.6}
+    }
+
+
+class Counter:
+    """emit() giả lập: đếm số lần gửi và số byte JSON cho mỗi client"""
+
+    def __init__(self, clients):
+        self.clients = clients
+        self.emits = 0
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+    def emit(self, event, payload):
+        size = len(json.dumps([event, payload], ensure_ascii=False, default=str))
+        with self.lock:
+            self.emits += self.clients
+            self.bytes += size * self.clients
+
+
+def update(status, response):
+    results = response['results']
+    status['latest_analysis'] = {"type": results['type'], "disease_name": results['class_name'],
+                                 "confidence": results['confidence'], "timestamp": response['timestamp'],
+                                 "source": "upload"}
+    status['disease_detected'] = results['type'] == 'disease'
+    if status['disease_detected']:
+        status['disease_name'] = results['class_name']
+        status['confidence'] = results['confidence']
+        status['system_status'] = "⚠️ Phát hiện bệnh từ upload"
+    else:
+        status['system_status'] = "🌱 Không phát hiện bệnh"
+    status['last_update'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def run(mode, clients, duration, sensor_interval, upload_rate, burst_interval, burst_size, window):
+    rng = random.Random(0)
+    status = make_status()
+    counter = Counter(clients)
+    publisher = StatusPublisher(status, counter.emit, window=window) if mode == 'delta' else None
+
+    def publish():
+        if publisher is None:
+            counter.emit('status_update', status)
+        else:
+            publisher.publish()
+
+    def alert(response):
+        payload = {'type': 'warning', 'title': 'PHÂN TÍCH ẢNH UPLOAD',
+                   'disease': response['results']['class_name'],
+                   'confidence': response['results']['confidence'],
+                   'timestamp': response['timestamp'], 'source': 'upload', 'severity': 'high'}
+        if publisher is None:
+            payload['full_results'] = response
+        else:
+            payload['latest'] = result_summary(response)
+        counter.emit('disease_alert', payload)
+
+    def handle_upload():
+        response = make_response(rng, rng.random() < 0.3)
+        update(status, response)
+        publish()
+        if response['results']['type'] == 'disease':
+            alert(response)
+
+    # Mỗi client nhận một bản đầy đủ khi kết nối
+    counter.emit('status_update', publisher.snapshot() if publisher else status)
+
+    start = time.perf_counter()
+    next_sensor = next_upload = next_burst = start
+    while (now := time.perf_counter()) - start < duration:
+        if now >= next_sensor:
+            status['temperature'] = round(rng.uniform(24, 30), 1)
+            status['humidity'] = round(rng.uniform(55, 80), 1)
+            status['last_update'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            publish()
+            next_sensor += sensor_interval
+        if now >= next_upload:
+            handle_upload()
+            next_upload += rng.expovariate(upload_rate)
+        if now >= next_burst:
+            for _ in range(burst_size):
+                handle_upload()
+                time.sleep(0.01)
+            next_burst += burst_interval
+        time.sleep(0.005)
+
+    if publisher is not None:
+        publisher.close()
+        publisher.flush()
+    elapsed = time.perf_counter() - start
+    return counter.bytes / elapsed, counter.emits / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', default='1,10,50')
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--sensor-interval', type=float, default=10.0)
+    parser.add_argument('--upload-rate', type=float, default=0.5)
+    parser.add_argument('--burst-interval', type=float, default=5.0)
+    parser.add_argument('--burst-size', type=int, default=8)
+    parser.add_argument('--window-ms', type=float, default=250)
+    args = parser.parse_args()
+
+    print(f"{'Chế độ':<8}{'Client':>8}{'KB/s':>10}{'emit/s':>10}")
+    for clients in [int(c) for c in args.clients.split(',')]:
+        for mode in ('full', 'delta'):
+            bytes_rate, emit_rate = run(mode, clients, args.duration, args.sensor_interval, args.upload_rate,
+                                        args.burst_interval, args.burst_size, args.window_ms / 1000)
+            print(f"{mode:<8}{clients:>8}{bytes_rate / 1024:>10.1f}{emit_rate:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
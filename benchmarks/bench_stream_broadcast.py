@@ -0,0 +1,161 @@
+"""
+Benchmark: CPU% và FPS của /video_feed theo số client xem cùng lúc
+So sánh cách cũ (mỗi client tự resize + encode) với MJPEGBroadcaster
+(encode một lần, phát cho mọi client), và broadcaster với nhiều profile
+(mỗi profile encode một lần) có một client chậm dùng chế độ adaptive.
+Dùng camera giả lập, không cần webcam.
+Chạy từ thư mục gốc: python benchmarks/bench_stream_broadcast.py
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.stream import MJPEGBroadcaster
+
+
+class SyntheticCamera:
+    """Camera giả lập 640x480 @ 30fps, cùng giao diện get_frame()/wait_for_frame() với Camera"""
+
+    def __init__(self, width=640, height=480, fps=30):
+        rng = np.random.default_rng(0)
+        self.base = cv2.GaussianBlur(rng.integers(0, 256, (height, width, 3), dtype=np.uint8), (9, 9), 0)
+        self.frame_ready = threading.Condition()
+        self.frame = None
+        self.seq = 0
+        self.running = True
+        self.fps = fps
+        threading.Thread(target=self._update, daemon=True).start()
+
+    def _update(self):
+        while self.running:
+            shift = int(time.time() * 30) % self.base.shape[1]
+            frame = np.roll(self.base, shift, axis=1)
+            frame.flags.writeable = False
+            with self.frame_ready:
+                self.frame = frame
+                self.seq += 1
+                self.frame_ready.notify_all()
+            time.sleep(1.0 / self.fps)
+
+    def get_frame(self):
+        with self.frame_ready:
+            return None if self.frame is None else self.frame.copy()
+
+    def wait_for_frame(self, after_seq=0, timeout=None):
+        with self.frame_ready:
+            if not self.frame_ready.wait_for(lambda: self.seq > after_seq, timeout):
+                return after_seq, None
+            return self.seq, self.frame
+
+    def release(self):
+        self.running = False
+
+
+def legacy_viewer(camera, lock, stop, counter, index):
+    """Vòng lặp generate_frames() cũ: mỗi client tự encode, không giới hạn FPS"""
+    while not stop.is_set():
+        with lock:
+            frame = camera.get_frame()
+            if frame is None:
+                continue
+            frame_resized = cv2.resize(frame, (640, 480))
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            cv2.putText(frame_resized, f"Live: {timestamp}", (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+            ret, buffer = cv2.imencode('.jpg', frame_resized)
+            buffer.tobytes()
+        counter[index] += 1
+
+
+# Các profile client của chế độ mixed: (width, quality, fps)
+PROFILES = ((None, None, None), (320, 50, 10), (480, 60, 15))
+
+
+def broadcast_viewer(broadcaster, stop, counter, index, profile=(None, None, None), adaptive=False, delay=0.0):
+    width, quality, fps = profile
+    subscriber = broadcaster.subscribe(width=width, quality=quality, fps=fps, adaptive=adaptive)
+    try:
+        while not stop.is_set():
+            if subscriber.get(timeout=0.5) is not None:
+                counter[index] += 1
+                # Giả lập client mạng yếu: gửi mỗi frame mất `delay` giây
+                time.sleep(delay)
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
+
+def run(mode, viewers, duration, fps):
+    camera = SyntheticCamera()
+    lock = threading.Lock()
+    stop = threading.Event()
+    counter = [0] * viewers
+
+    broadcaster = None
+    if mode == 'legacy':
+        threads = [threading.Thread(target=legacy_viewer, args=(camera, lock, stop, counter, i))
+                   for i in range(viewers)]
+    elif mode == 'broadcast':
+        broadcaster = MJPEGBroadcaster(camera, fps=fps)
+        threads = [threading.Thread(target=broadcast_viewer, args=(broadcaster, stop, counter, i))
+                   for i in range(viewers)]
+    else:
+        # Client đầu tiên mạng yếu (adaptive), các client còn lại chia đều các profile
+        broadcaster = MJPEGBroadcaster(camera, fps=fps)
+        threads = [threading.Thread(target=broadcast_viewer,
+                                    args=(broadcaster, stop, counter, i, PROFILES[i % len(PROFILES)]),
+                                    kwargs={'adaptive': i == 0, 'delay': 0.2 if i == 0 else 0.0})
+                   for i in range(viewers)]
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stats = broadcaster.get_stats() if broadcaster else None
+    stop.set()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    camera.release()
+
+    return cpu / wall * 100, sum(counter) / viewers / wall, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--viewers', default='1,5,20')
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--fps', type=float, default=15)
+    args = parser.parse_args()
+
+    print("=" * 62)
+    print(f"{'Chế độ':<14}{'client':>8}{'CPU %':>12}{'FPS/client':>14}{'CPU%/client':>14}")
+    print("-" * 62)
+    slow_clients = []
+    for viewers in [int(v) for v in args.viewers.split(',')]:
+        for mode in ('legacy', 'broadcast', 'mixed'):
+            cpu, fps, stats = run(mode, viewers, args.duration, args.fps)
+            print(f"{mode:<14}{viewers:>8}{cpu:>12.1f}{fps:>14.1f}{cpu / viewers:>14.2f}")
+            if mode == 'mixed':
+                slow_clients.append((viewers, stats))
+    print("=" * 62)
+    print("Chế độ mixed: số profile encode mỗi frame và client chậm (adaptive)")
+    for viewers, stats in slow_clients:
+        slow = stats['clients'][0]
+        print(f"  {viewers:>3} client: {stats['active_variants']} profile, "
+              f"dùng lại {stats['variant_cache_hits']} lần; client chậm: mức {slow['adaptive_level']}, "
+              f"chất lượng {slow['quality']}, {slow['target_fps']} FPS, bỏ {slow['frames_dropped']} frame")
+
+
+if __name__ == '__main__':
+    main()
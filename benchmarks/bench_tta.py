@@ -0,0 +1,72 @@
+"""
+Benchmark: chi phí test-time augmentation (TTA)
+So sánh một lần nhận diện, TTA chạy từng biến thể riêng lẻ và TTA gom một batch,
+rồi ước tính độ trễ trung bình khi TTA chỉ chạy cho phần ảnh rơi vào khoảng không chắc chắn.
+Chạy từ thư mục gốc: python benchmarks/bench_tta.py
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.detector import DiseaseDetector
+from utils.tta import make_augmentations
+
+
+def timed(fn, images, rounds):
+    """Thời gian trung bình (ms) mỗi ảnh"""
+    fn(images[0])
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for image in images:
+            fn(image)
+    return (time.perf_counter() - start) / (rounds * len(images)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='model.tflite')
+    parser.add_argument('--labels', default='labels.txt')
+    parser.add_argument('--images', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--band', default='0.4,0.7', help='Khoảng độ tin cậy kích hoạt TTA')
+    args = parser.parse_args()
+
+    detector = DiseaseDetector(args.model, args.labels)
+    size = (detector.input_width, detector.input_height)
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 256, (480, 640, 3), dtype=np.uint8) for _ in range(args.images)]
+
+    single = timed(lambda image: detector.predict_batch([image]), images, args.rounds)
+    augment = timed(lambda image: make_augmentations(image, size), images, args.rounds)
+    sequential = timed(lambda image: [detector.predict_batch([v]) for v in make_augmentations(image, size)],
+                       images, args.rounds)
+    batched = timed(lambda image: detector.predict_batch(make_augmentations(image, size)), images, args.rounds)
+
+    # Tỉ lệ ảnh rơi vào khoảng không chắc chắn (đo trên chính các ảnh thử)
+    low, high = (float(v) for v in args.band.split(','))
+    confidences = [float(detector.predict_batch([image])[0].max()) for image in images]
+    in_band = np.mean([low <= c <= high for c in confidences])
+
+    variants = len(make_augmentations(images[0], size))
+    print("=" * 56)
+    print(f"{'Chế độ':<34}{'ms/ảnh':>10}{'so với x1':>12}")
+    print("-" * 56)
+    print(f"{'Một lần nhận diện':<34}{single:>10.2f}{1.0:>11.2f}x")
+    print(f"{'Sinh ' + str(variants) + ' biến thể':<34}{augment:>10.2f}{augment / single:>11.2f}x")
+    print(f"{'TTA tuần tự (' + str(variants) + ' lần invoke)':<34}{sequential:>10.2f}{sequential / single:>11.2f}x")
+    print(f"{'TTA một batch':<34}{batched:>10.2f}{batched / single:>11.2f}x")
+    print("-" * 56)
+    for fraction in sorted({0.1, 0.2, 0.3, float(in_band)}):
+        average = single + fraction * batched
+        label = f"Tự động, {fraction:.0%} ảnh trong khoảng"
+        print(f"{label:<34}{average:>10.2f}{average / single:>11.2f}x")
+    print("=" * 56)
+
+
+if __name__ == '__main__':
+    main()
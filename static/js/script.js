@@ -5,6 +5,9 @@ let systemUptimeInterval;
 let currentThreshold = 0.6;
 let activeNotification = null;
 let dailyCaptureEnabled = true;
+// Trạng thái hệ thống nhận qua WebSocket: bản đầy đủ + các delta theo version
+let statusState = {};
+let statusVersion = null;
 
 // ===== NOTIFICATION SYSTEM =====
 function showNotification(title, message, type = 'info', duration = 5000) {
@@ -369,7 +372,9 @@ function loadDailyCaptures() {
             if (data.success && data.captures && data.captures.length > 0) {
                 data.captures.forEach(capture => {
                     const img = document.createElement('img');
-                    img.src = capture.path;
+                    // Lưới chỉ cần thumbnail; click mở ảnh gốc
+                    img.src = capture.thumb || capture.path;
+                    img.loading = 'lazy';
                     img.className = 'capture-thumb';
                     img.alt = capture.filename;
                     img.title = 'Ảnh chụp định kỳ - Click để xem';
@@ -401,7 +406,9 @@ function loadManualCaptures() {
             if (data.success && data.captures && data.captures.length > 0) {
                 data.captures.forEach(capture => {
                     const img = document.createElement('img');
-                    img.src = capture.path;
+                    // Lưới chỉ cần thumbnail; click mở ảnh gốc
+                    img.src = capture.thumb || capture.path;
+                    img.loading = 'lazy';
                     img.className = 'capture-thumb';
                     img.alt = capture.filename;
                     img.title = 'Ảnh chụp thủ công - Click để xem';
@@ -441,7 +448,23 @@ function initSocket() {
     });
 
     socket.on('status_update', (data) => {
-        updateDashboard(data);
+        // Bản đầy đủ (khi kết nối hoặc khi yêu cầu lại)
+        statusState = data;
+        statusVersion = data.status_version !== undefined ? data.status_version : null;
+        updateDashboard(statusState);
+    });
+
+    socket.on('status_delta', (delta) => {
+        if (statusVersion === null || delta.version <= statusVersion) return;
+        if (delta.base !== statusVersion) {
+            // Hụt delta (mất kết nối ngắn...): xin lại bản đầy đủ
+            statusVersion = null;
+            socket.emit('request_update');
+            return;
+        }
+        Object.assign(statusState, delta.changes);
+        statusVersion = delta.version;
+        updateDashboard(statusState);
     });
 
     socket.on('disease_alert', (data) => {
@@ -456,9 +479,18 @@ function initSocket() {
             );
         }
         
-        // Nếu có full_results, hiển thị chi tiết
-        if (data.full_results) {
-            updateLatestResult(data.full_results);
+        // Cảnh báo kèm bản rút gọn của kết quả: cập nhật khung kết quả mới nhất
+        if (data.latest) {
+            updateLatestResult(data.latest);
+        }
+    });
+
+    // Ảnh chụp đã ghi xong xuống thẻ nhớ: tải lại lưới để ảnh/thumbnail hiển thị được
+    socket.on('capture_saved', (data) => {
+        if (data.kind === 'daily') {
+            loadDailyCaptures();
+        } else {
+            loadManualCaptures();
         }
     });
 
@@ -3,37 +3,150 @@ import threading
 import time
 import numpy as np
 
+def is_jpeg(data):
+    """Kiểm tra bytes/mảng có phải JPEG (bắt đầu bằng marker SOI 0xFFD8)"""
+    return data is not None and len(data) > 2 and data[0] == 0xFF and data[1] == 0xD8
+
+class MJPEGFileSource:
+    """
+    Nguồn giả lập camera từ file MJPEG (các ảnh JPEG nối liền nhau),
+    cùng giao diện read()/set()/isOpened()/release() như cv2.VideoCapture
+    """
+    def __init__(self, path, fps=30, loop=True):
+        with open(path, 'rb') as f:
+            data = f.read()
+        # Tách từng ảnh JPEG theo marker SOI (FFD8) và EOI (FFD9)
+        self.frames = []
+        start = data.find(b'\xff\xd8')
+        while start != -1:
+            end = data.find(b'\xff\xd9', start)
+            if end == -1:
+                break
+            self.frames.append(data[start:end + 2])
+            start = data.find(b'\xff\xd8', end + 2)
+        self.fps = fps
+        self.loop = loop
+        self.index = 0
+        self.convert_rgb = True
+        self.next_time = time.perf_counter()
+    
+    def isOpened(self):
+        return len(self.frames) > 0
+    
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_CONVERT_RGB:
+            self.convert_rgb = bool(value)
+        elif prop == cv2.CAP_PROP_FPS and value:
+            self.fps = value
+        return True
+    
+    def read(self, image=None):
+        # Giữ tham chiếu cục bộ: release() có thể xóa danh sách frame từ thread khác
+        frames = self.frames
+        if not frames:
+            return False, None
+        if self.index >= len(frames):
+            if not self.loop:
+                return False, None
+            self.index = 0
+        
+        # Giữ nhịp như camera thật
+        delay = self.next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_time = max(self.next_time, time.perf_counter() - 1.0) + 1.0 / self.fps
+        
+        jpeg = frames[self.index % len(frames)]
+        self.index += 1
+        raw = np.frombuffer(jpeg, dtype=np.uint8)
+        if not self.convert_rgb:
+            return True, raw.reshape(1, -1)
+        return True, cv2.imdecode(raw, cv2.IMREAD_COLOR)
+    
+    def release(self):
+        self.frames = []
+
+class SyntheticSource(MJPEGFileSource):
+    """Nguồn giả lập: sinh sẵn một đoạn frame chuyển động và encode JPEG"""
+    def __init__(self, width=640, height=480, fps=30, num_frames=60, quality=80):
+        rng = np.random.default_rng(0)
+        base = cv2.GaussianBlur(rng.integers(0, 256, (height, width, 3), dtype=np.uint8), (15, 15), 0)
+        self.frames = []
+        for i in range(num_frames):
+            frame = np.roll(base, i * width // num_frames, axis=1)
+            ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            self.frames.append(buffer.tobytes())
+        self.fps = fps
+        self.loop = True
+        self.index = 0
+        self.convert_rgb = True
+        self.next_time = time.perf_counter()
+
 class Camera:
-    def __init__(self, camera_index=0):
-        self.camera_index = camera_index
+    def __init__(self, camera_index=0, mode='bgr', source=None):
+        """
+        camera_index: chỉ số webcam
+        mode: 'bgr' (giải mã mỗi frame) hoặc 'mjpeg' (giữ JPEG từ camera, chỉ giải mã khi cần pixel)
+        source: None (webcam), đường dẫn file video/MJPEG, hoặc 'synthetic'
+        """
+        self.camera_index = camera_index if source is None else source
+        self.source = source
+        self.mode = mode
         self.cap = None
         self.frame = None
+        # JPEG gốc từ camera (chế độ mjpeg) và seq của frame đã giải mã gần nhất
+        self.jpeg = None
+        self.decoded_seq = 0
+        self.decode_count = 0
         self.lock = threading.Lock()
+        # Báo cho consumer khi có frame mới (dùng chung lock với frame)
+        self.frame_ready = threading.Condition(self.lock)
+        # Số thứ tự frame tăng dần; 0 = chưa có frame
+        self.seq = 0
         self.running = False
+        self.thread = None
         self.retry_count = 0
         self.max_retries = 5
         self.init_camera()
         
+    def _open_capture(self):
+        """Mở webcam hoặc nguồn giả lập"""
+        if self.source == 'synthetic':
+            return SyntheticSource()
+        if isinstance(self.source, str) and self.source.lower().endswith(('.mjpeg', '.mjpg')):
+            return MJPEGFileSource(self.source)
+        return cv2.VideoCapture(self.camera_index)
+    
     def init_camera(self):
         """Khởi tạo camera"""
         for i in range(self.max_retries):
             try:
                 print(f"Attempting to initialize camera index {self.camera_index}...")
-                self.cap = cv2.VideoCapture(self.camera_index)
+                self.cap = self._open_capture()
                 
                 # Đặt thông số camera
                 self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
                 self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
                 self.cap.set(cv2.CAP_PROP_FPS, 30)
+                if self.mode == 'mjpeg':
+                    # Yêu cầu camera gửi MJPG và không giải mã sang BGR
+                    self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+                    self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
                 
                 # Kiểm tra camera có mở được không
                 if self.cap.isOpened():
                     # Đọc thử một frame
                     ret, test_frame = self.cap.read()
+                    if ret and test_frame is not None and self.mode == 'mjpeg' and not is_jpeg(test_frame.reshape(-1)):
+                        # Thiết bị/backend không trả JPEG thô: quay về chế độ giải mã BGR
+                        print(f"Camera {self.camera_index} does not provide raw MJPG, using BGR mode")
+                        self.mode = 'bgr'
+                        self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 1)
                     if ret and test_frame is not None:
                         self.running = True
                         print(f"Camera {self.camera_index} initialized successfully")
-                        threading.Thread(target=self.update_frame, daemon=True).start()
+                        self.thread = threading.Thread(target=self.update_frame, daemon=True)
+                        self.thread.start()
                         return
                     else:
                         print(f"Camera {self.camera_index} opened but failed to read frame")
@@ -45,22 +158,44 @@ class Camera:
                 print(f"Error initializing camera {self.camera_index}: {e}")
             
             # Thử camera index tiếp theo
-            self.camera_index = 1 if self.camera_index == 0 else 0
+            if self.source is None:
+                self.camera_index = 1 if self.camera_index == 0 else 0
             time.sleep(1)
         
         print("Could not initialize any camera. Using placeholder.")
+        self.mode = 'bgr'
         self.running = True
         threading.Thread(target=self.update_placeholder, daemon=True).start()
             
+    def _publish(self, frame):
+        """
+        Đưa frame vừa đọc thành frame hiện tại và báo cho các consumer đang chờ
+        Mỗi frame là một mảng mới, khóa ghi và không bao giờ được dùng lại để đọc frame sau,
+        nên consumer giữ frame bao lâu cũng không thấy nội dung bị thay đổi
+        """
+        frame.flags.writeable = False
+        with self.frame_ready:
+            self.frame = frame
+            self.seq += 1
+            self.frame_ready.notify_all()
+    
     def update_frame(self):
         """Cập nhật frame liên tục từ camera thật"""
         while self.running:
             try:
-                if self.cap and self.cap.isOpened():
+                if self.cap and self.cap.isOpened() and self.mode == 'mjpeg':
+                    # Giữ nguyên JPEG từ camera, chưa giải mã
+                    ret, raw = self.cap.read()
+                    if ret:
+                        self._publish_jpeg(raw.tobytes())
+                    else:
+                        print("Failed to read frame from camera")
+                        time.sleep(0.1)
+                elif self.cap and self.cap.isOpened():
+                    # Mỗi lần đọc trả về mảng mới; không đọc đè vào frame đã publish
                     ret, frame = self.cap.read()
                     if ret:
-                        with self.lock:
-                            self.frame = frame.copy()
+                        self._publish(frame)
                     else:
                         print("Failed to read frame from camera")
                         time.sleep(0.1)
@@ -85,20 +220,79 @@ class Camera:
             circle_size = int(20 + 10 * np.sin(current_time * 2))
             cv2.circle(frame, (320, 350), circle_size, (0, 0, 255), 2)
             
-            with self.lock:
-                self.frame = frame
+            self._publish(frame)
             time.sleep(0.1)
     
-    def get_frame(self):
-        """Lấy frame hiện tại"""
+    def _publish_jpeg(self, jpeg):
+        """Chế độ mjpeg: lưu JPEG mới, frame BGR sẽ được giải mã khi có người cần"""
+        with self.frame_ready:
+            self.jpeg = jpeg
+            self.seq += 1
+            self.frame_ready.notify_all()
+    
+    def _current_frame(self):
+        """
+        (seq, view) của frame hiện tại; chế độ mjpeg giải mã JPEG mới nhất
+        (mỗi seq chỉ giải mã một lần dù nhiều consumer cùng cần)
+        """
+        with self.lock:
+            seq, jpeg = self.seq, self.jpeg
+            if self.mode != 'mjpeg' or self.decoded_seq == seq or jpeg is None:
+                return seq, self.frame
+        
+        frame = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            return seq, None
+        frame.flags.writeable = False
         with self.lock:
-            if self.frame is not None:
-                return self.frame.copy()
+            self.decode_count += 1
+            if seq > self.decoded_seq:
+                self.frame = frame
+                self.decoded_seq = seq
+        return seq, frame
+    
+    def get_frame(self):
+        """Lấy bản sao frame hiện tại (dùng khi cần giữ frame lâu: lưu file, phân tích)"""
+        _, frame = self._current_frame()
+        if frame is not None:
+            return frame.copy()
         return None
     
+    def get_frame_view(self):
+        """
+        Lấy (seq, frame chỉ đọc) của frame hiện tại, không copy
+        Frame không bao giờ bị camera ghi đè; copy nếu cần sửa
+        """
+        return self._current_frame()
+    
+    def wait_for_frame(self, after_seq=0, timeout=None):
+        """
+        Chờ tới khi có frame mới hơn after_seq
+        Trả về (seq, frame chỉ đọc), hoặc (after_seq, None) nếu hết thời gian chờ
+        """
+        with self.frame_ready:
+            if not self.frame_ready.wait_for(lambda: self.seq > after_seq or not self.running, timeout):
+                return after_seq, None
+        return self._current_frame()
+    
+    def wait_for_jpeg(self, after_seq=0, timeout=None):
+        """
+        Chế độ mjpeg: chờ JPEG mới hơn after_seq, trả về (seq, bytes JPEG gốc)
+        hoặc (after_seq, None) nếu hết thời gian chờ
+        """
+        with self.frame_ready:
+            if not self.frame_ready.wait_for(lambda: self.seq > after_seq or not self.running, timeout):
+                return after_seq, None
+            return self.seq, self.jpeg
+    
     def release(self):
         """Giải phóng camera"""
         self.running = False
+        with self.frame_ready:
+            self.frame_ready.notify_all()
+        # Chờ thread đọc camera dừng trước khi giải phóng thiết bị/nguồn giả lập
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
         if self.cap:
             self.cap.release()
             print("Camera released")
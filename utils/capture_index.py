@@ -0,0 +1,138 @@
+import os
+import time
+import sqlite3
+import threading
+from datetime import datetime
+
+from utils.history import connect
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS captures (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER,
+    created REAL NOT NULL,
+    UNIQUE (kind, filename)
+);
+CREATE INDEX IF NOT EXISTS idx_captures_kind_created ON captures (kind, created, id);
+CREATE TABLE IF NOT EXISTS capture_counts (
+    kind TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+"""
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+class CaptureIndex:
+    """
+    Index metadata ảnh chụp (tên file, đường dẫn, kích thước, thời điểm) trong SQLite.
+    Ảnh được thêm vào index ngay khi ghi file, nên liệt kê chỉ đọc một trang
+    theo (created, id) thay vì quét cả thư mục. Số ảnh mỗi loại được giữ
+    trong bảng capture_counts để không phải COUNT(*) toàn bảng.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        """Kết nối riêng cho mỗi thread"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            self.local.conn = conn
+        return conn
+
+    def _insert(self, conn, kind, filename, path, size, created):
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO captures (kind, filename, path, size, created) VALUES (?, ?, ?, ?, ?)",
+            (kind, filename, path, size, created))
+        if cursor.rowcount:
+            conn.execute(
+                "INSERT INTO capture_counts (kind, count) VALUES (?, 1)"
+                " ON CONFLICT(kind) DO UPDATE SET count = count + 1", (kind,))
+        return cursor.rowcount
+
+    def add(self, kind, filename, path, filepath=None, created=None):
+        """
+        Thêm một ảnh vào index (đọc kích thước file nếu có filepath)
+        Ảnh đã có trong index (thêm lúc đưa vào hàng đợi ghi) thì chỉ cập nhật kích thước
+        """
+        size = os.path.getsize(filepath) if filepath and os.path.exists(filepath) else None
+        conn = self._conn()
+        with conn:
+            if not self._insert(conn, kind, filename, path, size, created or time.time()) and size is not None:
+                conn.execute("UPDATE captures SET size = ? WHERE kind = ? AND filename = ?", (size, kind, filename))
+
+    def rebuild(self, kind, folder, url_prefix, force=False):
+        """
+        Dựng index cho một loại ảnh từ thư mục trên đĩa
+        Chỉ chạy lần đầu (khi index chưa có loại này) trừ khi force=True
+        Trả về số ảnh đã thêm
+        """
+        conn = self._conn()
+        if not force and conn.execute("SELECT 1 FROM capture_counts WHERE kind = ?", (kind,)).fetchone():
+            return 0
+        added = 0
+        with conn:
+            if force:
+                conn.execute("DELETE FROM captures WHERE kind = ?", (kind,))
+            conn.execute("INSERT OR REPLACE INTO capture_counts (kind, count) VALUES (?, 0)", (kind,))
+            for filename, stat in self._scan(folder):
+                self._insert(conn, kind, filename, f"{url_prefix}/{filename}", stat.st_size, stat.st_mtime)
+                added += 1
+        print(f"[CAPTURE INDEX] Đã dựng index '{kind}' từ {folder}: {added} ảnh")
+        return added
+
+    def _scan(self, folder, prefix=''):
+        """Duyệt ảnh trong folder và các thư mục con YYYY/MM/DD (bỏ qua thư mục ẩn như .thumbs)"""
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir():
+                    yield from self._scan(entry.path, f"{prefix}{entry.name}/")
+                elif entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield f"{prefix}{entry.name}", entry.stat()
+
+    def count(self, kind):
+        row = self._conn().execute("SELECT count FROM capture_counts WHERE kind = ?", (kind,)).fetchone()
+        return row['count'] if row else 0
+
+    def list(self, kind, limit=10, cursor=None, start=None, end=None):
+        """
+        Ảnh mới nhất trước; start/end là unix time; cursor 'created:id' của ảnh cuối trang trước
+        Trả về (danh sách ảnh, cursor trang sau hoặc None)
+        """
+        sql = "SELECT id, filename, path, size, created FROM captures WHERE kind = ?"
+        params = [kind]
+        if start is not None:
+            sql += " AND created >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND created <= ?"
+            params.append(end)
+        if cursor:
+            cursor_created, cursor_id = cursor.split(':')
+            sql += " AND (created, id) < (?, ?)"
+            params.extend([float(cursor_created), int(cursor_id)])
+        sql += " ORDER BY created DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self._conn().execute(sql, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = f"{rows[-1]['created']!r}:{rows[-1]['id']}"
+        captures = [{
+            'filename': row['filename'],
+            'path': row['path'],
+            'size': row['size'],
+            'created': datetime.fromtimestamp(row['created']).strftime("%Y-%m-%d %H:%M")
+        } for row in rows]
+        return captures, next_cursor
@@ -0,0 +1,96 @@
+import time
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+
+class CapturePipeline:
+    """
+    Chụp ảnh theo từng giai đoạn, không giữ khóa camera:
+    1. snapshot: copy frame hiện tại (chỉ khóa nội bộ của Camera trong lúc copy)
+    2. lưu file: giao cho image writer, chạy song song với bước 3
+    3. phân tích: analyze() trong thread của người gọi
+    4. thông báo: publish() chạy notify (gửi Socket.IO) trong thread nền,
+       người gọi trả kết quả ngay mà không chờ gửi xong
+    Stream video chỉ đọc frame từ camera nên không bao giờ phải chờ các bước trên.
+    """
+
+    def __init__(self, camera, save, analyze):
+        self.camera = camera
+        self.save = save
+        self.analyze = analyze
+        self.notifier = ThreadPoolExecutor(max_workers=1, thread_name_prefix="capture-notify")
+        self.lock = threading.Lock()
+
+        # Thống kê
+        self.captures = 0
+        self.failed = 0
+        self.snapshot_time = 0.0
+        self.analyze_time = 0.0
+        self.notify_pending = 0
+        self.notify_errors = 0
+
+    def capture(self, kind, source, frame=None):
+        """
+        Chụp, lưu và phân tích một frame (kind: 'daily', 'manual' hoặc 'auto')
+        frame: frame đã snapshot sẵn (vd. của trigger thay đổi cảnh), None thì lấy từ camera
+        Trả về dict (filename, path, results, timestamp, analysis_time, source),
+        None nếu camera không có frame
+        """
+        start = time.perf_counter()
+        if frame is None:
+            frame = self.camera.get_frame()
+        snapshot_done = time.perf_counter()
+        if frame is None:
+            with self.lock:
+                self.failed += 1
+            return None
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename, path = self.save(frame, kind, f"{kind}_{timestamp}")
+        results = self.analyze(frame, source=source, image_path=path)
+        capture = {
+            'filename': filename,
+            'path': path,
+            'results': results,
+            'timestamp': timestamp,
+            'analysis_time': datetime.now().strftime("%H:%M:%S"),
+            'source': source
+        }
+
+        with self.lock:
+            self.captures += 1
+            self.snapshot_time += snapshot_done - start
+            self.analyze_time += time.perf_counter() - snapshot_done
+        return capture
+
+    def publish(self, notify, payload):
+        """Gọi notify(payload) trong thread nền (theo thứ tự gửi)"""
+        with self.lock:
+            self.notify_pending += 1
+        self.notifier.submit(self._notify_safe, notify, payload)
+
+    def _notify_safe(self, notify, payload):
+        try:
+            notify(payload)
+        except Exception as e:
+            with self.lock:
+                self.notify_errors += 1
+            print(f"[CAPTURE ERROR] Lỗi gửi thông báo ảnh {payload.get('filename')}: {e}")
+        finally:
+            with self.lock:
+                self.notify_pending -= 1
+
+    def shutdown(self, wait=True):
+        self.notifier.shutdown(wait=wait)
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'captures': self.captures,
+                'failed': self.failed,
+                'avg_snapshot_ms': round(self.snapshot_time / self.captures * 1000, 2) if self.captures else 0.0,
+                'avg_analyze_ms': round(self.analyze_time / self.captures * 1000, 2) if self.captures else 0.0,
+                'notify_pending': self.notify_pending,
+                'notify_errors': self.notify_errors
+            }
@@ -0,0 +1,139 @@
+import time
+import threading
+
+import cv2
+import numpy as np
+
+
+class ChangeDetector:
+    """
+    Phát hiện thay đổi cảnh bằng so sánh frame thu nhỏ.
+    Frame được đưa về ảnh xám nhỏ (mặc định 64x48), làm mờ để bỏ nhiễu
+    cảm biến, trừ độ sáng trung bình để bỏ qua thay đổi ánh sáng đều,
+    rồi so với frame tham chiếu (frame của lần phân tích gần nhất).
+    Điểm thay đổi = tỉ lệ pixel lệch quá pixel_threshold.
+    """
+
+    def __init__(self, size=(64, 48), pixel_threshold=25, threshold=0.05):
+        self.size = size
+        self.pixel_threshold = pixel_threshold
+        self.threshold = threshold
+        self.reference = None
+
+    def prepare(self, frame):
+        """Frame BGR -> ảnh xám nhỏ float32 đã trừ độ sáng trung bình"""
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        small = cv2.GaussianBlur(small, (5, 5), 0).astype(np.float32)
+        small -= small.mean()
+        return small
+
+    def score(self, small):
+        """Tỉ lệ pixel thay đổi so với frame tham chiếu (1.0 nếu chưa có tham chiếu)"""
+        if self.reference is None:
+            return 1.0
+        return float(np.count_nonzero(np.abs(small - self.reference) > self.pixel_threshold)) / small.size
+
+    def set_reference(self, small):
+        self.reference = small
+
+
+class ChangeTrigger:
+    """
+    Kích hoạt chụp và phân tích khi cảnh thay đổi, thay vì phân tích liên tục.
+    Mỗi check_interval giây xem frame mới nhất của camera; gọi on_trigger(frame, lý do)
+    khi điểm thay đổi vượt ngưỡng (nhưng không sớm hơn min_interval kể từ lần trước)
+    hoặc khi kết quả đã cũ quá max_interval giây.
+    """
+
+    def __init__(self, camera, on_trigger, check_interval=1.0, min_interval=60, max_interval=3600,
+                 detector=None):
+        self.camera = camera
+        self.on_trigger = on_trigger
+        self.check_interval = check_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.detector = detector or ChangeDetector()
+
+        self.enabled = False
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.last_trigger = 0.0
+
+        # Thống kê
+        self.frames_examined = 0
+        self.check_time = 0.0
+        self.triggers = {'change': 0, 'stale': 0}
+        self.suppressed = 0
+        self.last_score = 0.0
+        self.started_at = None
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.enabled = True
+        self.started_at = time.time()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="change-trigger", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.enabled = False
+        self.stop_event.set()
+
+    def check(self, frame, now=None):
+        """
+        Xét một frame; trả về lý do kích hoạt ('change', 'stale') hoặc None.
+        Tách riêng khỏi thread để có thể gọi trực tiếp (benchmark, kiểm tra)
+        """
+        now = time.time() if now is None else now
+        start = time.perf_counter()
+        small = self.detector.prepare(frame)
+        score = self.detector.score(small)
+        self.check_time += time.perf_counter() - start
+        self.frames_examined += 1
+        self.last_score = score
+
+        reason = None
+        if score >= self.detector.threshold:
+            if now - self.last_trigger >= self.min_interval:
+                reason = 'change'
+            else:
+                # Cảnh đang thay đổi nhưng vừa phân tích xong: chờ hết thời gian nghỉ
+                self.suppressed += 1
+        elif now - self.last_trigger >= self.max_interval:
+            reason = 'stale'
+
+        if reason is not None:
+            self.detector.set_reference(small)
+            self.last_trigger = now
+            self.triggers[reason] += 1
+        return reason
+
+    def _run(self):
+        while not self.stop_event.wait(self.check_interval):
+            try:
+                _, view = self.camera.get_frame_view()
+                if view is None:
+                    continue
+                reason = self.check(view)
+                if reason is not None:
+                    # Frame của camera chỉ đọc: copy để bước phân tích/lưu được tự do sửa
+                    self.on_trigger(view.copy(), reason)
+            except Exception as e:
+                print(f"[CHANGE TRIGGER ERROR] {e}")
+
+    def get_stats(self):
+        inferences = sum(self.triggers.values())
+        return {
+            'enabled': self.enabled,
+            'threshold': self.detector.threshold,
+            'last_score': round(self.last_score, 4),
+            'frames_examined': self.frames_examined,
+            'inferences_run': inferences,
+            'triggers': dict(self.triggers),
+            'suppressed_by_cooldown': self.suppressed,
+            'inference_savings_percent': round((1 - inferences / self.frames_examined) * 100, 1) if self.frames_examined else 0.0,
+            'avg_check_ms': round(self.check_time / self.frames_examined * 1000, 3) if self.frames_examined else 0.0
+        }
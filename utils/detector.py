@@ -1,13 +1,23 @@
 import numpy as np
 import cv2
 from PIL import Image
-import tensorflow as tf
+
+from utils.tflite_backend import load_interpreter_class
 
 class DiseaseDetector:
-    def __init__(self, model_path, labels_path):
+    # Các lớp hợp lệ mà hệ thống chấp nhận
+    VALID_CLASSES = ['healthy', 'powdery_mildew', 'Late_blight', 'Septoria_leaf_spot', 'Tomato_mosaic_virus']
+    # Kích thước batch của input tensor được làm tròn lên các mức này (batch lớn hơn giữ nguyên)
+    # để allocate_tensors() không chạy lại mỗi khi số ảnh thay đổi
+    BATCH_BUCKETS = (1, 2, 4, 8)
+    
+    def __init__(self, model_path, labels_path, num_threads=None, backend=None):
         self.model_path = model_path
         self.labels = self.load_labels(labels_path)
-        self.interpreter = tf.lite.Interpreter(model_path=model_path)
+        self.num_threads = num_threads
+        # Import backend (tflite_runtime/ai_edge_litert/tensorflow) ở lần đầu tạo detector
+        self.backend, Interpreter = load_interpreter_class(backend)
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
         self.interpreter.allocate_tensors()
         
         self.input_details = self.interpreter.get_input_details()
@@ -16,6 +26,11 @@ class DiseaseDetector:
         self.input_shape = self.input_details[0]['shape']
         self.input_height = self.input_shape[1]
         self.input_width = self.input_shape[2]
+        # Kích thước batch hiện tại của input tensor (đổi bằng resize_tensor_input)
+        self.batch_size = int(self.input_shape[0])
+        self._setup_quantization()
+        # Buffer resize/đổi màu cấp phát sẵn, tái sử dụng giữa các lần gọi
+        self._allocate_buffers(self.batch_size)
         
         self.model_loaded = True
         print(f"Model loaded: {model_path}")
@@ -29,57 +44,145 @@ class DiseaseDetector:
         print(f"Loaded {len(labels)} labels: {labels}")
         return labels
     
-    def preprocess_image(self, image):
-        """Tiền xử lý ảnh cho model"""
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        image_resized = cv2.resize(image_rgb, (self.input_width, self.input_height))
-        image_normalized = image_resized.astype(np.float32) / 255.0
-        image_expanded = np.expand_dims(image_normalized, axis=0)
-        return image_expanded
+    def _setup_quantization(self):
+        """Đọc kiểu dữ liệu và tham số lượng tử hóa của input/output"""
+        self.input_dtype = self.input_details[0]['dtype']
+        in_scale, in_zero_point = self.input_details[0]['quantization']
+        
+        # Bảng tra pixel (0-255) -> giá trị input cho model nguyên (uint8/int8)
+        self._input_lut = None
+        if self.input_dtype != np.float32:
+            pixels = np.arange(256, dtype=np.float64)
+            if in_scale:
+                # Model lượng tử hóa: q = x / scale + zero_point với x = pixel / 255
+                info = np.iinfo(self.input_dtype)
+                lut = np.clip(np.round(pixels / 255.0 / in_scale + in_zero_point), info.min, info.max)
+            else:
+                # Input nguyên nhưng không có tham số lượng tử: đưa pixel thô vào
+                lut = pixels
+            lut = lut.astype(self.input_dtype)
+            # Bảng tra đồng nhất (scale = 1/255, zero_point = 0) thì chỉ cần copy
+            if self.input_dtype != np.uint8 or not np.array_equal(lut, np.arange(256)):
+                self._input_lut = lut
+        
+        self.output_dtype = self.output_details[0]['dtype']
+        self.output_scale, self.output_zero_point = self.output_details[0]['quantization']
+    
+    def _allocate_buffers(self, batch_size):
+        shape = (batch_size, self.input_height, self.input_width, 3)
+        self._resize_buffer = np.empty(shape, dtype=np.uint8)
+        self._rgb_buffer = np.empty(shape, dtype=np.uint8)
+    
+    def preprocess_into_tensor(self, images):
+        """
+        Resize và đổi màu vào buffer cấp phát sẵn rồi ghi thẳng vào
+        input tensor của interpreter, không tạo mảng trung gian
+        """
+        n = len(images)
+        if self._resize_buffer.shape[0] < n:
+            self._allocate_buffers(n)
+        size = (self.input_width, self.input_height)
+        
+        for i, image in enumerate(images):
+            cv2.resize(image, size, dst=self._resize_buffer[i])
+            cv2.cvtColor(self._resize_buffer[i], cv2.COLOR_BGR2RGB, dst=self._rgb_buffer[i])
+        rgb = self._rgb_buffer[:n]
+        
+        # interpreter.tensor() trả về view tới bộ nhớ input; view chỉ sống trong hàm này
+        # vì invoke() sẽ báo lỗi nếu còn tham chiếu tới bộ nhớ nội bộ
+        input_view = self.interpreter.tensor(self.input_details[0]['index'])()
+        # Tensor có thể lớn hơn số ảnh (batch được làm tròn lên): các dòng thừa giữ dữ liệu cũ
+        if self.input_dtype == np.float32:
+            np.multiply(rgb, np.float32(1.0 / 255.0), out=input_view[:n], dtype=np.float32)
+        elif self._input_lut is None:
+            np.copyto(input_view[:n], rgb)
+        else:
+            for i in range(n):
+                cv2.LUT(rgb[i], self._input_lut, dst=input_view[i])
+        del input_view
+    
+    def _ensure_batch_size(self, batch_size):
+        """Đổi kích thước batch của input tensor khi cần"""
+        if batch_size == self.batch_size:
+            return
+        self.interpreter.resize_tensor_input(
+            self.input_details[0]['index'],
+            [batch_size, self.input_height, self.input_width, 3])
+        self.interpreter.allocate_tensors()
+        self.batch_size = batch_size
+    
+    def _bucket_size(self, n):
+        return next((size for size in self.BATCH_BUCKETS if size >= n), n)
+    
+    def predict_batch(self, images):
+        """Chạy model một lần cho cả batch, trả về xác suất (N, số lớp)"""
+        n = len(images)
+        self._ensure_batch_size(self._bucket_size(n))
+        self.preprocess_into_tensor(images)
+        self.interpreter.invoke()
+        
+        output_data = self.interpreter.get_tensor(self.output_details[0]['index'])[:n]
+        if self.output_dtype != np.float32 and self.output_scale:
+            # Giải lượng tử output về xác suất thực
+            output_data = (output_data.astype(np.float32) - self.output_zero_point) * self.output_scale
+        return output_data
+    
+    def build_result(self, predictions):
+        """Chuyển vector xác suất của một ảnh thành dict kết quả"""
+        class_id = np.argmax(predictions)
+        confidence = predictions[class_id]
+        
+        if class_id < len(self.labels):
+            class_name = self.labels[class_id]
+        else:
+            class_name = f"Class_{class_id}"
+        
+        # Kiểm tra xem class_name có trong 5 loại hợp lệ không
+        is_valid_class = any(valid_class.lower() in class_name.lower() for valid_class in self.VALID_CLASSES)
+        
+        if not is_valid_class:
+            # Nếu không phải 5 loại hợp lệ, gán là "Không xác định"
+            class_name = "Không xác định"
+            confidence = 0.0
+        
+        return {
+            'class_id': int(class_id),
+            'class_name': class_name,
+            'confidence': float(confidence),
+            'confidence_percent': f"{confidence * 100:.2f}%",
+            'is_valid_class': is_valid_class
+        }
     
     def detect(self, image):
         """Nhận diện bệnh từ ảnh"""
         try:
-            input_data = self.preprocess_image(image)
-            
-            self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
-            self.interpreter.invoke()
+            predictions = self.predict_batch([image])[0]
+            results = self.build_result(predictions)
             
-            output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
-            predictions = output_data[0]
+            processed_image = self.draw_results(image, results['class_name'], results['confidence'])
             
-            class_id = np.argmax(predictions)
-            confidence = predictions[class_id]
-            
-            if class_id < len(self.labels):
-                class_name = self.labels[class_id]
-            else:
-                class_name = f"Class_{class_id}"
-            
-            # Kiểm tra xem class_name có trong 5 loại hợp lệ không
-            valid_classes = ['healthy', 'powdery_mildew', 'Late_blight', 'Septoria_leaf_spot', 'Tomato_mosaic_virus']
-            is_valid_class = any(valid_class.lower() in class_name.lower() for valid_class in valid_classes)
-            
-            if not is_valid_class:
-                # Nếu không phải 5 loại hợp lệ, gán là "Không xác định"
-                class_name = "Không xác định"
-                confidence = 0.0
-            
-            processed_image = self.draw_results(image, class_name, confidence)
-            
-            return processed_image, {
-                'class_id': int(class_id),
-                'class_name': class_name,
-                'confidence': float(confidence),
-                'confidence_percent': f"{confidence * 100:.2f}%",
-                'is_valid_class': is_valid_class
-            }
+            return processed_image, results
             
         except Exception as e:
             print(f"Lỗi nhận diện: {e}")
             return image, None
     
-    def draw_results(self, image, class_name, confidence):
+    def detect_batch(self, images):
+        """
+        Nhận diện bệnh cho nhiều ảnh với một lần invoke()
+        Trả về list dict kết quả (cùng dạng detect()), None nếu lỗi
+        """
+        if len(images) == 0:
+            return []
+        try:
+            predictions = self.predict_batch(images)
+            return [self.build_result(p) for p in predictions]
+        except Exception as e:
+            print(f"Lỗi nhận diện batch: {e}")
+            return [None] * len(images)
+    
+    @staticmethod
+    def draw_results(image, class_name, confidence):
         """Vẽ kết quả nhận diện lên ảnh"""
         display_image = image.copy()
         
@@ -0,0 +1,163 @@
+import time
+import queue
+import threading
+from contextlib import contextmanager
+
+from utils.detector import DiseaseDetector
+
+
+class DetectorPool:
+    """
+    Pool gồm nhiều DiseaseDetector, mỗi detector có interpreter riêng.
+    Mỗi request mượn một detector, dùng xong trả lại pool.
+    Với lazy=True, backend và model chỉ được nạp (trong thread nền)
+    khi gọi load_async() hoặc khi có request đầu tiên.
+    """
+
+    def __init__(self, model_path, labels_path, size=2, num_threads=None, backend=None, lazy=False):
+        self.model_path = model_path
+        self.labels_path = labels_path
+        self.size = max(1, int(size))
+        self.num_threads = num_threads
+        self.backend = backend
+        self._available = queue.Queue()
+        self.detectors = []
+
+        # Đọc labels ngay (rẻ) để /get_status không phải chờ model
+        with open(labels_path, 'r', encoding='utf-8') as f:
+            self.labels = [line.strip() for line in f.readlines()]
+
+        # Trạng thái nạp model
+        self._load_lock = threading.Lock()
+        self._load_started = False
+        self._ready = threading.Event()
+        self.load_error = None
+        self.load_time = None
+
+        # Thống kê thời gian chờ mượn detector
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.in_use = 0
+
+        if lazy:
+            print(f"[DETECTOR POOL] {self.size} interpreter (nạp trễ), num_threads={num_threads}")
+        else:
+            self._start_loading()
+            self._load()
+
+    def _start_loading(self):
+        """Đánh dấu bắt đầu nạp; trả về False nếu đã có thread khác nạp"""
+        with self._load_lock:
+            if self._load_started:
+                return False
+            self._load_started = True
+            return True
+
+    def _load(self):
+        """Tạo các detector; detector nào xong trước được đưa vào pool trước"""
+        start = time.perf_counter()
+        try:
+            for _ in range(self.size):
+                detector = DiseaseDetector(self.model_path, self.labels_path,
+                                           num_threads=self.num_threads, backend=self.backend)
+                self.detectors.append(detector)
+                self._available.put(detector)
+            self.backend = self.detectors[0].backend
+            self.load_time = time.perf_counter() - start
+            print(f"[DETECTOR POOL] {self.size} interpreter ({self.backend}), "
+                  f"num_threads={self.num_threads}, nạp trong {self.load_time:.2f}s")
+        except Exception as e:
+            self.load_error = e
+            print(f"[DETECTOR POOL ERROR] Lỗi nạp model: {e}")
+        finally:
+            self._ready.set()
+
+    def load_async(self):
+        """Nạp backend và model trong thread nền, không chặn khởi động app"""
+        if self._start_loading():
+            threading.Thread(target=self._load, name="detector-loader", daemon=True).start()
+
+    def wait_ready(self, timeout=None):
+        """Chờ nạp xong; ném lỗi nếu nạp thất bại"""
+        if self._start_loading():
+            self._load()
+        self._ready.wait(timeout)
+        if self.load_error is not None:
+            raise RuntimeError(f"Không nạp được model: {self.load_error}")
+        return self._ready.is_set()
+
+    @property
+    def model_loaded(self):
+        return self._ready.is_set() and self.load_error is None and len(self.detectors) > 0
+
+    @property
+    def input_height(self):
+        self.wait_ready()
+        return self.detectors[0].input_height
+
+    @property
+    def input_width(self):
+        self.wait_ready()
+        return self.detectors[0].input_width
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        """Mượn một detector (chờ nếu tất cả đang bận hoặc model đang nạp)"""
+        start = time.perf_counter()
+        if not self._ready.is_set():
+            self.load_async()
+        deadline = None if timeout is None else start + timeout
+
+        while True:
+            if self.load_error is not None:
+                raise RuntimeError(f"Không nạp được model: {self.load_error}")
+            remaining = 0.5 if deadline is None else min(0.5, deadline - time.perf_counter())
+            if remaining <= 0:
+                raise TimeoutError("Không có interpreter rảnh trong thời gian chờ")
+            try:
+                detector = self._available.get(timeout=remaining)
+                break
+            except queue.Empty:
+                continue
+        wait = time.perf_counter() - start
+
+        with self._stats_lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.in_use += 1
+
+        try:
+            yield detector
+        finally:
+            with self._stats_lock:
+                self.in_use -= 1
+            self._available.put(detector)
+
+    def detect(self, image):
+        """Nhận diện một ảnh bằng detector mượn từ pool"""
+        with self.checkout() as detector:
+            return detector.detect(image)
+
+    def detect_batch(self, images):
+        """Nhận diện nhiều ảnh bằng detector mượn từ pool"""
+        with self.checkout() as detector:
+            return detector.detect_batch(images)
+
+    def get_stats(self):
+        """Thống kê pool để hiển thị trong /get_status"""
+        with self._stats_lock:
+            avg_wait = self.total_wait / self.checkouts if self.checkouts else 0.0
+            return {
+                'backend': self.backend,
+                'model_loaded': self.model_loaded,
+                'load_time_s': round(self.load_time, 3) if self.load_time is not None else None,
+                'pool_size': self.size,
+                'num_threads': self.num_threads,
+                'in_use': self.in_use,
+                'checkouts': self.checkouts,
+                'avg_wait_ms': round(avg_wait * 1000, 3),
+                'max_wait_ms': round(self.max_wait * 1000, 3)
+            }
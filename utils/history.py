@@ -0,0 +1,201 @@
+import json
+import time
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    source TEXT NOT NULL,
+    class_name TEXT,
+    confidence REAL,
+    severity TEXT,
+    type TEXT,
+    image_path TEXT,
+    temperature REAL,
+    humidity REAL,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_ts ON analyses (ts, id);
+CREATE INDEX IF NOT EXISTS idx_analyses_class_ts ON analyses (class_name, ts, id);
+CREATE INDEX IF NOT EXISTS idx_analyses_source_ts ON analyses (source, ts, id);
+"""
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_time(value, end_of_day=False):
+    """'YYYY-MM-DD' hoặc 'YYYY-MM-DD HH:MM:SS' -> unix time; None nếu không truyền"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, TIME_FORMAT).timestamp()
+    except ValueError:
+        day = datetime.strptime(value, "%Y-%m-%d").timestamp()
+        return day + 86400 - 1e-6 if end_of_day else day
+
+
+def connect(db_path, **kwargs):
+    conn = sqlite3.connect(db_path, timeout=10, **kwargs)
+    # WAL: đọc không chặn ghi; NORMAL đủ an toàn với WAL và ghi nhanh hơn FULL
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class AnalysisHistory:
+    """
+    Lịch sử kết quả phân tích trong SQLite (chế độ WAL).
+    record() chỉ đưa bản ghi vào hàng đợi; một thread nền ghi theo lô
+    (tối đa batch_size bản ghi hoặc mỗi flush_interval giây) trong một transaction.
+    query() phân trang kiểu keyset theo (ts, id) nên trang sâu vẫn nhanh.
+    """
+
+    def __init__(self, db_path, batch_size=100, flush_interval=1.0):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.local = threading.local()
+
+        conn = connect(db_path)
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        # Thống kê
+        self.written = 0
+        self.batches = 0
+        self.write_time = 0.0
+
+        self.running = True
+        self.thread = threading.Thread(target=self._writer, name="history-writer", daemon=True)
+        self.thread.start()
+
+    def _reader(self):
+        """Kết nối đọc riêng cho mỗi thread (sqlite3 không chia sẻ kết nối giữa các thread)"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            self.local.conn = conn
+        return conn
+
+    def record(self, results, source, image_path=None, temperature=None, humidity=None, timestamp=None):
+        """Đưa một kết quả analyze_image() vào hàng đợi ghi"""
+        details = {k: results[k] for k in ('tta', 'tiling', 'cache_hit', 'mode') if k in results}
+        if 'tiling' in details:
+            # Heatmap có thể lớn: chỉ giữ số liệu tổng hợp
+            details['tiling'] = {k: v for k, v in details['tiling'].items() if k != 'heatmap'}
+        self.queue.put((
+            timestamp or time.time(),
+            source,
+            results.get('class_name'),
+            float(results.get('confidence', 0.0)),
+            results.get('severity'),
+            results.get('type'),
+            image_path,
+            temperature,
+            humidity,
+            json.dumps(details, ensure_ascii=False, default=str) if details else None
+        ))
+
+    def _writer(self):
+        conn = connect(self.db_path)
+        while self.running or not self.queue.empty():
+            try:
+                rows = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            # Gom thêm các bản ghi đang chờ để ghi một lần
+            deadline = time.monotonic() + self.flush_interval
+            while len(rows) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    rows.append(self.queue.get(timeout=remaining if self.running else 0))
+                except queue.Empty:
+                    break
+            self._write(conn, rows)
+        conn.close()
+
+    def _write(self, conn, rows):
+        start = time.perf_counter()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO analyses (ts, source, class_name, confidence, severity, type,"
+                    " image_path, temperature, humidity, details) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows)
+            self.written += len(rows)
+            self.batches += 1
+        except sqlite3.Error as e:
+            print(f"[HISTORY ERROR] Lỗi ghi {len(rows)} bản ghi: {e}")
+        finally:
+            for _ in rows:
+                self.queue.task_done()
+        self.write_time += time.perf_counter() - start
+
+    def flush(self):
+        """Chờ ghi hết các bản ghi đang trong hàng đợi"""
+        self.queue.join()
+
+    def close(self):
+        self.running = False
+        self.thread.join(timeout=10)
+
+    def query(self, start=None, end=None, class_name=None, source=None, limit=50, cursor=None):
+        """
+        Lấy lịch sử mới nhất trước, lọc theo khoảng thời gian (unix time), lớp bệnh và nguồn
+        cursor: 'ts:id' của bản ghi cuối trang trước
+        Trả về (danh sách bản ghi, cursor trang sau hoặc None)
+        """
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("ts <= ?")
+            params.append(end)
+        if class_name:
+            conditions.append("class_name = ?")
+            params.append(class_name)
+        if source:
+            conditions.append("source = ?")
+            params.append(source)
+        if cursor:
+            cursor_ts, cursor_id = cursor.split(':')
+            conditions.append("(ts, id) < (?, ?)")
+            params.extend([float(cursor_ts), int(cursor_id)])
+
+        sql = "SELECT * FROM analyses"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self._reader().execute(sql, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = f"{rows[-1]['ts']!r}:{rows[-1]['id']}"
+        return [self._to_dict(row) for row in rows], next_cursor
+
+    @staticmethod
+    def _to_dict(row):
+        item = dict(row)
+        item['timestamp'] = datetime.fromtimestamp(item.pop('ts')).strftime(TIME_FORMAT)
+        item['details'] = json.loads(item['details']) if item['details'] else {}
+        return item
+
+    def get_stats(self):
+        return {
+            'written': self.written,
+            'pending': self.queue.qsize(),
+            'batches': self.batches,
+            'avg_batch': round(self.written / self.batches, 1) if self.batches else 0.0,
+            'avg_batch_write_ms': round(self.write_time / self.batches * 1000, 2) if self.batches else 0.0
+        }
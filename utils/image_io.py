@@ -0,0 +1,59 @@
+import io
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Hệ số giảm -> cờ giải mã của OpenCV (JPEG được giảm ngay trong miền DCT)
+REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+def get_image_size(data):
+    """Đọc (width, height) từ header ảnh mà không giải mã pixel"""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            return img.size
+    except Exception:
+        return None
+
+
+def choose_decode_flag(size, target_size, margin=2):
+    """
+    Chọn cờ giải mã giảm độ phân giải lớn nhất mà ảnh sau giải mã
+    vẫn lớn hơn input của model ít nhất `margin` lần mỗi chiều
+    Trả về (cờ, hệ số giảm)
+    """
+    if size is None or target_size is None:
+        return cv2.IMREAD_COLOR, 1
+    width, height = size
+    target_w, target_h = target_size
+    for factor, flag in REDUCED_FLAGS:
+        if width // factor >= target_w * margin and height // factor >= target_h * margin:
+            return flag, factor
+    return cv2.IMREAD_COLOR, 1
+
+
+def decode_image(data, target_size=None, margin=2):
+    """
+    Giải mã ảnh từ bytes trong bộ nhớ, giảm độ phân giải theo input model
+    target_size: (width, height) của input model, None để giải mã đầy đủ
+    Trả về (ảnh BGR hoặc None, thông tin giải mã)
+    """
+    size = get_image_size(data) if target_size is not None else None
+    flag, factor = choose_decode_flag(size, target_size, margin)
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flag)
+    if image is None and flag != cv2.IMREAD_COLOR:
+        # Một số định dạng không hỗ trợ giải mã giảm: thử lại đầy đủ
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        factor = 1
+
+    info = {
+        'original_size': f"{size[0]}x{size[1]}" if size else None,
+        'decoded_size': f"{image.shape[1]}x{image.shape[0]}" if image is not None else None,
+        'reduction': factor
+    }
+    return image, info
@@ -0,0 +1,144 @@
+import os
+import time
+import queue
+import threading
+
+import cv2
+
+# Định dạng lưu ảnh -> (đuôi file, tham số encode theo chất lượng)
+FORMATS = {
+    'jpeg': ('.jpg', lambda q: [cv2.IMWRITE_JPEG_QUALITY, q]),
+    'webp': ('.webp', lambda q: [cv2.IMWRITE_WEBP_QUALITY, q]),
+}
+
+
+def shard_dir(timestamp=None):
+    """Thư mục con YYYY/MM/DD theo thời điểm chụp"""
+    return time.strftime("%Y/%m/%d", time.localtime(timestamp))
+
+
+class ImageWriter:
+    """
+    Ghi ảnh trong thread nền qua một hàng đợi giới hạn.
+    submit() tính sẵn đường dẫn cuối cùng (chia thư mục theo YYYY/MM/DD)
+    và trả về ngay; thread nền encode và ghi file (ghi tạm rồi đổi tên).
+    Hàng đợi đầy thì người gọi chờ tối đa block_timeout giây, quá thời gian
+    thì tự ghi luôn trong thread gọi để không bao giờ mất ảnh.
+    """
+
+    def __init__(self, fmt='jpeg', quality=90, max_queue=16, block_timeout=2.0):
+        if fmt not in FORMATS:
+            raise ValueError(f"Định dạng ảnh không hỗ trợ: {fmt}")
+        self.fmt = fmt
+        self.quality = quality
+        self.block_timeout = block_timeout
+        self.queue = queue.Queue(maxsize=max_queue)
+
+        # Thống kê
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.written = 0
+        self.failed = 0
+        self.bytes_written = 0
+        self.write_time = 0.0
+        self.max_depth = 0
+        self.blocked = 0
+        self.blocked_time = 0.0
+        self.sync_writes = 0
+
+        self.thread = threading.Thread(target=self._run, name="image-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, frame, folder, stem, timestamp=None, on_written=None):
+        """
+        Đưa frame vào hàng đợi ghi; frame không được sửa sau khi gửi
+        Trả về (đường dẫn tương đối trong folder, đường dẫn đầy đủ)
+        on_written(đường dẫn tương đối, đường dẫn đầy đủ) được gọi sau khi ghi xong
+        """
+        relative = f"{shard_dir(timestamp)}/{stem}{FORMATS[self.fmt][0]}"
+        filepath = os.path.join(folder, *relative.split('/'))
+        item = (frame, relative, filepath, on_written)
+
+        with self.lock:
+            self.submitted += 1
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            # Backpressure: thẻ nhớ chậm hơn tốc độ chụp
+            start = time.perf_counter()
+            try:
+                self.queue.put(item, timeout=self.block_timeout)
+            except queue.Full:
+                with self.lock:
+                    self.sync_writes += 1
+                self._write(*item)
+            with self.lock:
+                self.blocked += 1
+                self.blocked_time += time.perf_counter() - start
+        with self.lock:
+            self.max_depth = max(self.max_depth, self.queue.qsize())
+        return relative, filepath
+
+    def _write(self, frame, relative, filepath, on_written):
+        start = time.perf_counter()
+        try:
+            ret, buffer = cv2.imencode(FORMATS[self.fmt][0], frame, FORMATS[self.fmt][1](self.quality))
+            if not ret:
+                raise ValueError("encode thất bại")
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            tmp_path = f"{filepath}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(buffer)
+            os.replace(tmp_path, filepath)
+        except Exception as e:
+            with self.lock:
+                self.failed += 1
+            print(f"[IMAGE WRITER ERROR] Lỗi ghi {filepath}: {e}")
+            return
+        with self.lock:
+            self.written += 1
+            self.bytes_written += len(buffer)
+            self.write_time += time.perf_counter() - start
+        if on_written is not None:
+            try:
+                on_written(relative, filepath)
+            except Exception as e:
+                print(f"[IMAGE WRITER ERROR] Lỗi callback sau khi ghi {filepath}: {e}")
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        """Chờ ghi hết các ảnh đang trong hàng đợi"""
+        self.queue.join()
+
+    def close(self):
+        """Ghi hết hàng đợi rồi dừng thread"""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'format': self.fmt,
+                'quality': self.quality,
+                'queue_depth': self.queue.qsize(),
+                'queue_capacity': self.queue.maxsize,
+                'max_depth': self.max_depth,
+                'submitted': self.submitted,
+                'written': self.written,
+                'failed': self.failed,
+                'blocked_submits': self.blocked,
+                'blocked_ms': round(self.blocked_time * 1000, 1),
+                'sync_writes': self.sync_writes,
+                'avg_write_ms': round(self.write_time / self.written * 1000, 2) if self.written else 0.0,
+                'mb_written': round(self.bytes_written / 1024 / 1024, 2)
+            }
@@ -0,0 +1,141 @@
+import time
+import queue
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future
+
+# Đưa vào hàng đợi để báo một worker dừng
+_STOP = None
+
+
+class InferenceScheduler:
+    """
+    Gom các yêu cầu nhận diện đến gần nhau thành một batch.
+    Mỗi worker lấy yêu cầu đầu tiên, chờ thêm tối đa `window_ms`
+    (hoặc tới `max_batch` ảnh) rồi chạy một lần detect_batch() trên
+    một detector mượn từ DetectorPool. Kết quả trả về qua Future.
+    """
+
+    def __init__(self, pool, window_ms=0, max_batch=8, workers=None):
+        self.pool = pool
+        self.window = window_ms / 1000.0
+        self.max_batch = max(1, int(max_batch))
+        self.workers = workers or pool.size
+        self._queue = queue.Queue()
+
+        # Thống kê
+        self._stats_lock = threading.Lock()
+        self.batch_histogram = Counter()
+        self.queue_latencies = deque(maxlen=1000)
+        self.total_requests = 0
+
+        self.running = True
+        self._threads = [threading.Thread(target=self._worker, name=f"inference-{i}", daemon=True)
+                         for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+        print(f"[INFERENCE] Scheduler: {self.workers} worker, cửa sổ {window_ms}ms, batch tối đa {self.max_batch}")
+
+    def submit(self, image):
+        """Đưa ảnh vào hàng đợi, trả về Future chứa dict kết quả"""
+        if not self.running:
+            raise RuntimeError("Scheduler đã dừng")
+        future = Future()
+        self._queue.put((image, future, time.perf_counter()))
+        return future
+
+    def detect(self, image, timeout=None):
+        """Nhận diện đồng bộ một ảnh qua scheduler"""
+        return self.submit(image).result(timeout=timeout)
+
+    def _collect_batch(self):
+        """
+        Lấy một batch: chặn tới khi có yêu cầu đầu tiên rồi gom thêm trong cửa sổ
+        Trả về (batch, stop); stop = True khi đã lấy phải _STOP (worker dừng sau batch này)
+        """
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    item = self._queue.get_nowait()
+                else:
+                    item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _worker(self):
+        stop = False
+        while not stop:
+            batch, stop = self._collect_batch()
+            if not batch:
+                continue
+            started = time.perf_counter()
+
+            with self._stats_lock:
+                self.batch_histogram[len(batch)] += 1
+                self.total_requests += len(batch)
+                for _, _, submitted in batch:
+                    self.queue_latencies.append(started - submitted)
+
+            # Bỏ qua các Future đã bị hủy
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                results = self.pool.detect_batch([image for image, _, _ in batch])
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                print(f"[INFERENCE ERROR] Lỗi chạy batch: {e}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+
+    def shutdown(self, wait=True):
+        """Dừng nhận yêu cầu mới; các worker xử lý hết yêu cầu đã xếp hàng rồi thoát"""
+        if not self.running:
+            return
+        self.running = False
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def get_stats(self):
+        """Độ sâu hàng đợi, phân bố kích thước batch và độ trễ xếp hàng"""
+        with self._stats_lock:
+            latencies = sorted(self.queue_latencies)
+            histogram = dict(sorted(self.batch_histogram.items()))
+            total_requests = self.total_requests
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 3)
+
+        batches = sum(histogram.values())
+        return {
+            'queue_depth': self._queue.qsize(),
+            'window_ms': self.window * 1000,
+            'max_batch': self.max_batch,
+            'total_requests': total_requests,
+            'total_batches': batches,
+            'avg_batch_size': round(total_requests / batches, 2) if batches else 0,
+            'batch_size_histogram': histogram,
+            'queue_latency_ms': {
+                'avg': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+                'p50': percentile(0.50),
+                'p95': percentile(0.95),
+                'max': round(latencies[-1] * 1000, 3) if latencies else 0.0
+            }
+        }
@@ -0,0 +1,92 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobManager:
+    """
+    Hàng đợi job phân tích chạy trên một pool thread nhỏ.
+    Client nhận job_id ngay lập tức, sau đó hỏi trạng thái hoặc nhận
+    kết quả qua callback `on_complete` (ví dụ emit Socket.IO).
+    """
+
+    def __init__(self, max_workers=2, max_jobs=500, on_complete=None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self.on_complete = on_complete
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def submit(self, fn, *args, **meta):
+        """Đưa job vào hàng đợi, trả về bản sao thông tin job"""
+        job_id = uuid.uuid4().hex
+        job = {
+            'job_id': job_id,
+            'status': 'queued',
+            'created': time.time(),
+            'started': None,
+            'finished': None,
+            'result': None,
+            'error': None
+        }
+        job.update(meta)
+
+        with self.lock:
+            self.jobs[job_id] = job
+            self._evict()
+
+        self.executor.submit(self._run, job_id, fn, args)
+        return dict(job)
+
+    def _run(self, job_id, fn, args):
+        self._update(job_id, status='running', started=time.time())
+        try:
+            result = fn(*args)
+            job = self._update(job_id, status='done', finished=time.time(), result=result)
+        except Exception as e:
+            print(f"[JOB ERROR] Job {job_id} lỗi: {e}")
+            job = self._update(job_id, status='failed', finished=time.time(), error=str(e))
+
+        if self.on_complete and job is not None:
+            try:
+                self.on_complete(job)
+            except Exception as e:
+                print(f"[JOB ERROR] Callback hoàn thành job {job_id} lỗi: {e}")
+
+    def _update(self, job_id, **fields):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            job.update(fields)
+            return dict(job)
+
+    def _evict(self):
+        """Giữ tối đa max_jobs job, xóa các job đã xong cũ nhất trước"""
+        if len(self.jobs) <= self.max_jobs:
+            return
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.max_jobs:
+                break
+            if self.jobs[job_id]['status'] in ('done', 'failed'):
+                del self.jobs[job_id]
+
+    def get(self, job_id):
+        """Lấy bản sao thông tin job, None nếu không tồn tại"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def get_stats(self):
+        with self.lock:
+            counts = {'queued': 0, 'running': 0, 'done': 0, 'failed': 0}
+            for job in self.jobs.values():
+                counts[job['status']] += 1
+        counts['workers'] = self.max_workers
+        return counts
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
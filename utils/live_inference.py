@@ -0,0 +1,132 @@
+import time
+import threading
+
+
+class LiveInference:
+    """
+    Nhận diện trên video stream trong giới hạn tài nguyên.
+    Một thread riêng lấy mẫu frame mới nhất của camera và chạy detect_fn
+    không quá max_rate lần/giây và không quá cpu_budget % thời gian
+    (tính theo thời gian chạy inference). Stream không bao giờ chờ inference:
+    overlay chỉ đọc kết quả gần nhất.
+    """
+
+    def __init__(self, camera, detect_fn, max_rate=2.0, cpu_budget=50, publish_interval=1.0, on_result=None):
+        self.camera = camera
+        self.detect_fn = detect_fn
+        self.max_rate = max_rate
+        self.cpu_budget = cpu_budget
+        self.publish_interval = publish_interval
+        self.on_result = on_result
+
+        self.latest = None
+        self.enabled = False
+        self.thread = None
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+
+        # Thống kê
+        self.frames_seen = 0
+        self.inferences = 0
+        self.inference_time = 0.0
+        self.published = 0
+        self.enabled_at = None
+        self.last_publish = 0.0
+        self.last_published_class = None
+
+    def start(self):
+        with self.lock:
+            self.enabled = True
+            # Xóa tín hiệu của lần stop() trước kể cả khi thread cũ vẫn đang chạy (bật/tắt nhanh),
+            # nếu không wakeup.wait() sẽ trả về ngay và thread quay vòng chiếm CPU
+            self.wakeup.clear()
+            if self.thread is None or not self.thread.is_alive():
+                self.enabled_at = time.time()
+                self.thread = threading.Thread(target=self._run, name="live-inference", daemon=True)
+                self.thread.start()
+
+    def stop(self):
+        with self.lock:
+            self.enabled = False
+            self.latest = None
+            self.wakeup.set()
+
+    def _next_allowed(self, start, duration):
+        """Thời điểm sớm nhất được chạy inference tiếp theo theo giới hạn tần suất và % CPU"""
+        next_time = start + (1.0 / self.max_rate if self.max_rate else 0)
+        if self.cpu_budget and self.cpu_budget < 100:
+            # Chạy `duration` giây thì phải nghỉ đủ để tỉ lệ chạy/tổng <= cpu_budget %
+            next_time = max(next_time, start + duration * 100.0 / self.cpu_budget)
+        return next_time
+
+    def _run(self):
+        last_seq = 0
+        next_time = time.perf_counter()
+        while self.enabled:
+            delay = next_time - time.perf_counter()
+            if delay > 0 and self.wakeup.wait(delay):
+                continue
+
+            seq, view = self.camera.wait_for_frame(last_seq, timeout=1.0)
+            if view is None or not self.enabled:
+                continue
+            if last_seq:
+                self.frames_seen += seq - last_seq
+            last_seq = seq
+            # Frame của camera chỉ đọc và không bị ghi đè: đưa thẳng vào model, không copy
+            frame = view
+
+            start = time.perf_counter()
+            try:
+                result = self.detect_fn(frame)
+            except Exception as e:
+                print(f"[LIVE ERROR] Lỗi nhận diện live: {e}")
+                result = None
+            duration = time.perf_counter() - start
+            next_time = self._next_allowed(start, duration)
+
+            if result is None:
+                continue
+            self.inferences += 1
+            self.inference_time += duration
+            result = dict(result, timestamp=time.time(), frame_seq=seq)
+            with self.lock:
+                if not self.enabled:
+                    return
+                self.latest = result
+            self._maybe_publish(result)
+
+    def _maybe_publish(self, result):
+        """Gửi kết quả ra ngoài tối đa một lần mỗi publish_interval, hoặc ngay khi đổi lớp bệnh"""
+        if self.on_result is None:
+            return
+        now = time.time()
+        changed = result.get('class_name') != self.last_published_class
+        if not changed and now - self.last_publish < self.publish_interval:
+            return
+        self.last_publish = now
+        self.last_published_class = result.get('class_name')
+        self.published += 1
+        try:
+            self.on_result(result)
+        except Exception as e:
+            print(f"[LIVE ERROR] Lỗi gửi kết quả live: {e}")
+
+    def get_latest(self):
+        """Kết quả gần nhất (None nếu chưa có hoặc đang tắt)"""
+        return self.latest
+
+    def get_stats(self):
+        elapsed = time.time() - self.enabled_at if self.enabled_at else 0
+        return {
+            'enabled': self.enabled,
+            'max_rate': self.max_rate,
+            'cpu_budget_percent': self.cpu_budget,
+            'frames_seen': self.frames_seen,
+            'inferences': self.inferences,
+            'frames_skipped': max(0, self.frames_seen - self.inferences),
+            'avg_inference_ms': round(self.inference_time / self.inferences * 1000, 2) if self.inferences else 0.0,
+            'inference_rate': round(self.inferences / elapsed, 2) if elapsed else 0.0,
+            'busy_percent': round(self.inference_time / elapsed * 100, 1) if elapsed else 0.0,
+            'published': self.published
+        }
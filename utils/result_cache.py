@@ -0,0 +1,120 @@
+import json
+import time
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+def dhash(image, hash_size=8):
+    """Difference hash 64-bit của ảnh (so sánh độ sáng các pixel kề nhau)"""
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class PerceptualResultCache:
+    """
+    Cache kết quả nhận diện theo perceptual hash của frame.
+    Frame gần giống (khoảng cách Hamming <= max_distance) dùng lại kết quả cũ.
+    Loại bỏ theo LRU, TTL và giới hạn bộ nhớ.
+    """
+
+    # Chi phí ước tính cho mỗi entry ngoài phần JSON của kết quả (key, tuple, dict)
+    ENTRY_OVERHEAD = 200
+
+    def __init__(self, max_distance=4, ttl=600, max_entries=512, max_bytes=1024 * 1024):
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # hash -> (result, created, size)
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remove(self, key):
+        _, _, size = self.entries.pop(key)
+        self.bytes -= size
+
+    def _expire(self, now):
+        """Xóa các entry quá TTL (entry cũ nhất nằm đầu theo thời điểm dùng)"""
+        if not self.ttl:
+            return
+        expired = [key for key, (_, created, _) in self.entries.items() if now - created > self.ttl]
+        for key in expired:
+            self._remove(key)
+            self.evictions += 1
+
+    def lookup(self, image):
+        """Trả về (hash, bản sao kết quả hoặc None)"""
+        image_hash = dhash(image)
+        now = time.time()
+
+        with self.lock:
+            self._expire(now)
+
+            key = image_hash if image_hash in self.entries else None
+            if key is None and self.max_distance > 0:
+                best = self.max_distance + 1
+                for candidate in self.entries:
+                    distance = hamming(image_hash, candidate)
+                    if distance < best:
+                        key, best = candidate, distance
+                if key is not None:
+                    self.near_hits += 1
+
+            if key is None:
+                self.misses += 1
+                return image_hash, None
+
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return image_hash, dict(self.entries[key][0])
+
+    def put(self, image_hash, result):
+        """Lưu kết quả cho hash, loại bỏ entry cũ nếu vượt giới hạn"""
+        result = dict(result)
+        size = len(json.dumps(result, default=str)) + self.ENTRY_OVERHEAD
+
+        with self.lock:
+            if image_hash in self.entries:
+                self._remove(image_hash)
+            self.entries[image_hash] = (result, time.time(), size)
+            self.bytes += size
+
+            while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def get_stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'near_hits': self.near_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0,
+                'max_distance': self.max_distance,
+                'ttl': self.ttl
+            }
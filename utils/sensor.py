@@ -1,8 +1,16 @@
+import math
 import time
-import board
-import adafruit_dht
+import random
 from threading import Lock
 
+# Thư viện GPIO chỉ có trên Raspberry Pi; máy khác dùng SimulatedSensor
+try:
+    import board
+    import adafruit_dht
+except ImportError:
+    board = None
+    adafruit_dht = None
+
 class DHT11Sensor:
     def __init__(self, pin=17):
         """
@@ -16,8 +24,15 @@ class DHT11Sensor:
         self.last_humidity = None
         self.init_sensor()
         
+    @property
+    def connected(self):
+        return self.dht_device is not None
+        
     def init_sensor(self):
         """Khởi tạo cảm biến"""
+        if adafruit_dht is None:
+            print("Không có thư viện board/adafruit_dht: DHT11 không khả dụng")
+            return
         try:
             # Sử dụng GPIO number thay vì board pin
             # Trên Raspberry Pi OS 64-bit, sử dụng cách này
@@ -63,9 +78,19 @@ class DHT11Sensor:
                 self.dht_device = None
     
     def read(self):
-        """Đọc nhiệt độ và độ ẩm - xử lý lỗi RuntimeError"""
-        if self.dht_device is None:
+        """Đọc nhiệt độ và độ ẩm; lỗi thì trả về giá trị đọc được gần nhất"""
+        values = self.sample()
+        if values is None:
             return self.last_temp, self.last_humidity
+        return values
+    
+    def sample(self):
+        """
+        Đọc cảm biến (thử 3 lần - xử lý lỗi RuntimeError), có thể chặn vài giây
+        Trả về (nhiệt độ, độ ẩm) hoặc None nếu không đọc được
+        """
+        if self.dht_device is None:
+            return None
             
         with self.lock:
             for attempt in range(3):  # Thử 3 lần
@@ -94,9 +119,8 @@ class DHT11Sensor:
                     time.sleep(1)
                     continue
             
-            # Nếu sau 3 lần vẫn lỗi, trả về giá trị cuối cùng
-            print("DHT11: Using last known values after 3 failed attempts")
-            return self.last_temp, self.last_humidity
+            print("DHT11: 3 failed attempts")
+            return None
     
     def cleanup(self):
         """Dọn dẹp tài nguyên"""
@@ -104,4 +128,53 @@ class DHT11Sensor:
             try:
                 self.dht_device.exit()
             except:
-                pass
\ No newline at end of file
+                pass
+
+class SimulatedSensor:
+    """
+    Cảm biến giả lập cùng giao diện với DHT11Sensor (không cần GPIO):
+    nhiệt độ/độ ẩm theo chu kỳ ngày đêm cộng nhiễu, thỉnh thoảng đọc lỗi
+    và mỗi lần đọc mất read_delay giây như cảm biến thật
+    """
+    
+    def __init__(self, base_temp=26.0, base_humidity=65.0, fail_rate=0.05, read_delay=0.0, seed=None):
+        self.pin = None
+        self.base_temp = base_temp
+        self.base_humidity = base_humidity
+        self.fail_rate = fail_rate
+        self.read_delay = read_delay
+        self.random = random.Random(seed)
+        self.lock = Lock()
+        self.last_temp = None
+        self.last_humidity = None
+    
+    @property
+    def connected(self):
+        return True
+    
+    def values_at(self, timestamp):
+        """Giá trị (nhiệt độ, độ ẩm) tại một thời điểm: nóng nhất 14h, ẩm nhất lúc sáng sớm"""
+        local = time.localtime(timestamp)
+        hour = local.tm_hour + local.tm_min / 60
+        phase = math.cos((hour - 14) / 24 * 2 * math.pi)
+        temperature = self.base_temp + 4 * phase + self.random.gauss(0, 0.3)
+        humidity = self.base_humidity - 12 * phase + self.random.gauss(0, 1.0)
+        return round(temperature, 1), round(min(max(humidity, 20), 90), 1)
+    
+    def read(self):
+        values = self.sample()
+        if values is None:
+            return self.last_temp, self.last_humidity
+        return values
+    
+    def sample(self):
+        with self.lock:
+            if self.read_delay:
+                time.sleep(self.read_delay)
+            if self.random.random() < self.fail_rate:
+                return None
+            self.last_temp, self.last_humidity = self.values_at(time.time())
+            return self.last_temp, self.last_humidity
+    
+    def cleanup(self):
+        pass
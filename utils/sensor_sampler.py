@@ -0,0 +1,124 @@
+import time
+import threading
+
+import numpy as np
+
+
+class SensorSampler:
+    """
+    Một thread duy nhất đọc cảm biến mỗi interval giây và ghi mẫu
+    (thời điểm, nhiệt độ, độ ẩm) vào ring buffer NumPy kích thước cố định.
+    API và các thành phần khác chỉ đọc mẫu mới nhất từ buffer,
+    không bao giờ chạm vào cảm biến (DHT11 có thể chặn vài giây mỗi lần đọc).
+    """
+
+    def __init__(self, sensor, interval=10.0, capacity=8640, on_sample=None):
+        self.sensor = sensor
+        self.interval = interval
+        self.on_sample = on_sample
+        self.buffer = np.zeros((capacity, 3), dtype=np.float64)  # cột: timestamp, nhiệt độ, độ ẩm
+        self.capacity = capacity
+        self.count = 0  # tổng số mẫu đã ghi (vị trí ghi tiếp theo = count % capacity)
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        # Thống kê
+        self.reads = 0
+        self.failures = 0
+        self.read_time = 0.0
+        self.max_read_time = 0.0
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="sensor-sampler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+
+    def _run(self):
+        next_time = time.monotonic()
+        while not self.stop_event.is_set():
+            self.sample_once()
+            next_time += self.interval
+            # Lần đọc chậm hơn chu kỳ: bắt đầu lại từ bây giờ thay vì đọc dồn
+            next_time = max(next_time, time.monotonic())
+            self.stop_event.wait(next_time - time.monotonic())
+
+    def sample_once(self):
+        """Đọc cảm biến một lần và ghi vào buffer; trả về mẫu mới hoặc None nếu lỗi"""
+        start = time.perf_counter()
+        try:
+            values = self.sensor.sample()
+        except Exception as e:
+            print(f"[SENSOR ERROR] Lỗi đọc cảm biến: {e}")
+            values = None
+        elapsed = time.perf_counter() - start
+        self.reads += 1
+        self.read_time += elapsed
+        self.max_read_time = max(self.max_read_time, elapsed)
+        if values is None:
+            self.failures += 1
+            return None
+
+        sample = self.append(time.time(), *values)
+        if self.on_sample is not None:
+            try:
+                self.on_sample(sample)
+            except Exception as e:
+                print(f"[SENSOR ERROR] Lỗi xử lý mẫu cảm biến: {e}")
+        return sample
+
+    def append(self, timestamp, temperature, humidity):
+        with self.lock:
+            self.buffer[self.count % self.capacity] = (timestamp, temperature, humidity)
+            self.count += 1
+        return self._to_dict(timestamp, temperature, humidity)
+
+    @staticmethod
+    def _to_dict(timestamp, temperature, humidity):
+        return {
+            'timestamp': timestamp,
+            'temperature': round(float(temperature), 1),
+            'humidity': round(float(humidity), 1),
+            'age': round(time.time() - timestamp, 1)
+        }
+
+    def latest(self):
+        """Mẫu mới nhất (kèm 'age' = số giây từ lúc đọc) hoặc None nếu chưa có"""
+        with self.lock:
+            if self.count == 0:
+                return None
+            row = self.buffer[(self.count - 1) % self.capacity].copy()
+        return self._to_dict(*row)
+
+    def recent(self, seconds=None):
+        """Các mẫu trong buffer (cũ trước), mảng (n, 3); seconds: chỉ lấy các mẫu trong N giây gần nhất"""
+        with self.lock:
+            if self.count <= self.capacity:
+                samples = self.buffer[:self.count].copy()
+            else:
+                start = self.count % self.capacity
+                samples = np.concatenate((self.buffer[start:], self.buffer[:start]))
+        if seconds is not None:
+            samples = samples[samples[:, 0] >= time.time() - seconds]
+        return samples
+
+    def get_stats(self):
+        latest = self.latest()
+        return {
+            'backend': type(self.sensor).__name__,
+            'interval': self.interval,
+            'samples': min(self.count, self.capacity),
+            'capacity': self.capacity,
+            'reads': self.reads,
+            'failures': self.failures,
+            'avg_read_ms': round(self.read_time / self.reads * 1000, 1) if self.reads else 0.0,
+            'max_read_ms': round(self.max_read_time * 1000, 1),
+            'latest_age': latest['age'] if latest else None
+        }
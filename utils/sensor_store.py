@@ -0,0 +1,186 @@
+import time
+import sqlite3
+import threading
+from datetime import datetime
+
+from utils.history import connect, TIME_FORMAT
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sensor_samples (
+    ts REAL PRIMARY KEY,
+    temperature REAL NOT NULL,
+    humidity REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sensor_rollups (
+    resolution TEXT NOT NULL,
+    bucket REAL NOT NULL,
+    count INTEGER NOT NULL,
+    t_min REAL, t_max REAL, t_sum REAL,
+    h_min REAL, h_max REAL, h_sum REAL,
+    PRIMARY KEY (resolution, bucket)
+) WITHOUT ROWID;
+"""
+
+# Các mức tổng hợp: tên -> độ dài bucket (giây), từ mịn tới thô
+RESOLUTIONS = {'minute': 60, 'hour': 3600, 'day': 86400}
+
+UPSERT_ROLLUP = """
+INSERT INTO sensor_rollups (resolution, bucket, count, t_min, t_max, t_sum, h_min, h_max, h_sum)
+VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (resolution, bucket) DO UPDATE SET
+    count = count + 1,
+    t_min = min(t_min, excluded.t_min), t_max = max(t_max, excluded.t_max), t_sum = t_sum + excluded.t_sum,
+    h_min = min(h_min, excluded.h_min), h_max = max(h_max, excluded.h_max), h_sum = h_sum + excluded.h_sum
+"""
+
+
+def bucket_start(ts, seconds):
+    """Đầu bucket chứa ts, căn theo giờ địa phương (bucket ngày bắt đầu lúc 0h)"""
+    offset = time.localtime(ts).tm_gmtoff
+    return (ts + offset) // seconds * seconds - offset
+
+
+class SensorStore:
+    """
+    Lịch sử nhiệt độ/độ ẩm trong SQLite (chế độ WAL).
+    Mỗi mẫu được ghi thêm vào bảng sensor_samples và cập nhật ngay
+    min/max/tổng của bucket phút, giờ, ngày chứa nó trong bảng sensor_rollups,
+    nên truy vấn khoảng thời gian dài chỉ đọc mức tổng hợp phù hợp
+    thay vì quét mẫu gốc. Mẫu gốc cũ hơn raw_retention_days được xóa dần.
+    """
+
+    def __init__(self, db_path, raw_retention_days=30, max_points=2000):
+        self.db_path = db_path
+        self.raw_retention = raw_retention_days * 86400 if raw_retention_days else None
+        self.max_points = max_points
+        self.local = threading.local()
+        # Mọi kết nối đã mở (của mọi thread) để close() đóng hết
+        self.connections = []
+        self.connections_lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self._conn().executescript(SCHEMA)
+        self.last_prune = 0.0
+
+        # Thống kê
+        self.written = 0
+        self.write_time = 0.0
+        self.queries = 0
+        self.query_time = 0.0
+
+    def _conn(self):
+        """Kết nối riêng cho mỗi thread"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            # Mỗi kết nối chỉ được dùng trong thread tạo ra nó; check_same_thread=False
+            # chỉ để close() ở thread khác đóng được khi dừng hệ thống
+            conn = connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self.local.conn = conn
+            with self.connections_lock:
+                self.connections.append(conn)
+        return conn
+
+    @staticmethod
+    def _rollup_rows(samples):
+        for ts, temperature, humidity in samples:
+            for resolution, seconds in RESOLUTIONS.items():
+                yield (resolution, bucket_start(ts, seconds),
+                       temperature, temperature, temperature, humidity, humidity, humidity)
+
+    def record_many(self, samples):
+        """Ghi nhiều mẫu (timestamp, nhiệt độ, độ ẩm) trong một transaction; trả về số mẫu mới"""
+        samples = [(float(ts), float(t), float(h)) for ts, t, h in samples]
+        if not samples:
+            return 0
+        start = time.perf_counter()
+        conn = self._conn()
+        with self.write_lock, conn:
+            # Mẫu trùng timestamp bị bỏ qua và không được cộng lại vào các mức tổng hợp
+            inserted = [sample for sample in samples if conn.execute(
+                "INSERT OR IGNORE INTO sensor_samples (ts, temperature, humidity) VALUES (?, ?, ?)",
+                sample).rowcount]
+            conn.executemany(UPSERT_ROLLUP, self._rollup_rows(inserted))
+        self.written += len(inserted)
+        self.write_time += time.perf_counter() - start
+        self._maybe_prune(samples[-1][0])
+        return len(inserted)
+
+    def record(self, timestamp, temperature, humidity):
+        """Ghi một mẫu cảm biến"""
+        return self.record_many([(timestamp, temperature, humidity)])
+
+    def _maybe_prune(self, now):
+        """Xóa mẫu gốc quá hạn (tối đa mỗi giờ một lần); các mức tổng hợp được giữ lại"""
+        if self.raw_retention is None or now - self.last_prune < 3600:
+            return
+        self.last_prune = now
+        conn = self._conn()
+        with self.write_lock, conn:
+            conn.execute("DELETE FROM sensor_samples WHERE ts < ?", (now - self.raw_retention,))
+
+    def pick_resolution(self, start, end):
+        """Mức mịn nhất cho không quá max_points điểm trong khoảng [start, end]"""
+        span = end - start
+        if self.raw_retention is None or start >= time.time() - self.raw_retention:
+            raw_points = self._conn().execute(
+                "SELECT count(*) FROM (SELECT 1 FROM sensor_samples WHERE ts BETWEEN ? AND ? LIMIT ?)",
+                (start, end, self.max_points + 1)).fetchone()[0]
+            if raw_points <= self.max_points:
+                return 'raw'
+        for resolution, seconds in RESOLUTIONS.items():
+            if span / seconds <= self.max_points:
+                return resolution
+        return 'day'
+
+    def query(self, start, end, resolution='auto'):
+        """
+        Chuỗi dữ liệu trong [start, end] (unix time), cũ trước
+        resolution: 'raw', 'minute', 'hour', 'day' hoặc 'auto' (tự chọn theo max_points)
+        Trả về (resolution đã dùng, danh sách điểm, bị cắt bớt hay không)
+        """
+        query_start = time.perf_counter()
+        if resolution == 'auto':
+            resolution = self.pick_resolution(start, end)
+        if resolution == 'raw':
+            rows = self._conn().execute(
+                "SELECT ts, temperature, humidity FROM sensor_samples WHERE ts BETWEEN ? AND ? ORDER BY ts LIMIT ?",
+                (start, end, self.max_points + 1)).fetchall()
+            points = [{
+                'timestamp': datetime.fromtimestamp(row['ts']).strftime(TIME_FORMAT),
+                'temperature': row['temperature'],
+                'humidity': row['humidity']
+            } for row in rows[:self.max_points]]
+        elif resolution in RESOLUTIONS:
+            rows = self._conn().execute(
+                "SELECT bucket, count, t_min, t_max, t_sum, h_min, h_max, h_sum FROM sensor_rollups"
+                " WHERE resolution = ? AND bucket BETWEEN ? AND ? ORDER BY bucket LIMIT ?",
+                (resolution, bucket_start(start, RESOLUTIONS[resolution]), end, self.max_points + 1)).fetchall()
+            points = [{
+                'timestamp': datetime.fromtimestamp(row['bucket']).strftime(TIME_FORMAT),
+                'count': row['count'],
+                'temperature': {'min': row['t_min'], 'max': row['t_max'],
+                                'avg': round(row['t_sum'] / row['count'], 2)},
+                'humidity': {'min': row['h_min'], 'max': row['h_max'],
+                             'avg': round(row['h_sum'] / row['count'], 2)}
+            } for row in rows[:self.max_points]]
+        else:
+            raise ValueError(f"resolution không hợp lệ: {resolution}")
+        self.queries += 1
+        self.query_time += time.perf_counter() - query_start
+        return resolution, points, len(rows) > self.max_points
+
+    def close(self):
+        """Đóng kết nối của mọi thread (gọi sau khi các thread ghi/đọc đã dừng)"""
+        with self.connections_lock:
+            connections, self.connections = self.connections, []
+        for conn in connections:
+            conn.close()
+        self.local.conn = None
+
+    def get_stats(self):
+        return {
+            'written': self.written,
+            'avg_write_ms': round(self.write_time / self.written * 1000, 2) if self.written else 0.0,
+            'queries': self.queries,
+            'avg_query_ms': round(self.query_time / self.queries * 1000, 2) if self.queries else 0.0
+        }
@@ -0,0 +1,109 @@
+import json
+import time
+import threading
+
+RESULT_SUMMARY_KEYS = ('success', 'type', 'class_name', 'confidence', 'severity')
+
+
+def result_summary(response_data):
+    """Bản rút gọn của kết quả chụp/upload để gửi kèm cảnh báo (đủ cho khung kết quả mới nhất)"""
+    results = response_data.get('results', {})
+    return {
+        'filename': response_data.get('filename'),
+        'path': response_data.get('path'),
+        'timestamp': response_data.get('timestamp'),
+        'results': {k: results[k] for k in RESULT_SUMMARY_KEYS if k in results}
+    }
+
+
+class StatusPublisher:
+    """
+    Gửi trạng thái hệ thống qua Socket.IO theo kiểu delta có version.
+    publish() chỉ đánh dấu trạng thái đã đổi; sau window giây một thread nền
+    so sánh với bản đã gửi và phát một 'status_delta' chứa các khóa thay đổi,
+    nên nhiều cập nhật liên tiếp được gộp thành một lần gửi.
+    Client mới kết nối (hoặc thấy version bị hụt) nhận bản đầy đủ qua snapshot().
+    """
+
+    def __init__(self, state, emit, window=0.25, delta_event='status_delta'):
+        self.state = state
+        self.emit = emit
+        self.window = window
+        self.delta_event = delta_event
+        self.lock = threading.Lock()
+        self.pending = threading.Event()
+        self.version = 0
+        self.published = self._copy()
+
+        # Thống kê
+        self.publish_calls = 0
+        self.rounds = 0
+        self.deltas = 0
+        self.snapshots = 0
+        self.unchanged = 0
+        self.delta_bytes = 0
+
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="status-publisher", daemon=True)
+        self.thread.start()
+
+    def _copy(self):
+        """Bản sao trạng thái (sao chép cả dict con như latest_analysis)"""
+        return {k: dict(v) if isinstance(v, dict) else v for k, v in list(self.state.items())}
+
+    def publish(self):
+        """Báo trạng thái đã thay đổi; được gửi gộp sau tối đa window giây"""
+        self.publish_calls += 1
+        self.pending.set()
+
+    def _run(self):
+        while self.running:
+            self.pending.wait()
+            time.sleep(self.window)
+            # Xóa cờ trước khi so sánh: cập nhật đến sau lúc sao chép sẽ được gửi ở lượt sau
+            self.pending.clear()
+            self.rounds += 1
+            self.flush()
+
+    def _flush_locked(self):
+        current = self._copy()
+        changes = {k: v for k, v in current.items() if k not in self.published or self.published[k] != v}
+        if not changes:
+            self.unchanged += 1
+            return None
+        self.version += 1
+        delta = {'version': self.version, 'base': self.version - 1, 'changes': changes}
+        self.published = current
+        self.deltas += 1
+        self.delta_bytes += len(json.dumps(delta, ensure_ascii=False, default=str))
+        self.emit(self.delta_event, delta)
+        return delta
+
+    def flush(self):
+        """Gửi ngay các thay đổi chưa gửi; trả về delta đã gửi hoặc None"""
+        with self.lock:
+            return self._flush_locked()
+
+    def snapshot(self):
+        """Trạng thái đầy đủ kèm 'status_version' (gửi delta còn chờ trước để version khớp)"""
+        with self.lock:
+            self._flush_locked()
+            self.snapshots += 1
+            return dict(self.published, status_version=self.version)
+
+    def close(self):
+        self.running = False
+        self.pending.set()
+        self.thread.join(timeout=self.window + 1)
+
+    def get_stats(self):
+        return {
+            'version': self.version,
+            'publish_calls': self.publish_calls,
+            'deltas': self.deltas,
+            # Số lần publish() được gộp vào một lượt gửi trước đó
+            'coalesced': max(self.publish_calls - self.rounds, 0),
+            'unchanged': self.unchanged,
+            'snapshots': self.snapshots,
+            'avg_delta_bytes': round(self.delta_bytes / self.deltas, 1) if self.deltas else 0.0
+        }
@@ -0,0 +1,332 @@
+import time
+import threading
+from collections import deque
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+
+class StreamSubscriber:
+    """
+    Hàng đợi frame của một client; đầy thì bỏ frame cũ nhất.
+    Mỗi client có profile riêng (kích thước, chất lượng JPEG, FPS).
+    Chế độ adaptive hạ chất lượng rồi FPS khi hàng đợi bị dồn
+    (client nhận không kịp) và nâng dần lại khi hàng đợi thông.
+    """
+
+    # Các mức adaptive: (trần chất lượng JPEG, hệ số FPS)
+    ADAPTIVE_LEVELS = ((None, 1.0), (60, 1.0), (45, 1.0), (45, 0.5), (30, 0.25))
+    # Thời gian tối thiểu giữa hai lần đổi mức (giây)
+    DEGRADE_INTERVAL = 1.0
+    RECOVER_INTERVAL = 5.0
+
+    _ids = 0
+    _ids_lock = threading.Lock()
+
+    def __init__(self, max_queue=2, width=640, height=480, quality=80, fps=15,
+                 adaptive=False, default_profile=True):
+        with StreamSubscriber._ids_lock:
+            StreamSubscriber._ids += 1
+            self.id = StreamSubscriber._ids
+        self.frames = deque(maxlen=max_queue)
+        self.cond = threading.Condition()
+        self.width = width
+        self.height = height
+        self.quality = quality
+        self.fps = fps
+        self.adaptive = adaptive
+        # Client không yêu cầu profile riêng: có thể nhận thẳng JPEG của camera
+        self.default_profile = default_profile
+        self.level = 0
+        self.level_changed = 0.0
+        self.clean_puts = 0
+        self.next_time = 0.0
+
+        self.sent = 0
+        self.dropped = 0
+        self.bytes_sent = 0
+        self.connected_at = time.time()
+
+    def profile(self):
+        """(width, height, quality, fps) hiệu lực sau khi áp dụng mức adaptive"""
+        quality_cap, fps_factor = self.ADAPTIVE_LEVELS[self.level]
+        quality = self.quality if quality_cap is None else min(self.quality, quality_cap)
+        return self.width, self.height, quality, max(1.0, self.fps * fps_factor)
+
+    def due(self, now, tolerance=0.0):
+        """Đã tới lượt gửi frame cho client này theo FPS của nó chưa"""
+        if now + tolerance < self.next_time:
+            return False
+        period = 1.0 / self.profile()[3]
+        if self.next_time < now - period:
+            # Lần đầu hoặc bị trễ nhiều: tính lại nhịp từ bây giờ
+            self.next_time = now
+        self.next_time += period
+        return True
+
+    def _adapt(self, backlog):
+        """Đổi mức adaptive theo số frame còn chờ trong hàng đợi lúc put"""
+        now = time.time()
+        if backlog >= self.frames.maxlen:
+            self.clean_puts = 0
+            if self.level < len(self.ADAPTIVE_LEVELS) - 1 and now - self.level_changed >= self.DEGRADE_INTERVAL:
+                self.level += 1
+                self.level_changed = now
+        elif backlog == 0:
+            self.clean_puts += 1
+            if self.level > 0 and self.clean_puts >= 3 and now - self.level_changed >= self.RECOVER_INTERVAL:
+                self.level -= 1
+                self.level_changed = now
+                self.clean_puts = 0
+        else:
+            self.clean_puts = 0
+
+    def put(self, frame_bytes):
+        with self.cond:
+            backlog = len(self.frames)
+            if backlog == self.frames.maxlen:
+                self.dropped += 1
+            self.frames.append(frame_bytes)
+            self.cond.notify()
+            if self.adaptive:
+                self._adapt(backlog)
+
+    def get(self, timeout=None):
+        """Chờ frame tiếp theo; trả về None nếu hết thời gian chờ"""
+        with self.cond:
+            if not self.frames:
+                self.cond.wait(timeout)
+            if not self.frames:
+                return None
+            frame_bytes = self.frames.popleft()
+            self.sent += 1
+            self.bytes_sent += len(frame_bytes)
+            return frame_bytes
+
+    def get_stats(self):
+        with self.cond:
+            elapsed = max(time.time() - self.connected_at, 1e-6)
+            width, height, quality, fps = self.profile()
+            return {
+                'id': self.id,
+                'size': f"{width}x{height}",
+                'quality': quality,
+                'target_fps': round(fps, 2),
+                'adaptive': self.adaptive,
+                'adaptive_level': self.level,
+                'queued': len(self.frames),
+                'frames_sent': self.sent,
+                'frames_dropped': self.dropped,
+                'fps': round(self.sent / elapsed, 2),
+                'kbps': round(self.bytes_sent * 8 / 1000 / elapsed, 1),
+                'connected_s': round(elapsed, 1)
+            }
+
+
+class MJPEGBroadcaster:
+    """
+    Một thread duy nhất lấy frame từ camera, vẽ timestamp và encode JPEG
+    theo FPS mục tiêu, rồi phát cho mọi client.
+    Mỗi profile (kích thước, chất lượng) chỉ được encode một lần cho mỗi
+    frame, dùng chung cho mọi client cùng profile.
+    Thread chỉ chạy khi có ít nhất một client đang xem.
+    Với passthrough=True và camera ở chế độ mjpeg, client dùng profile mặc định
+    nhận thẳng JPEG gốc của camera, không giải mã và encode lại.
+    Frame được đọc qua buffer của Camera, không dùng khóa chung với
+    các đường chụp/phân tích ảnh nên stream không bị dừng khi đang phân tích.
+    """
+
+    MIN_WIDTH, MAX_WIDTH = 160, 1920
+    MIN_QUALITY, MAX_QUALITY = 20, 95
+
+    def __init__(self, camera, fps=15, width=640, height=480, quality=80, max_queue=2, passthrough=False):
+        self.camera = camera
+        self.fps = fps
+        self.size = (width, height)
+        self.quality = quality
+        self.max_queue = max_queue
+        self.passthrough = passthrough
+        # Hàm vẽ thêm lên frame trước khi encode (vd. kết quả nhận diện live), None = không vẽ
+        self.overlay = None
+
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+        # Thống kê
+        self.frames_encoded = 0
+        self.frames_passthrough = 0
+        self.variant_hits = 0
+        self.active_variants = 0
+        self.encode_time = 0.0
+        # Cộng dồn từ các client đã ngắt kết nối
+        self.past_sent = 0
+        self.past_dropped = 0
+
+    def subscribe(self, width=None, quality=None, fps=None, adaptive=False):
+        """
+        Đăng ký một client; width/quality/fps = None dùng giá trị mặc định
+        (chiều cao tính theo tỉ lệ khung mặc định, FPS không vượt FPS của broadcaster)
+        """
+        default_profile = width is None and quality is None
+        if width is None:
+            size = self.size
+        else:
+            width = min(max(int(width), self.MIN_WIDTH), self.MAX_WIDTH)
+            # Giữ chiều rộng/cao chẵn cho bộ encode
+            size = (width // 2 * 2, int(round(width * self.size[1] / self.size[0])) // 2 * 2)
+        quality = self.quality if quality is None else min(max(int(quality), self.MIN_QUALITY), self.MAX_QUALITY)
+        max_fps = self.fps or 30
+        fps = max_fps if not fps else min(max(float(fps), 1.0), max_fps)
+
+        subscriber = StreamSubscriber(self.max_queue, size[0], size[1], quality, fps,
+                                      adaptive=adaptive, default_profile=default_profile)
+        with self.lock:
+            self.subscribers.add(subscriber)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="mjpeg-broadcaster", daemon=True)
+                self.thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.discard(subscriber)
+                self.past_sent += subscriber.sent
+                self.past_dropped += subscriber.dropped
+
+    def _placeholder(self, size=None):
+        width, height = size or self.size
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        cv2.putText(frame, "WEBCAM STREAM", (50, 200),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        cv2.putText(frame, "Chỉ hiển thị video thô", (100, 250),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 1)
+        cv2.putText(frame, "Nhận diện: Chụp ảnh định kỳ & thủ công", (50, 300),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 1)
+        return frame
+
+    def render(self, frame, size=None, quality=None):
+        """Resize, vẽ timestamp và encode JPEG; trả về bytes hoặc None nếu lỗi"""
+        size = size or self.size
+        quality = quality or self.quality
+        if frame is None:
+            frame = self._placeholder(size)
+        elif (frame.shape[1], frame.shape[0]) != size:
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        else:
+            # Frame của camera chỉ đọc: copy trước khi vẽ timestamp
+            frame = frame.copy()
+        overlay = self.overlay
+        if overlay is not None:
+            frame = overlay(frame)
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        scale = 0.7 * size[0] / 640
+        # Có overlay thì dời timestamp xuống đáy để không đè lên kết quả
+        y = size[1] - 10 if overlay is not None else max(12, int(30 * size[0] / 640))
+        cv2.putText(frame, f"Live: {timestamp}", (10, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, scale, (0, 255, 0), 2 if scale >= 0.5 else 1)
+        ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        return buffer.tobytes() if ret else None
+
+    def set_overlay(self, overlay):
+        """Đặt hoặc bỏ (None) hàm overlay; khi có overlay mọi frame đều phải encode lại"""
+        self.overlay = overlay
+
+    def is_passthrough(self):
+        return self.passthrough and self.overlay is None and getattr(self.camera, 'mode', 'bgr') == 'mjpeg'
+
+    def _variant_key(self, subscriber):
+        """Khóa profile encode của client; None = JPEG gốc của camera"""
+        width, height, quality, _ = subscriber.profile()
+        if self.is_passthrough() and subscriber.default_profile and quality == subscriber.quality:
+            return None
+        return (width, height, quality)
+
+    def _wait_frame(self, last_seq):
+        """Chờ frame mới hơn last_seq; trả về (seq, JPEG gốc hoặc None, frame hoặc None)"""
+        if self.is_passthrough():
+            seq, jpeg = self.camera.wait_for_jpeg(last_seq, timeout=1.0)
+            return seq, jpeg, None
+        seq, frame = self.camera.wait_for_frame(last_seq, timeout=1.0)
+        return seq, None, frame
+
+    def _render_timed(self, frame, size, quality):
+        start = time.perf_counter()
+        frame_bytes = self.render(frame, size, quality)
+        self.encode_time += time.perf_counter() - start
+        self.frames_encoded += 1
+        return frame_bytes
+
+    def _deliver(self, subscribers, jpeg, frame, tolerance):
+        """Encode mỗi profile cần dùng đúng một lần rồi phát cho các client tới lượt"""
+        now = time.perf_counter()
+        variants = {}
+        for subscriber in subscribers:
+            if not subscriber.due(now, tolerance):
+                continue
+            key = self._variant_key(subscriber)
+            if key in variants:
+                self.variant_hits += 1
+            elif key is None:
+                variants[key] = jpeg
+                self.frames_passthrough += 1
+            else:
+                if frame is None:
+                    # Passthrough: chỉ giải mã khi có client cần profile khác
+                    _, frame = self.camera.get_frame_view()
+                    if frame is None:
+                        continue
+                variants[key] = self._render_timed(frame, key[:2], key[2])
+            if variants[key] is not None:
+                subscriber.put(variants[key])
+        if variants:
+            self.active_variants = len(variants)
+
+    def _run(self):
+        interval = 1.0 / self.fps if self.fps else 0
+        next_time = time.perf_counter()
+        last_seq = 0
+        while True:
+            with self.lock:
+                if not self.subscribers:
+                    # Không còn ai xem: dừng thread, lần subscribe sau sẽ khởi động lại
+                    self.thread = None
+                    return
+                subscribers = list(self.subscribers)
+
+            try:
+                last_seq, jpeg, frame = self._wait_frame(last_seq)
+                # Camera không có frame mới: không encode lại frame cũ
+                if jpeg is not None or frame is not None:
+                    self._deliver(subscribers, jpeg, frame, interval / 2)
+            except Exception as e:
+                print(f"[STREAM ERROR] Lỗi encode frame: {e}")
+                time.sleep(0.5)
+
+            # Giữ đúng FPS mục tiêu; nếu chậm hơn thì không ngủ
+            next_time += interval
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = time.perf_counter()
+
+    def get_stats(self):
+        with self.lock:
+            subscribers = list(self.subscribers)
+            past_sent, past_dropped = self.past_sent, self.past_dropped
+        return {
+            'viewers': len(subscribers),
+            'target_fps': self.fps,
+            'passthrough': self.is_passthrough(),
+            'frames_encoded': self.frames_encoded,
+            'frames_passthrough': self.frames_passthrough,
+            'variant_cache_hits': self.variant_hits,
+            'active_variants': self.active_variants,
+            'avg_encode_ms': round(self.encode_time / self.frames_encoded * 1000, 3) if self.frames_encoded else 0.0,
+            'frames_sent': past_sent + sum(s.sent for s in subscribers),
+            'frames_dropped': past_dropped + sum(s.dropped for s in subscribers),
+            'clients': [s.get_stats() for s in sorted(subscribers, key=lambda s: s.id)]
+        }
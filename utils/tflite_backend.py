@@ -0,0 +1,68 @@
+"""
+Chọn backend chạy model TFLite.
+Ưu tiên runtime nhẹ (ai_edge_litert, tflite_runtime) và chỉ import
+TensorFlow đầy đủ khi không có lựa chọn nào khác. Việc import được
+hoãn tới lần đầu cần tạo interpreter.
+"""
+
+import os
+import importlib
+import importlib.util
+import threading
+
+# Thứ tự ưu tiên: tên backend -> (module, thuộc tính Interpreter)
+BACKENDS = {
+    'ai_edge_litert': ('ai_edge_litert.interpreter', 'Interpreter'),
+    'tflite_runtime': ('tflite_runtime.interpreter', 'Interpreter'),
+    'tensorflow': ('tensorflow', 'lite.Interpreter'),
+}
+
+_lock = threading.Lock()
+_loaded = {}
+
+
+def _is_installed(name):
+    """Kiểm tra package có cài không mà không import nó"""
+    root = BACKENDS[name][0].split('.')[0]
+    try:
+        return importlib.util.find_spec(root) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def available_backends():
+    """Danh sách backend đã cài, theo thứ tự ưu tiên"""
+    return [name for name in BACKENDS if _is_installed(name)]
+
+
+def load_interpreter_class(preferred=None):
+    """
+    Import backend và trả về (tên backend, lớp Interpreter)
+    preferred: tên backend cụ thể, mặc định đọc biến môi trường TFLITE_BACKEND
+    """
+    preferred = preferred or os.environ.get('TFLITE_BACKEND') or None
+    if preferred is not None and preferred not in BACKENDS:
+        raise ValueError(f"Backend không hợp lệ: {preferred} (chọn: {', '.join(BACKENDS)})")
+    candidates = [preferred] if preferred else list(BACKENDS)
+
+    with _lock:
+        for name in candidates:
+            if name in _loaded:
+                return name, _loaded[name]
+            if not _is_installed(name):
+                continue
+
+            module_name, attr_path = BACKENDS[name]
+            try:
+                obj = importlib.import_module(module_name)
+                for attr in attr_path.split('.'):
+                    obj = getattr(obj, attr)
+            except Exception as e:
+                print(f"[TFLITE] Không import được backend {name}: {e}")
+                continue
+
+            _loaded[name] = obj
+            print(f"[TFLITE] Sử dụng backend: {name}")
+            return name, obj
+
+    raise ImportError(f"Không tìm thấy backend TFLite nào trong: {', '.join(candidates)}")
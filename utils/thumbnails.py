@@ -0,0 +1,183 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from utils.image_io import decode_image
+
+# Định dạng thumbnail -> (đuôi file, mimetype, tham số encode theo chất lượng)
+FORMATS = {
+    'webp': ('.webp', 'image/webp', lambda q: [cv2.IMWRITE_WEBP_QUALITY, q]),
+    'jpeg': ('.jpg', 'image/jpeg', lambda q: [cv2.IMWRITE_JPEG_QUALITY, q]),
+}
+
+
+def make_thumbnail(image, size):
+    """Thu nhỏ ảnh BGR để cạnh dài nhất bằng size (không phóng to)"""
+    height, width = image.shape[:2]
+    scale = size / max(height, width)
+    if scale >= 1:
+        return image
+    return cv2.resize(image, (max(1, round(width * scale)), max(1, round(height * scale))),
+                      interpolation=cv2.INTER_AREA)
+
+
+def safe_relative(filename):
+    """
+    Chuẩn hóa tên file tương đối trong thư mục ảnh (có thể gồm thư mục YYYY/MM/DD)
+    None nếu là đường dẫn tuyệt đối, có '..' hoặc trỏ vào thư mục ẩn (như .thumbs)
+    """
+    parts = filename.replace('\\', '/').split('/')
+    if not filename or any(not part or part.startswith('.') for part in parts):
+        return None
+    return '/'.join(parts)
+
+
+class ThumbnailService:
+    """
+    Thumbnail cho các thư mục ảnh (ảnh chụp, ảnh định kỳ, ảnh upload).
+    Ảnh mới: thumbnail mọi kích thước/định dạng được tạo trong thread nền
+    và lưu trong thư mục .thumbs cạnh ảnh gốc.
+    Ảnh cũ chưa có thumbnail: tạo khi được yêu cầu lần đầu và giữ trong
+    cache LRU trong bộ nhớ giới hạn theo số byte.
+    """
+
+    THUMB_DIR = '.thumbs'
+
+    def __init__(self, folders, sizes=(160, 320), formats=('webp', 'jpeg'), quality=75,
+                 cache_max_bytes=16 * 1024 * 1024):
+        self.folders = folders
+        self.sizes = tuple(sizes)
+        self.formats = tuple(formats)
+        self.quality = quality
+        self.cache_max_bytes = cache_max_bytes
+        self.cache = OrderedDict()  # (kind, filename, size, fmt) -> bytes
+        self.cache_bytes = 0
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbnailer")
+
+        # Thống kê
+        self.generated = 0
+        self.lazy_built = 0
+        self.cache_hits = 0
+        self.disk_hits = 0
+
+    def thumb_path(self, kind, filename, size, fmt):
+        stem = os.path.splitext(filename)[0]
+        return os.path.join(self.folders[kind], self.THUMB_DIR, f"{stem}_{size}{FORMATS[fmt][0]}")
+
+    def _encode(self, image, size, fmt):
+        ret, buffer = cv2.imencode(FORMATS[fmt][0], make_thumbnail(image, size), FORMATS[fmt][2](self.quality))
+        return buffer.tobytes() if ret else None
+
+    def generate(self, kind, filename, image=None):
+        """Tạo và lưu mọi thumbnail của một ảnh (image: ảnh BGR đã có trong bộ nhớ, tránh đọc lại file)"""
+        if image is None:
+            image, _ = decode_image(self._read_original(kind, filename), (max(self.sizes),) * 2, margin=1)
+            if image is None:
+                return
+        os.makedirs(os.path.dirname(self.thumb_path(kind, filename, self.sizes[0], self.formats[0])), exist_ok=True)
+        for size in self.sizes:
+            for fmt in self.formats:
+                data = self._encode(image, size, fmt)
+                if data is None:
+                    continue
+                path = self.thumb_path(kind, filename, size, fmt)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+        self.generated += 1
+
+    def generate_async(self, kind, filename, image=None):
+        """Tạo thumbnail trong thread nền, trả về Future"""
+        return self.executor.submit(self._generate_safe, kind, filename, image)
+
+    def _generate_safe(self, kind, filename, image):
+        try:
+            self.generate(kind, filename, image)
+        except Exception as e:
+            print(f"[THUMBNAIL ERROR] Lỗi tạo thumbnail {kind}/{filename}: {e}")
+
+    def _read_original(self, kind, filename):
+        with open(os.path.join(self.folders[kind], filename), 'rb') as f:
+            return f.read()
+
+    def _cache_put(self, key, data):
+        with self.lock:
+            if key in self.cache:
+                return
+            self.cache[key] = data
+            self.cache_bytes += len(data)
+            while self.cache and self.cache_bytes > self.cache_max_bytes:
+                _, old = self.cache.popitem(last=False)
+                self.cache_bytes -= len(old)
+
+    def etag(self, kind, filename, size, fmt):
+        """
+        ETag mạnh tính từ ảnh gốc (tên, kích thước, thời điểm sửa) và tham số thumbnail,
+        không cần đọc thumbnail; None nếu yêu cầu không hợp lệ hoặc không có ảnh gốc
+        """
+        if kind not in self.folders or size not in self.sizes or fmt not in FORMATS:
+            return None
+        filename = safe_relative(filename)
+        if filename is None:
+            return None
+        try:
+            stat = os.stat(os.path.join(self.folders[kind], filename))
+        except OSError:
+            return None
+        return hashlib.sha1(
+            f"{kind}/{filename}:{stat.st_size}:{stat.st_mtime_ns}:{size}:{fmt}:{self.quality}".encode()
+        ).hexdigest()
+
+    def get(self, kind, filename, size, fmt):
+        """Trả về (bytes thumbnail, mimetype, etag) hoặc None nếu không có ảnh gốc"""
+        etag = self.etag(kind, filename, size, fmt)
+        if etag is None:
+            return None
+        filename = safe_relative(filename)
+
+        path = self.thumb_path(kind, filename, size, fmt)
+        key = (kind, filename, size, fmt)
+        data = None
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            self.disk_hits += 1
+        else:
+            with self.lock:
+                data = self.cache.get(key)
+                if data is not None:
+                    self.cache.move_to_end(key)
+                    self.cache_hits += 1
+            if data is None:
+                # Ảnh có từ trước khi có thumbnail: tạo một bản cần dùng và giữ trong cache
+                image, _ = decode_image(self._read_original(kind, filename), (size, size), margin=1)
+                if image is None:
+                    return None
+                data = self._encode(image, size, fmt)
+                if data is None:
+                    return None
+                self._cache_put(key, data)
+                self.lazy_built += 1
+        return data, FORMATS[fmt][1], etag
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'sizes': list(self.sizes),
+                'formats': list(self.formats),
+                'generated': self.generated,
+                'lazy_built': self.lazy_built,
+                'disk_hits': self.disk_hits,
+                'cache_hits': self.cache_hits,
+                'cache_entries': len(self.cache),
+                'cache_bytes': self.cache_bytes
+            }
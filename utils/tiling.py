@@ -0,0 +1,161 @@
+import time
+
+import cv2
+import numpy as np
+
+# Khoảng màu HSV (OpenCV: H 0-180) của lá: từ nâu/vàng (vết bệnh) tới xanh lá
+LEAF_HSV_LOWER = np.array([5, 40, 30], dtype=np.uint8)
+LEAF_HSV_UPPER = np.array([95, 255, 255], dtype=np.uint8)
+
+
+def tile_positions(length, tile, stride):
+    """Vị trí bắt đầu các tile trên một chiều, tile cuối sát mép ảnh"""
+    if length <= tile:
+        return [0]
+    positions = list(range(0, length - tile, stride))
+    positions.append(length - tile)
+    return positions
+
+
+class LeafMask:
+    """
+    Mask màu lá tính một lần trên ảnh thu nhỏ, kèm ảnh tích phân
+    để lấy tỉ lệ pixel lá của bất kỳ tile nào với chi phí O(1)
+    """
+
+    def __init__(self, image, max_side=256):
+        height, width = image.shape[:2]
+        self.scale = min(1.0, max_side / max(height, width))
+        small = cv2.resize(image, (max(1, int(width * self.scale)), max(1, int(height * self.scale))),
+                           interpolation=cv2.INTER_AREA)
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+        mask = cv2.inRange(hsv, LEAF_HSV_LOWER, LEAF_HSV_UPPER)
+        self.integral = cv2.integral(mask // 255)
+
+    def fraction(self, x, y, w, h):
+        x0, y0 = int(x * self.scale), int(y * self.scale)
+        x1 = max(x0 + 1, int((x + w) * self.scale))
+        y1 = max(y0 + 1, int((y + h) * self.scale))
+        ii = self.integral
+        total = ii[y1, x1] - ii[y0, x1] - ii[y1, x0] + ii[y0, x0]
+        return float(total) / ((x1 - x0) * (y1 - y0))
+
+
+class TiledAnalyzer:
+    """
+    Phân tích ảnh độ phân giải cao theo tile.
+    Ảnh được chia thành các tile vuông chồng lấn, tile có ít màu lá bị bỏ qua,
+    các tile còn lại chạy qua interpreter theo batch. Kết quả gộp thành
+    heatmap xác suất bệnh theo lưới tile và một kết luận cho cả ảnh.
+    """
+
+    def __init__(self, pool, tile_size=512, overlap=0.25, min_leaf=0.3, batch_size=8, disease_threshold=0.6):
+        self.pool = pool
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.min_leaf = min_leaf
+        self.batch_size = batch_size
+        # Tile có xác suất một bệnh >= ngưỡng này mới được tính là phát hiện bệnh
+        self.disease_threshold = disease_threshold
+
+        # Thống kê
+        self.images = 0
+        self.tiles_analyzed = 0
+        self.tiles_skipped = 0
+        self.total_time = 0.0
+
+    def _healthy_ids(self, labels):
+        return [i for i, label in enumerate(labels) if 'healthy' in label.lower()]
+
+    def analyze(self, image):
+        """
+        Phân tích ảnh BGR; trả về dict kết quả cùng dạng detect_batch()
+        kèm khóa 'tiling' (heatmap, số tile, tốc độ)
+        """
+        start = time.perf_counter()
+        height, width = image.shape[:2]
+        tile = min(self.tile_size, width, height)
+        stride = max(1, int(tile * (1 - self.overlap)))
+        xs = tile_positions(width, tile, stride)
+        ys = tile_positions(height, tile, stride)
+
+        mask = LeafMask(image)
+        boxes, cells = [], []
+        for row, y in enumerate(ys):
+            for col, x in enumerate(xs):
+                if mask.fraction(x, y, tile, tile) >= self.min_leaf:
+                    boxes.append((x, y))
+                    cells.append((row, col))
+
+        batches = 0
+        with self.pool.checkout() as detector:
+            if boxes:
+                probabilities = []
+                for i in range(0, len(boxes), self.batch_size):
+                    tiles = [image[y:y + tile, x:x + tile] for x, y in boxes[i:i + self.batch_size]]
+                    probabilities.append(detector.predict_batch(tiles))
+                    batches += 1
+                probabilities = np.concatenate(probabilities)
+                result = self._aggregate(detector, probabilities)
+            else:
+                # Không tile nào đủ màu lá: phân tích cả ảnh như bình thường
+                probabilities = np.zeros((0, len(detector.labels)), dtype=np.float32)
+                result = detector.build_result(detector.predict_batch([image])[0])
+                batches += 1
+            healthy_ids = self._healthy_ids(detector.labels)
+
+        elapsed = time.perf_counter() - start
+        heatmap = [[None] * len(xs) for _ in ys]
+        for (row, col), p in zip(cells, probabilities):
+            heatmap[row][col] = round(float(1.0 - p[healthy_ids].sum()), 3)
+
+        total_tiles = len(xs) * len(ys)
+        self.images += 1
+        self.tiles_analyzed += len(boxes)
+        self.tiles_skipped += total_tiles - len(boxes)
+        self.total_time += elapsed
+
+        result['tiling'] = {
+            'tile_size': tile,
+            'overlap': self.overlap,
+            'grid': [len(ys), len(xs)],
+            'tiles_total': total_tiles,
+            'tiles_analyzed': len(boxes),
+            'tiles_skipped': total_tiles - len(boxes),
+            'batches': batches,
+            'heatmap': heatmap,
+            'latency_ms': round(elapsed * 1000, 1),
+            'tiles_per_sec': round(len(boxes) / elapsed, 1) if elapsed else 0.0
+        }
+        return result
+
+    def _aggregate(self, detector, probabilities):
+        """
+        Kết luận cho cả ảnh từ xác suất các tile:
+        bệnh có xác suất tile cao nhất vượt ngưỡng thì kết luận bệnh đó
+        (một vết bệnh trên một lá là đủ), ngược lại lấy trung bình các tile
+        """
+        healthy_ids = self._healthy_ids(detector.labels)
+        disease_probs = probabilities.copy()
+        disease_probs[:, healthy_ids] = 0
+        peak = disease_probs.max(axis=0)
+        class_id = int(np.argmax(peak))
+
+        if peak[class_id] >= self.disease_threshold:
+            predictions = np.zeros(probabilities.shape[1], dtype=np.float32)
+            predictions[class_id] = peak[class_id]
+            result = detector.build_result(predictions)
+            result['disease_tiles'] = int(np.count_nonzero(disease_probs[:, class_id] >= self.disease_threshold))
+        else:
+            result = detector.build_result(probabilities.mean(axis=0))
+            result['disease_tiles'] = 0
+        return result
+
+    def get_stats(self):
+        return {
+            'images': self.images,
+            'tiles_analyzed': self.tiles_analyzed,
+            'tiles_skipped': self.tiles_skipped,
+            'avg_latency_ms': round(self.total_time / self.images * 1000, 1) if self.images else 0.0,
+            'tiles_per_sec': round(self.tiles_analyzed / self.total_time, 1) if self.total_time else 0.0
+        }
@@ -0,0 +1,93 @@
+import time
+
+import cv2
+import numpy as np
+
+
+def make_augmentations(image, input_size, crop=0.85, angle=10):
+    """
+    Sinh các biến thể test-time augmentation của ảnh BGR:
+    gốc, lật ngang, lật dọc, xoay ±angle độ, cắt giữa và cắt hai góc.
+    Ảnh được thu nhỏ một lần về khoảng input_size / crop trước khi biến đổi
+    để chi phí không phụ thuộc kích thước ảnh gốc.
+    """
+    width, height = input_size
+    base = cv2.resize(image, (int(width / crop), int(height / crop)), interpolation=cv2.INTER_AREA)
+    base_h, base_w = base.shape[:2]
+    center = (base_w / 2, base_h / 2)
+
+    variants = [base, cv2.flip(base, 1), cv2.flip(base, 0)]
+    for a in (angle, -angle):
+        matrix = cv2.getRotationMatrix2D(center, a, 1.0)
+        variants.append(cv2.warpAffine(base, matrix, (base_w, base_h), borderMode=cv2.BORDER_REFLECT_101))
+
+    # Các crop có đúng kích thước input: model không phải resize thêm
+    x0, y0 = (base_w - width) // 2, (base_h - height) // 2
+    variants.append(base[y0:y0 + height, x0:x0 + width])
+    variants.append(base[:height, :width])
+    variants.append(base[base_h - height:, base_w - width:])
+    return variants
+
+
+class TTAAnalyzer:
+    """
+    Test-time augmentation cho kết quả không chắc chắn.
+    Chỉ chạy khi độ tin cậy lần đầu nằm trong khoảng [low, high]; các biến thể
+    được chạy trong một batch qua một interpreter rồi lấy trung bình xác suất.
+    """
+
+    def __init__(self, pool, low=0.4, high=0.7):
+        self.pool = pool
+        self.low = low
+        self.high = high
+
+        # Thống kê
+        self.runs = 0
+        self.changed = 0
+        self.total_time = 0.0
+
+    def should_run(self, results):
+        """Kết quả lần đầu có nằm trong khoảng không chắc chắn không"""
+        return (results is not None and results.get('is_valid_class', True)
+                and self.low <= float(results['confidence']) <= self.high)
+
+    def analyze(self, image, first_pass=None):
+        """
+        Chạy TTA; trả về dict kết quả cùng dạng detect_batch() kèm khóa 'tta'
+        (số biến thể, phương sai xác suất lớp kết luận, tỉ lệ biến thể đồng ý)
+        """
+        start = time.perf_counter()
+        variants = make_augmentations(image, (self.pool.input_width, self.pool.input_height))
+        with self.pool.checkout() as detector:
+            probabilities = detector.predict_batch(variants)
+            mean = probabilities.mean(axis=0)
+            result = detector.build_result(mean)
+        elapsed = time.perf_counter() - start
+
+        class_id = result['class_id']
+        result['tta'] = {
+            'variants': len(variants),
+            'variance': round(float(probabilities[:, class_id].var()), 6),
+            'std': round(float(probabilities[:, class_id].std()), 4),
+            'agreement': round(float(np.mean(probabilities.argmax(axis=1) == class_id)), 3),
+            'latency_ms': round(elapsed * 1000, 2)
+        }
+        if first_pass is not None:
+            result['tta']['first_pass'] = {
+                'class_name': first_pass['class_name'],
+                'confidence': first_pass['confidence']
+            }
+            if first_pass['class_name'] != result['class_name']:
+                self.changed += 1
+
+        self.runs += 1
+        self.total_time += elapsed
+        return result
+
+    def get_stats(self):
+        return {
+            'band': [self.low, self.high],
+            'runs': self.runs,
+            'changed_verdict': self.changed,
+            'avg_latency_ms': round(self.total_time / self.runs * 1000, 2) if self.runs else 0.0
+        }
@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Chữ ký đầu file -> đuôi file chuẩn (WebP: 'RIFF' + 4 byte kích thước + 'WEBP')
+MAGIC_EXTENSIONS = (
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'BM', '.bmp'),
+)
+
+
+class UploadStore:
+    """
+    Lưu ảnh upload theo nội dung (SHA-256).
+    Mỗi hash có đúng một file <sha256><đuôi theo định dạng ảnh>, kèm một index
+    JSON-lines ánh xạ (hash, chế độ phân tích) -> kết quả để upload trùng
+    không phải ghi đĩa và nhận diện lại.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    DEFAULT_EXTENSION = '.jpg'
+
+    def __init__(self, folder, index_path):
+        self.folder = folder
+        self.index_path = index_path
+        self.index = {}  # (sha256, mode) -> entry
+        self.files = {}  # sha256 -> tên file đã lưu
+        self.lock = threading.Lock()
+        self.duplicates = 0
+        # Ghi file gốc ngoài luồng trả response
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="upload-writer")
+        os.makedirs(folder, exist_ok=True)
+        os.makedirs(os.path.dirname(index_path) or '.', exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Đọc index từ đĩa (dòng sau ghi đè dòng trước cùng hash và chế độ)"""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    # Dòng cũ không có 'mode': lấy từ kết quả
+                    mode = entry.get('mode') or entry['results'].get('mode', 'single')
+                    self.index[(entry['sha256'], mode)] = entry
+                    self.files.setdefault(entry['sha256'], entry['filename'])
+                except (ValueError, KeyError, AttributeError):
+                    # Dòng bị cắt dở do mất điện: bỏ qua
+                    continue
+        print(f"[UPLOAD STORE] Đã nạp {len(self.files)} ảnh ({len(self.index)} kết quả) trong index")
+
+    def read_stream(self, stream):
+        """Đọc toàn bộ stream upload vào bộ nhớ, tính SHA-256 trong lúc đọc"""
+        digest = hashlib.sha256()
+        chunks = []
+        while True:
+            chunk = stream.read(self.CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            chunks.append(chunk)
+        return b''.join(chunks), digest.hexdigest()
+
+    def lookup(self, sha256, mode='single'):
+        """Bản sao entry đã lưu cho hash và chế độ phân tích, None nếu chưa có (có thì tính là một lần trùng)"""
+        with self.lock:
+            entry = self.index.get((sha256, mode))
+            if entry is None:
+                return None
+            self.duplicates += 1
+            return dict(entry)
+
+    @staticmethod
+    def extension_for(data):
+        """Đuôi file theo chữ ký đầu dữ liệu ảnh (không tin tên file client gửi)"""
+        for magic, ext in MAGIC_EXTENSIONS:
+            if data.startswith(magic):
+                return ext
+        if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+            return '.webp'
+        return UploadStore.DEFAULT_EXTENSION
+
+    def filename_for(self, sha256, data):
+        """Tên file duy nhất cho một nội dung: tên đã lưu trước đó, hoặc <sha256><đuôi theo định dạng>"""
+        with self.lock:
+            filename = self.files.get(sha256)
+        return filename or f"{sha256}{self.extension_for(data)}"
+
+    def save(self, filename, data):
+        """Ghi file (ghi tạm rồi đổi tên để không để lại file dở dang); bỏ qua nếu đã có"""
+        filepath = os.path.join(self.folder, filename)
+        if os.path.exists(filepath):
+            return filepath
+        tmp_path = f"{filepath}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, filepath)
+        return filepath
+
+    def save_async(self, filename, data):
+        """Ghi file trong thread nền, trả về Future"""
+        return self.writer.submit(self.save, filename, data)
+
+    def record(self, sha256, filename, original_name, results):
+        """Ghi kết quả phân tích vào index theo chế độ của kết quả (append một dòng JSON)"""
+        mode = results.get('mode', 'single')
+        entry = {
+            'sha256': sha256,
+            'mode': mode,
+            'filename': filename,
+            'original_name': original_name,
+            'results': results,
+            'created': time.strftime("%Y-%m-%d %H:%M:%S")
+        }
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self.lock:
+            self.index[(sha256, mode)] = entry
+            self.files.setdefault(sha256, filename)
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+        return entry
+
+    def shutdown(self, wait=True):
+        """Chờ các file đang ghi dở hoàn tất"""
+        self.writer.shutdown(wait=wait)
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'stored': len(self.files),
+                'results': len(self.index),
+                'duplicates_skipped': self.duplicates
+            }